@@ -0,0 +1,139 @@
+"""
+F1 Science Card News — Shared Asset Store
+배경 사진을 받는 즉시 카드 크기(짧은 변 1080px)로 줄여 JPEG로 다시 인코딩하고,
+내용 해시(sha256) 주소로 output/_assets/에 한 번만 저장. 실행 디렉터리는 assets.json으로 참조.
+카드 PNG는 선택적으로 최적화 인코딩(png8 / webp / jpeg).
+"""
+
+import hashlib
+import io
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+
+CARD_SIZE = 1080
+JPEG_QUALITY = 85
+CARD_FORMATS = {"png": ".png", "png8": ".png", "webp": ".webp", "jpeg": ".jpg"}
+REFS_NAME = "assets.json"
+
+
+class AssetStore:
+    """root/<sha[:2]>/<sha>.jpg. 같은 사진은 논문/실행이 달라도 파일 1개"""
+
+    def __init__(self, root, size=CARD_SIZE, quality=JPEG_QUALITY):
+        self.root = Path(root)
+        self.size = size
+        self.quality = quality
+        self.bytes_in = 0       # 원본(다운로드) 바이트
+        self.bytes_stored = 0   # 새로 저장한 바이트 (중복은 0)
+        self.dedup_hits = 0
+        self.card_bytes_in = 0
+        self.card_bytes_out = 0
+        self._lock = threading.Lock()
+
+    def object_path(self, digest):
+        return self.root / digest[:2] / f"{digest}.jpg"
+
+    def put_image(self, data):
+        """원본 이미지 bytes → 축소/재인코딩 후 저장된 경로. Pillow가 없으면 원본 그대로 저장"""
+        encoded = self._resize(data)
+        digest = hashlib.sha256(encoded).hexdigest()
+        path = self.object_path(digest)
+        with self._lock:
+            self.bytes_in += len(data)
+            if path.exists():
+                self.dedup_hits += 1
+                return path
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+            with os.fdopen(fd, "wb") as f:
+                f.write(encoded)
+            os.replace(tmp, path)
+            self.bytes_stored += len(encoded)
+        return path
+
+    def _resize(self, data):
+        try:
+            from PIL import Image
+        except ImportError:
+            return data
+        try:
+            with Image.open(io.BytesIO(data)) as img:
+                img = img.convert("RGB")
+                scale = self.size / min(img.size)
+                if scale < 1:  # 배경은 background-size: cover → 짧은 변이 카드 크기면 충분
+                    img = img.resize((round(img.width * scale), round(img.height * scale)), Image.LANCZOS)
+                out = io.BytesIO()
+                img.save(out, "JPEG", quality=self.quality, optimize=True, progressive=True)
+                return out.getvalue()
+        except Exception as e:
+            print(f"   [WARN] Could not re-encode image ({e}), storing original")
+            return data
+
+    def encode_card(self, png_path, fmt):
+        """렌더링된 카드 PNG → fmt로 다시 인코딩한 경로. png면 그대로"""
+        png_path = Path(png_path)
+        if fmt == "png":
+            return png_path
+        from PIL import Image
+
+        before = png_path.stat().st_size
+        out_path = png_path.with_suffix(CARD_FORMATS[fmt])
+        with Image.open(png_path) as img:
+            img = img.convert("RGB")
+        if fmt == "png8":
+            img.quantize(colors=256, method=Image.Quantize.MEDIANCUT,
+                         dither=Image.Dither.FLOYDSTEINBERG).save(out_path, "PNG", optimize=True)
+        elif fmt == "webp":
+            img.save(out_path, "WEBP", quality=self.quality, method=6)
+        else:
+            img.save(out_path, "JPEG", quality=90, optimize=True, progressive=True)
+        if out_path != png_path:
+            png_path.unlink()
+        with self._lock:
+            self.card_bytes_in += before
+            self.card_bytes_out += out_path.stat().st_size
+        return out_path
+
+    def summary(self):
+        with self._lock:
+            saved_images = self.bytes_in - self.bytes_stored
+            saved_cards = self.card_bytes_in - self.card_bytes_out
+            return {"images_in": self.bytes_in, "images_stored": self.bytes_stored, "dedup_hits": self.dedup_hits,
+                    "cards_in": self.card_bytes_in, "cards_out": self.card_bytes_out,
+                    "saved": saved_images + saved_cards}
+
+    def report(self):
+        s = self.summary()
+        line = (f"Assets: {s['images_in'] / 1024:.0f} KB of photos → {s['images_stored'] / 1024:.0f} KB stored "
+                f"({s['dedup_hits']} duplicates)")
+        if s["cards_in"]:
+            line += f", cards {s['cards_in'] / 1024:.0f} → {s['cards_out'] / 1024:.0f} KB"
+        return line + f" — {s['saved'] / 1024:.0f} KB saved"
+
+
+def load_refs(run_dir):
+    """run_dir/assets.json: {"photos": {검색어: "../_assets/ab/ab12….jpg"}} (실행 디렉터리 기준 상대 경로)"""
+    try:
+        return json.loads((Path(run_dir) / REFS_NAME).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def save_refs(run_dir, refs):
+    path = Path(run_dir) / REFS_NAME
+    path.write_text(json.dumps(refs, ensure_ascii=False, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def resolve_ref(run_dir, ref):
+    """assets.json 참조 → 실제 파일 경로 (없으면 None)"""
+    if not ref:
+        return None
+    path = (Path(run_dir) / ref).resolve()
+    return path if path.exists() else None
+
+
+def relative_ref(run_dir, path):
+    return os.path.relpath(Path(path).resolve(), Path(run_dir).resolve())
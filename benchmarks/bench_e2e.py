@@ -0,0 +1,342 @@
+"""
+오프라인 end-to-end 벤치마크 (로컬 대역 서버, API 키 / 네트워크 불필요).
+
+Semantic Scholar / Gemini / Groq / Pexels를 standins.py 대역 서버로 바꾸고, 쪽수·Figure 수가 다른
+fixture PDF 3편(fixtures.py)으로 파이프라인 전체를 실행한 뒤 단계별 시간과 처리량을 저장된 기준값과 비교.
+임시 작업 디렉터리에서 실행되므로 저장소의 data/ · output/ · .cache/는 건드리지 않음.
+
+사용법:
+    python benchmarks/bench_e2e.py                          # main() 전체 (단계 병렬 파이프라인)
+    python benchmarks/bench_e2e.py --mode stages            # 논문마다 단계 함수를 하나씩 순서대로 (단계별 순수 비용)
+    python benchmarks/bench_e2e.py --skip-render            # Chromium 없는 환경: 렌더 단계는 출력 디렉터리만 만듦
+    python benchmarks/bench_e2e.py --latency 3 --inject-429 ss=3,pexels=4,gemini-2.5-flash-preview-05-20=2
+    python benchmarks/bench_e2e.py --save-baseline          # 결과를 baseline_e2e.json에 시나리오별로 저장
+
+렌더 단계에는 main.py와 마찬가지로 Playwright + Chromium이 필요.
+기준값은 측정한 기계에 따라 달라지므로, 비교는 같은 기계에서 저장한 기준값끼리 의미가 있음.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import re
+import shutil
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import fixtures  # noqa: E402
+from prompts import (PROMPT_ANALYSIS, PROMPT_CARDNEWS, PROMPT_VERIFY, PROMPT_VERIFY_CLAIMS,  # noqa: E402
+                     PROMPT_CARD_REVISION)
+from standins import StandinServer  # noqa: E402
+
+BASELINE_FILE = ROOT / "benchmarks" / "baseline_e2e.json"
+STAGES = ["extract", "analyze", "script", "verify", "render", "persist"]
+
+# 대역 서버 기본 지연 (--latency 배수로 조절): 실제 API 응답 시간의 대략적인 축소판
+LATENCY = {"ss": 0.15, "pexels": 0.10, "files": 0.05, "llm_chunk": 0.01}
+LLM_CHUNK_CHARS = 64
+
+# 프롬프트 두 번째 줄로 어느 프롬프트인지 구분 (첫 줄은 역할 소개라 겹침)
+PROMPT_KINDS = {template.splitlines()[1]: kind for kind, template in [
+    ("analysis", PROMPT_ANALYSIS), ("cardnews", PROMPT_CARDNEWS), ("verify", PROMPT_VERIFY),
+    ("verify_claims", PROMPT_VERIFY_CLAIMS), ("revision", PROMPT_CARD_REVISION)]}
+
+# 처리량 지표: True면 클수록 좋음
+HIGHER_IS_BETTER = {"papers_per_min": True, "cards_per_s": True}
+# 카드를 실제로 렌더링한 실행끼리만 의미가 있는 지표 (--skip-render나 렌더 없는 기준값과는 비교하지 않음)
+RENDER_METRICS = ("render_s", "cards", "cards_per_s")
+
+
+# ---------------------------------------------
+# 대역 LLM 응답: fixture 본문의 FINDINGS 수치를 그대로 사용 → 로컬 팩트체크 통과
+# ---------------------------------------------
+def canned_analysis(prompt):
+    figures = sorted(set(re.findall(r"figure_\d+_\d+\.png", prompt)))
+    return {
+        "hook_headline": "레이스 중 심박 172",
+        "hook_sub": "F1 드라이버의 심혈관 부담",
+        "category": "cardiovascular",
+        "why_it_matters": "레이스 내내 높은 심박이 유지됩니다. 체력 관리의 기준이 됩니다.",
+        "key_findings": [
+            {"finding_kr": f"발견 {i + 1}", "data_point": data_point, "original_quote": sentence,
+             "chart_type": "gauge"}
+            for i, (data_point, sentence) in enumerate(fixtures.FINDINGS)
+        ],
+        "wow_fact": "레이스 평균 심박 172 bpm",
+        "practical_implication": "심폐 지구력 훈련이 필요합니다. 냉각 전략도 중요합니다.",
+        "citation_apa": "Stand-in, A. (2024). Bench paper. Bench Journal.",
+        "pexels_search": {
+            "cover_keywords": ["race car cockpit", "motorsport track", "racing helmet"],
+            "context_keywords": ["heart rate monitor", "athlete training"],
+            "implication_keywords": ["endurance training", "sports science lab"],
+        },
+        "figure_selection": {
+            "use_paper_figures": bool(figures), "reason": "fixture",
+            "selected_figures": figures[:1], "figure_captions": ["시뮬레이터 데이터"][:len(figures[:1])],
+        },
+        "difficulty": "beginner",
+    }
+
+
+def canned_cardnews(prompt):
+    match = re.search(r"사용 가능 Figure: .*?(figure_\d+_\d+\.png)", prompt)
+    finding_visual = ({"visual_source": "paper_figure", "figure_file": match.group(1),
+                       "figure_caption": "시뮬레이터 텔레메트리"} if match
+                      else {"visual_source": "css_chart"})
+    return {
+        "cards": [
+            {"card_num": 1, "type": "cover", "headline": "심박 172", "subheadline": "F1 드라이버의 심장",
+             "badge": "CARDIOVASCULAR", "visual_source": "pexels", "pexels_query": "race car cockpit"},
+            {"card_num": 2, "type": "context", "headline": "연구 배경", "body_lines": ["시뮬레이터", "레이스 거리", "1 Hz 측정"],
+             "visual_source": "pexels", "pexels_query": "heart rate monitor"},
+            dict({"card_num": 3, "type": "finding", "headline": "평균 심박", "stat_big": "172 BPM",
+                  "stat_label": "레이스 평균", "body": "레이스 내내 높은 심박",
+                  "chart_data": {"label": "심박", "value": 172, "max": 200, "unit": "bpm"}}, **finding_visual),
+            {"card_num": 4, "type": "finding", "headline": "체온 상승", "stat_big": "1.4°C", "stat_label": "심부 체온",
+             "body": "포메이션 랩부터 결승까지", "visual_source": "css_chart",
+             "chart_data": {"label": "체온", "value": 1.4, "max": 3, "unit": "°C"}},
+            {"card_num": 5, "type": "finding", "headline": "목 근지구력", "stat_big": "25%", "stat_label": "감소",
+             "body": "시뮬레이션 스틴트 후", "visual_source": "css_chart",
+             "chart_data": {"label": "지구력 감소", "value": 25, "max": 100, "unit": "%"}},
+            {"card_num": 6, "type": "implication", "headline": "실전 적용", "points": ["심폐 훈련", "냉각 전략", "목 강화"],
+             "closing_line": "체력이 곧 랩타임", "visual_source": "pexels", "pexels_query": "endurance training"},
+            {"card_num": 7, "type": "closing", "citation": "Stand-in, A. (2024). Bench paper. Bench Journal.",
+             "doi_url": "https://doi.org/10.5555/placeholder", "license": "CC-BY 4.0",
+             "brand_tag": "F1 SCIENCE BITES", "hashtags": ["#F1생리학", "#F1Science"], "visual_source": "none"},
+        ],
+        "instagram_caption": "F1 드라이버의 심박은 레이스 평균 172 bpm. #F1생리학 #F1Science",
+    }
+
+
+def completions(prompt):
+    kind = PROMPT_KINDS.get(prompt.splitlines()[1] if "\n" in prompt else "")
+    if kind == "analysis":
+        body = canned_analysis(prompt)
+    elif kind == "cardnews":
+        body = canned_cardnews(prompt)
+    elif kind in ("verify", "verify_claims"):
+        body = {"checks": [], "verdict": "APPROVED", "revision_instructions": ""}
+    elif kind == "revision":
+        body = {"cards": []}
+    else:
+        body = {}
+    return json.dumps(body, ensure_ascii=False, indent=2)
+
+
+# ---------------------------------------------
+# 시나리오 준비 / 실행
+# ---------------------------------------------
+def parse_429(spec):
+    """"ss=3,gemini-2.5-flash-preview-05-20=2" → {이름: N} (N번째 요청마다 429)"""
+    out = {}
+    for part in (spec or "").split(","):
+        name, _, every = part.partition("=")
+        if name.strip() and every.strip().isdigit():
+            out[name.strip()] = int(every)
+    return out
+
+
+def scenario_name(args):
+    name = args.mode + ("-norender" if args.skip_render else "")
+    if args.latency != 1:
+        name += f"-latency{args.latency:g}"
+    if args.inject_429:
+        name += "-429"
+    return name
+
+
+def start_standins(workdir, args):
+    papers = fixtures.build_papers(workdir / "fixtures")
+    photos = fixtures.build_photos()
+    files = {p["path"].name: p["path"].read_bytes() for p in papers}
+    files.update(photos)
+    throttles = parse_429(args.inject_429)
+
+    services = {name: {"delay": LATENCY[name] * args.latency, "every_429": throttles.get(name)}
+                for name in ("ss", "pexels", "files")}
+    models = {name: {"every_429": every} for name, every in throttles.items() if name not in services}
+    server = StandinServer(completions, models=models, services=services, files=files, photos=list(photos),
+                           default={"mode": "ok", "chunk": LLM_CHUNK_CHARS,
+                                    "delay": LATENCY["llm_chunk"] * args.latency}).start()
+    server.papers = [{
+        "paperId": f"bench-{p['name']}", "title": f"Bench paper ({p['name']}, {p['pages']} pages)",
+        "authors": [{"name": "A. Stand-in"}, {"name": "B. Fixture"}], "year": 2024, "venue": "Bench Journal",
+        "externalIds": {"DOI": f"10.5555/f1bench.{p['name']}"}, "citationCount": 100 - i,
+        "openAccessPdf": {"url": server.url(p["path"].name), "status": "GOLD"},
+        "abstract": fixtures.FINDINGS[0][1],
+    } for i, p in enumerate(papers)]
+    return server, papers
+
+
+def prepare_workdir(workdir, server, args, paper_count):
+    """임시 작업 디렉터리 + 대역 서버를 가리키는 환경변수 (main import 전에 설정해야 함)"""
+    (workdir / "data").mkdir(parents=True, exist_ok=True)
+    shutil.copy(ROOT / "data" / "queries.json", workdir / "data" / "queries.json")
+    (workdir / "templates").symlink_to(ROOT / "templates", target_is_directory=True)
+    os.environ.update({
+        "GEMINI_API_KEY": "standin", "GROQ_API_KEY": "standin", "PEXELS_API_KEY": "standin",
+        "SEMANTIC_SCHOLAR_API_KEY": "standin",
+        "GEMINI_API_BASE": f"{server.base}/v1beta", "GROQ_API_BASE": f"{server.base}/openai/v1",
+        "PEXELS_API_BASE": f"{server.base}/v1", "SS_API_BASE": f"{server.base}/graph/v1",
+        "F1_CACHE_DIR": str(workdir / ".cache"), "METRICS_FILE": str(workdir / "metrics.prom"),
+        "MAX_PAPERS_PER_RUN": str(paper_count),
+    })
+    if not args.real_limits:
+        os.environ["SS_RATE_LIMIT"] = "1000"
+    os.chdir(workdir)
+
+
+def run_stages(pipeline, telemetry):
+    """논문마다 단계 함수를 순서대로 직접 호출 (단계 사이 겹침 없음)"""
+    with telemetry.span("search"):
+        papers = pipeline.search_papers()
+    try:
+        for paper in papers:
+            job = {"paper": paper, "doi": paper["doi"], "title": paper.get("title", "Unknown")}
+            pipeline.get_state_store().queue(job["doi"], job["title"])
+            for name in STAGES:
+                try:
+                    job = pipeline.tracked(name, getattr(pipeline, f"stage_{name}"))(job)
+                except Exception as e:
+                    pipeline.on_stage_error(name, job, e)
+                    job = None
+                if job is None:
+                    break
+    finally:
+        if pipeline.RENDER_SERVICE is not None:
+            pipeline.RENDER_SERVICE.close()
+
+
+def dir_bytes(path):
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def collect(pipeline, telemetry, http_client, papers, wall):
+    report = telemetry.run_report()
+    totals = report["totals"]
+    counters = report["counters"]
+    state = pipeline.get_state_store()
+    done = sum(1 for p in papers if (state.get(f"10.5555/f1bench.{p['name']}") or {}).get("status") == "done")
+    cards = counters.get("cards{result=rendered}", 0)
+    render_s = totals.get("stage.render", {}).get("seconds", 0.0)
+    downloaded = sum(s["bytes"] for s in http_client.stats().values())
+    output = dir_bytes(pipeline.OUTPUT_DIR) if pipeline.OUTPUT_DIR.exists() else 0
+    metrics = {
+        "wall_s": round(wall, 3),
+        "papers": done,
+        "papers_per_min": round(done / wall * 60, 3) if wall else 0.0,
+        "cards": cards,
+        "cards_per_s": round(cards / render_s, 3) if render_s else 0.0,
+        "download_mb_per_paper": round(downloaded / max(done, 1) / 2 ** 20, 3),
+        "output_mb_per_paper": round(output / max(done, 1) / 2 ** 20, 3),
+        "llm_calls": sum(v for k, v in counters.items() if k.startswith("llm_calls{")),
+        "search_s": totals.get("search", {}).get("seconds", 0.0),
+    }
+    for name in STAGES:
+        metrics[f"{name}_s"] = totals.get(f"stage.{name}", {}).get("seconds", 0.0)
+    return metrics
+
+
+def print_comparison(scenario, metrics, baseline):
+    rendered = bool(metrics.get("cards")) and bool(baseline and baseline.get("cards"))
+    print(f"\n{'metric':<24} {'now':>10} {'baseline':>10} {'change':>8}   [{scenario}]")
+    for key, value in metrics.items():
+        base = baseline.get(key) if baseline else None
+        change = ""
+        if key in RENDER_METRICS and not rendered:
+            change = "n/c"
+        elif isinstance(base, (int, float)) and base and isinstance(value, (int, float)):
+            delta = (value - base) / base * 100
+            better = delta > 0 if HIGHER_IS_BETTER.get(key) else delta < 0
+            change = f"{delta:+.0f}%" + (" ✓" if better and abs(delta) >= 5 else " ✗" if abs(delta) >= 5 else "")
+        print(f"{key:<24} {value:>10} {base if base is not None else '-':>10} {change:>8}")
+    if not baseline:
+        print(f"(no stored baseline for '{scenario}' — run with --save-baseline)")
+    if not rendered:
+        side = "this run" if not metrics.get("cards") else f"baseline '{scenario}'"
+        print(f"(n/c: render metrics {', '.join(RENDER_METRICS)} NOT compared — {side} rendered no cards; "
+              f"record a render baseline with --save-baseline on a machine with Chromium)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--mode", choices=["main", "stages"], default="main",
+                        help="main: run main() (overlapping stages); stages: call each stage function in turn")
+    parser.add_argument("--skip-render", action="store_true", help="skip card capture (no Chromium needed)")
+    parser.add_argument("--latency", type=float, default=1.0, help="multiply stand-in latencies")
+    parser.add_argument("--inject-429", default="", help="name=N: every Nth request gets 429 (ss, pexels, files, "
+                                                         "or an LLM model name)")
+    parser.add_argument("--real-limits", action="store_true", help="keep production SS/LLM rate limits")
+    parser.add_argument("--save-baseline", action="store_true", help=f"store results in {BASELINE_FILE.name}")
+    parser.add_argument("--verbose", action="store_true", help="show pipeline output")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary working directory")
+    args = parser.parse_args()
+
+    scenario = scenario_name(args)
+    workdir = Path(tempfile.mkdtemp(prefix="f1-e2e-"))
+    server, papers = start_standins(workdir, args)
+    print(f"stand-ins at {server.base}; fixtures: "
+          + ", ".join(f"{p['name']} {p['pages']}p/{p['figures']}fig/{p['bytes'] // 1024}KB" for p in papers))
+    prepare_workdir(workdir, server, args, len(papers))
+
+    import http_client
+    import main as pipeline
+    import telemetry
+    from ratelimit import TokenBucket
+
+    if not args.real_limits:
+        pipeline.LLM_BUCKETS = {name: TokenBucket(1000, 1000) for name in pipeline.LLM_BUCKETS}
+    if args.skip_render:
+        def stage_render(job):
+            job["output_dir"] = pipeline.OUTPUT_DIR / f"bench_{pipeline.safe_doi_name(job['doi'])}"
+            job["output_dir"].mkdir(parents=True, exist_ok=True)
+            job["cards"] = []
+            return job
+        pipeline.stage_render = stage_render
+
+    log_path = workdir / "pipeline.log"
+    started = time.perf_counter()
+    with open(log_path, "w", encoding="utf-8") as log, \
+            contextlib.redirect_stdout(sys.stdout if args.verbose else log):
+        if args.mode == "main":
+            pipeline.main()
+        else:
+            run_stages(pipeline, telemetry)
+    wall = time.perf_counter() - started
+    server.stop()
+
+    metrics = collect(pipeline, telemetry, http_client, papers, wall)
+    print(f"{len(server.requests)} stand-in requests")
+    print(telemetry.slowest(8))
+
+    stored = json.loads(BASELINE_FILE.read_text()) if BASELINE_FILE.exists() else {}
+    print_comparison(scenario, metrics, stored.get(scenario, {}).get("metrics"))
+    if args.save_baseline:
+        stored[scenario] = {"recorded_at": datetime.now().isoformat(timespec="seconds"),
+                            "machine": f"{platform.system()} {platform.machine()}, {os.cpu_count()} CPUs, "
+                                       f"Python {platform.python_version()}",
+                            "metrics": metrics}
+        BASELINE_FILE.write_text(json.dumps(stored, indent=2, sort_keys=True) + "\n")
+        print(f"Baseline '{scenario}' saved to {BASELINE_FILE}")
+
+    os.chdir(ROOT)
+    if metrics["papers"] < len(papers):
+        print(f"⚠️ only {metrics['papers']}/{len(papers)} papers finished — see {log_path}")
+        sys.exit(1)
+    if args.keep:
+        print(f"Working directory kept: {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
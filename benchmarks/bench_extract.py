@@ -0,0 +1,136 @@
+"""
+PDF 추출 벤치마크: 기존 2-라이브러리 경로(pdfplumber 텍스트 + fitz Figure)
+vs. pdf_engine 단일 패스.
+
+사용법:
+    python benchmarks/bench_extract.py                 # 처리 완료된 DOI(data/state.db, 없으면 processed_papers.json) 중 저장소에 있는 PDF
+    python benchmarks/bench_extract.py --fetch         # 저장소에 없으면 Semantic Scholar에서 OA PDF를 받아옴
+    python benchmarks/bench_extract.py a.pdf b.pdf     # 임의의 PDF 파일
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from pdf_engine import extract_document  # noqa: E402
+from pdf_store import PdfStore  # noqa: E402
+
+STATE_DB = ROOT / "data" / "state.db"
+HISTORY_FILE = ROOT / "data" / "processed_papers.json"
+STORE_DIR = ROOT / ".cache" / "pdfs"
+
+
+def legacy_extract(pdf_path, fig_dir):
+    """리팩터링 전 main.download_and_extract()의 추출 경로 그대로"""
+    import fitz
+    import pdfplumber
+
+    with pdfplumber.open(pdf_path) as pdf:
+        pages_text = []
+        for page in pdf.pages[:25]:
+            pt = page.extract_text()
+            if pt:
+                pages_text.append(pt)
+        text = "\n".join(pages_text)
+
+    figures = []
+    doc = fitz.open(pdf_path)
+    for page_num in range(min(len(doc), 25)):
+        page = doc[page_num]
+        for img_idx, img in enumerate(page.get_images(full=True)):
+            try:
+                pix = fitz.Pixmap(doc, img[0])
+                if pix.n >= 5:
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                if pix.width >= 300 and pix.height >= 200:
+                    fname = f"figure_{page_num}_{img_idx}.png"
+                    pix.save(str(Path(fig_dir) / fname))
+                    figures.append(fname)
+            except Exception:
+                continue
+    doc.close()
+    return text, figures
+
+
+def done_dois():
+    """처리 완료 DOI 목록. 벤치마크는 실행 상태를 바꾸지 않음: state.db는 읽기 전용으로 열고,
+    아직 없으면 예전 processed_papers.json을 마이그레이션 없이 그대로 읽음"""
+    import json
+    from state_store import StateStore
+
+    if STATE_DB.exists():
+        return StateStore(STATE_DB, readonly=True).done_dois()
+    if HISTORY_FILE.exists():
+        return json.loads(HISTORY_FILE.read_text())
+    return []
+
+
+def resolve_pdfs(fetch):
+    """처리 완료 DOI → 로컬 PDF 경로 목록"""
+    import http_client
+
+    store = PdfStore(STORE_DIR)
+    paths = []
+    for doi in done_dois():
+        path = store.lookup(doi)
+        if path is None and fetch:
+            try:
+                resp = http_client.get(
+                    f"https://api.semanticscholar.org/graph/v1/paper/DOI:{doi}",
+                    params={"fields": "openAccessPdf"}, timeout=15)
+                url = ((resp.json() if resp.status_code == 200 else {}).get("openAccessPdf") or {}).get("url")
+                if url:
+                    path = store.fetch(doi, url)
+                time.sleep(1.0)
+            except Exception as e:
+                print(f"[WARN] {doi}: {e}")
+        if path:
+            paths.append(path)
+    return paths
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("pdfs", nargs="*", type=Path)
+    parser.add_argument("--fetch", action="store_true", help="download missing PDFs via Semantic Scholar")
+    parser.add_argument("--workers", type=int, default=None, help="pdf_engine process count")
+    args = parser.parse_args()
+
+    pdfs = args.pdfs or resolve_pdfs(args.fetch)
+    if not pdfs:
+        print("No PDFs to benchmark (try --fetch or pass paths).")
+        return
+
+    print(f"{'pdf':<28} {'legacy s':>9} {'engine s':>9} {'speedup':>8} {'chars L/E':>15} {'figs L/E':>9} "
+          f"{'pages':>7} {'stop':>6} {'RSS MB':>6}")
+    total_legacy = total_engine = 0.0
+    for pdf in pdfs:
+        with tempfile.TemporaryDirectory() as d1, tempfile.TemporaryDirectory() as d2:
+            t_legacy, (text_l, figs_l) = timed(legacy_extract, str(pdf), d1)
+            t_engine, (text_e, figs_e, stats) = timed(
+                lambda p, d: extract_document(p, d, workers=args.workers), str(pdf), d2)
+        total_legacy += t_legacy
+        total_engine += t_engine
+        print(f"{Path(pdf).name[:28]:<28} {t_legacy:>9.2f} {t_engine:>9.2f} "
+              f"{t_legacy / max(t_engine, 1e-9):>7.1f}x {len(text_l):>7}/{len(text_e):<7} "
+              f"{len(figs_l):>4}/{len(figs_e):<4} "
+              f"{stats['pages_parsed']:>3}/{stats['pages_available']:<3} {stats['stopped']:>6} "
+              f"{stats['peak_rss_mb']:>6.0f}")
+
+    print(f"\nTOTAL {len(pdfs)} PDFs: legacy {total_legacy:.2f}s, engine {total_engine:.2f}s "
+          f"({total_legacy / max(total_engine, 1e-9):.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+"""
+LLM 스트리밍 벤치마크 (로컬 대역 서버, API 키 불필요).
+
+    python benchmarks/bench_llm_stream.py
+
+시나리오
+  1) 비스트리밍 vs 스트리밍: 전체 응답 시간, pexels_search 키가 도착한 시점
+  2) 1순위 모델이 잘린 JSON을 보낼 때: 스트림 도중 실패 → 다음 제공자로 넘어가는 시간
+  3) 1순위 모델이 깨진 JSON을 보낼 때: 첫 구조 오류에서 즉시 실패하는지
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+from standins import StandinServer  # noqa: E402
+
+
+def sample_analysis():
+    """output/ 아카이브의 실제 분석 JSON 하나를 응답 본문으로 사용"""
+    for meta in sorted((ROOT / "output").glob("*/metadata.json")):
+        analysis = json.loads(meta.read_text()).get("analysis")
+        if analysis:
+            return json.dumps(analysis, ensure_ascii=False, indent=2)
+    return json.dumps({"hook_headline": "테스트", "pexels_search": {"cover_keywords": ["race car"]}})
+
+
+def run(main, label, streaming, prompt):
+    main.LLM_STREAMING = streaming
+    main.LLM_ROUTER = None
+    first_key = {}
+    started = time.perf_counter()
+
+    def on_key(key, _value):
+        first_key.setdefault(key, time.perf_counter() - started)
+
+    try:
+        text = main.call_llm(prompt, stage=label, on_key=on_key)
+        ok = bool(main.parse_json_response(text))
+    except Exception as e:
+        print(f"   ({label}: {e})")
+        ok = False
+    total = time.perf_counter() - started
+    pexels_at = first_key.get("pexels_search")
+    print(f"{label:<34} total {total:6.2f}s   pexels_search at "
+          f"{(f'{pexels_at:.2f}s' if pexels_at is not None else '-'):>7}   parsed={ok}")
+    return total
+
+
+def main():
+    body = sample_analysis()
+    server = StandinServer(lambda prompt: body, default={"mode": "ok", "chunk": 48, "delay": 0.02}).start()
+
+    workdir = Path(tempfile.mkdtemp(prefix="f1bench-"))
+    os.environ.update({
+        "GEMINI_API_KEY": "standin", "GROQ_API_KEY": "standin",
+        "GEMINI_API_BASE": f"{server.base}/v1beta", "GROQ_API_BASE": f"{server.base}/openai/v1",
+        "F1_CACHE_DIR": str(workdir),
+    })
+    import main as pipeline
+    from ratelimit import TokenBucket
+    # call_llm이 호출 수를 state.db에 기록하므로 저장소의 data/ 대신 임시 디렉터리 사용
+    pipeline.STATE_DB = workdir / "state.db"
+    pipeline.HISTORY_FILE = workdir / "processed_papers.json"
+    pipeline.LLM_BUCKETS = {name: TokenBucket(1000, 1000) for name in pipeline.LLM_BUCKETS}
+
+    print(f"response body: {len(body)} chars, stand-in at {server.base}\n")
+    run(pipeline, "non-streaming", False, "p-1")
+    run(pipeline, "streaming", True, "p-2")
+
+    primary = "gemini-2.5-flash-preview-05-20"
+    server.models[primary] = {"mode": "truncate"}
+    run(pipeline, "non-streaming, primary truncated", False, "p-3")
+    run(pipeline, "streaming, primary truncated", True, "p-4")
+
+    server.models[primary] = {"mode": "malformed"}
+    run(pipeline, "streaming, primary malformed", True, "p-5")
+
+    server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,153 @@
+"""
+카드 렌더링 벤치마크: 카드마다 문서 1개(set_content + 화면 캡처) vs. 논문당 일괄 문서 1개(한 번 로드 + .card 요소별 캡처).
+
+bench_e2e와 같은 7장 카드 스크립트와 fixture 사진/Figure로 합성 논문 여러 편을 만들고, 두 방식으로 번갈아
+렌더링해 논문당 시간과 cards/s를 비교. 끝에 같은 카드끼리 픽셀을 비교해 두 방식의 출력이 같은지 확인.
+임시 작업 디렉터리에서 실행되므로 저장소의 output/ · .cache/는 건드리지 않음. Playwright + Chromium 필요.
+
+사용법:
+    python benchmarks/bench_render.py                     # 논문 3편 × 3회
+    python benchmarks/bench_render.py --papers 10 --rounds 5 --pages 2
+    python benchmarks/bench_render.py --keep              # 렌더링 결과 디렉터리 남기기
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+sys.path.insert(0, str(ROOT / "benchmarks"))
+
+import fixtures  # noqa: E402
+from bench_e2e import canned_analysis, canned_cardnews  # noqa: E402
+
+MODES = {"per-card": False, "batch": True}
+
+
+def prepare_papers(workdir, count):
+    """합성 논문 count편: (cardnews, analysis, figures_dir, 배경 사진 {검색어: 저장소 경로})"""
+    import main
+
+    photos = list(fixtures.build_photos().values())
+    figures_dir = workdir / "figures"
+    figures_dir.mkdir()
+    (figures_dir / "figure_0_0.png").write_bytes(fixtures.noise_image(960, 640, 7))
+
+    papers = []
+    for i in range(count):
+        cardnews = canned_cardnews("사용 가능 Figure: figure_0_0.png" if i % 2 == 0 else "")
+        queries = sorted({c["pexels_query"] for c in cardnews["cards"] if c.get("pexels_query")})
+        stored = {query: main.ASSET_STORE.put_image(photos[(i + n) % len(photos)])
+                  for n, query in enumerate(queries)}
+        papers.append((cardnews, canned_analysis(""), figures_dir, stored))
+    return papers
+
+
+def render_paper(main, paper, output_dir):
+    """출력 디렉터리에 배경 사진 참조를 미리 기록하고 네트워크 없이 렌더링 → 걸린 시간(초)"""
+    cardnews, analysis, figures_dir, stored = paper
+    output_dir.mkdir(parents=True)
+    main.save_refs(output_dir, {"photos": {query: {"asset": main.relative_ref(output_dir, path)}
+                                           for query, path in stored.items()}})
+    started = time.perf_counter()
+    rendered, _, failed = main.render_cards(cardnews, analysis, figures_dir, output_dir, fetch_photos=False)
+    seconds = time.perf_counter() - started
+    if failed or not rendered:
+        raise RuntimeError(f"{output_dir.name}: {rendered} rendered, {failed} failed")
+    return seconds
+
+
+def compare_outputs(per_card_dir, batch_dir):
+    """같은 이름의 카드 이미지끼리 픽셀 비교 → (카드 수, 다른 카드 수, 최대 채널 차이)"""
+    from PIL import Image, ImageChops
+
+    cards = differing = worst = 0
+    for path in sorted(per_card_dir.glob("card_*.png")):
+        other = batch_dir / path.name
+        with Image.open(path) as a, Image.open(other) as b:
+            cards += 1
+            if a.size != b.size:
+                differing += 1
+                worst = 255
+                continue
+            extrema = ImageChops.difference(a.convert("RGB"), b.convert("RGB")).getextrema()
+            diff = max(high for _, high in extrema)
+            differing += 1 if diff else 0
+            worst = max(worst, diff)
+    return cards, differing, worst
+
+
+def run_rounds(main, papers, rounds, workdir):
+    """두 방식을 번갈아(라운드마다 순서 반대) 렌더링 → {mode: [논문별 시간]}"""
+    seconds = {mode: [] for mode in MODES}
+    # 브라우저 시작 + 첫 로드 비용은 비교에서 제외
+    main.RENDER_BATCH = False
+    render_paper(main, papers[0], workdir / "warmup")
+    try:
+        for round_num in range(rounds):
+            order = list(MODES) if round_num % 2 == 0 else list(reversed(MODES))  # 순서 효과 상쇄
+            for mode in order:
+                main.RENDER_BATCH = MODES[mode]
+                for i, paper in enumerate(papers):
+                    seconds[mode].append(render_paper(main, paper, workdir / f"{mode}_r{round_num}_{i}"))
+    finally:
+        if main.RENDER_SERVICE is not None:
+            main.RENDER_SERVICE.close()
+    return seconds
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--papers", type=int, default=3, help="synthetic papers per round")
+    parser.add_argument("--rounds", type=int, default=3, help="alternating rounds per mode")
+    parser.add_argument("--pages", type=int, default=None, help="render pages (default: main.RENDER_PAGES)")
+    parser.add_argument("--verbose", action="store_true", help="show render output")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary working directory")
+    args = parser.parse_args()
+
+    workdir = Path(tempfile.mkdtemp(prefix="f1-render-"))
+    (workdir / "templates").symlink_to(ROOT / "templates", target_is_directory=True)
+    os.environ.update({"F1_CACHE_DIR": str(workdir / ".cache"), "CARD_FORMAT": "png"})
+    os.chdir(workdir)
+
+    import main
+
+    if args.pages:
+        main.RENDER_PAGES = args.pages
+    papers = prepare_papers(workdir, args.papers)
+    cards_per_paper = len(papers[0][0]["cards"])
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if args.verbose else devnull):
+        seconds = run_rounds(main, papers, args.rounds, workdir)
+
+    print(f"{args.papers} papers × {args.rounds} rounds, {cards_per_paper} cards/paper, "
+          f"{main.RENDER_PAGES} pages")
+    print(f"{'mode':<10} {'ms/paper':>10} {'p95 ms':>8} {'cards/s':>8}")
+    for mode, values in seconds.items():
+        p95 = sorted(values)[max(0, int(len(values) * 0.95) - 1)]
+        rate = cards_per_paper * len(values) / sum(values)
+        print(f"{mode:<10} {statistics.median(values) * 1000:>10.0f} {p95 * 1000:>8.0f} {rate:>8.2f}")
+    speedup = statistics.median(seconds["per-card"]) / statistics.median(seconds["batch"])
+    print(f"batch speedup (median): {speedup:.2f}x")
+
+    cards, differing, worst = 0, 0, 0
+    for i in range(args.papers):
+        result = compare_outputs(workdir / f"per-card_r0_{i}", workdir / f"batch_r0_{i}")
+        cards, differing, worst = cards + result[0], differing + result[1], max(worst, result[2])
+    print(f"pixel check: {differing}/{cards} cards differ (max channel difference {worst})")
+
+    os.chdir(ROOT)
+    if args.keep:
+        print(f"Working directory kept: {workdir}")
+    else:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
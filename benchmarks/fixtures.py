@@ -0,0 +1,92 @@
+"""
+벤치마크용 합성 fixture: 쪽수 / Figure 수가 다른 논문 PDF와 Pexels 대역 사진 (PyMuPDF로 생성, 시드 고정).
+
+논문 본문에는 FINDINGS 문장이 Results 절에 들어가므로, 대역 LLM이 돌려주는 수치가
+로컬 팩트체크(fact_check.verify_locally)를 그대로 통과함.
+"""
+
+import random
+from pathlib import Path
+
+# (이름, 쪽수, Figure 수)
+PAPERS = [
+    ("short", 6, 0),
+    ("medium", 14, 2),
+    ("long", 30, 6),
+]
+
+# (data_point, 원문 문장) — 카드 수치의 출처
+FINDINGS = [
+    ("172 bpm", "Mean heart rate across the race distance was 172 bpm in the driver cohort."),
+    ("1.4 °C", "Core body temperature increased by 1.4 °C from the formation lap to the chequered flag."),
+    ("25%", "Neck flexor endurance declined by 25% after the simulated race stint."),
+]
+
+SECTIONS = ["Abstract", "Introduction", "Methods", "Results", "Discussion", "References"]
+FILLER = ("Drivers completed a {n}-lap protocol on a motion simulator while cardiovascular, thermal and "
+          "neuromuscular responses were sampled at 1 Hz; ambient conditions were held at 31 °C.")
+LINES_PER_PAGE = 48
+
+
+def noise_image(width, height, seed, fmt="png", spread=64):
+    """시드 고정 노이즈 이미지 bytes. spread(밝기 폭)로 압축률 조절 → 실제 사진/도표와 비슷한 크기"""
+    import fitz
+
+    rng = random.Random(seed)
+    base = rng.randrange(40, 160)
+    table = bytes((base + (i % spread)) for i in range(256))
+    samples = rng.randbytes(width * height * 3).translate(table)
+    pix = fitz.Pixmap(fitz.csRGB, width, height, samples, 0)
+    if fmt == "jpg":
+        return pix.tobytes("jpg", jpg_quality=85)
+    return pix.tobytes("png")
+
+
+def build_paper(path, pages, figures, seed=0):
+    """pages쪽 PDF: 절 제목 + 본문 줄 + Results 절의 FINDINGS 문장 + 앞쪽 페이지부터 Figure 1개씩"""
+    import fitz
+
+    doc = fitz.open()
+    headings = {round(i * (pages - 1) / (len(SECTIONS) - 1)): name for i, name in enumerate(SECTIONS)}
+    section = SECTIONS[0]
+    for page_num in range(pages):
+        page = doc.new_page()
+        y = 56
+        if page_num in headings:
+            section = headings[page_num]
+            page.insert_text((56, y), section, fontsize=14)
+            y += 24
+        if page_num < figures:
+            rect = fitz.Rect(56, y, 56 + 360, y + 240)
+            page.insert_image(rect, stream=noise_image(480, 320, seed * 100 + page_num))
+            page.insert_text((56, rect.y1 + 14), f"Figure {page_num + 1}. Simulator telemetry, stint {page_num + 1}.",
+                             fontsize=8)
+            y = rect.y1 + 30
+        lines = [FILLER.format(n=page_num + j) for j in range(LINES_PER_PAGE)]
+        if section == "Results":
+            lines[:len(FINDINGS)] = [sentence for _, sentence in FINDINGS]
+        for line in lines:
+            if y > 800:
+                break
+            page.insert_text((56, y), line[:110], fontsize=7)
+            y += 11
+    doc.save(str(path), garbage=3, deflate=True)
+    doc.close()
+    return path
+
+
+def build_papers(out_dir):
+    """PAPERS 전체 → [{"name", "pages", "figures", "path", "bytes"}]"""
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    built = []
+    for seed, (name, pages, figures) in enumerate(PAPERS):
+        path = build_paper(out_dir / f"{name}.pdf", pages, figures, seed)
+        built.append({"name": name, "pages": pages, "figures": figures, "path": path,
+                      "bytes": path.stat().st_size})
+    return built
+
+
+def build_photos(count=3, width=1880, height=1253):
+    """Pexels large2x 크기의 JPEG 사진(약 300 KB) → {이름: bytes}"""
+    return {f"photo_{i}.jpg": noise_image(width, height, 1000 + i, fmt="jpg", spread=16) for i in range(count)}
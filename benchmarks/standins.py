@@ -0,0 +1,180 @@
+"""
+외부 API 로컬 대역(stand-in) 서버.
+
+Gemini(generateContent / streamGenerateContent SSE)와 Groq(chat/completions, SSE)를
+흉내 내며, 모델별로 지연·조각 크기·실패 방식(429, 잘림, 깨진 JSON)을 설정할 수 있음.
+Semantic Scholar 검색(/graph/v1/paper/search), Pexels 검색(/v1/search), 정적 파일(/files/…: PDF, 사진)도 제공.
+서비스("ss", "pexels", "files")별로 응답 지연과 N번째 요청마다 429 주입(every_429)을 설정할 수 있음.
+main.py는 GEMINI_API_BASE / GROQ_API_BASE / SS_API_BASE / PEXELS_API_BASE 환경변수로 이 서버를 가리키게 함.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class StandinServer:
+    """models: {모델명: {"mode": "ok|truncate|malformed|429", "chunk": int, "delay": 초, "every_429": N}}
+
+    services: {"ss" | "pexels" | "files": {"delay": 초, "every_429": N, "retry_after": 초}}
+    papers: Semantic Scholar 검색 결과로 돌려줄 논문 목록 (모든 검색어에 같은 결과)
+    files: {이름: bytes} → /files/<이름>. photos: Pexels 검색 결과로 돌려줄 /files/ 이름 목록
+    """
+
+    def __init__(self, completions, models=None, default=None, services=None, papers=None, files=None,
+                 photos=None):
+        self.completions = completions  # callable(prompt) → 응답 텍스트
+        self.models = models or {}
+        self.default = default or {"mode": "ok", "chunk": 64, "delay": 0.01}
+        self.services = services or {}
+        self.papers = papers or []
+        self.files = files or {}
+        self.photos = photos or []
+        self.requests = []
+        self._counts = {}
+        self._counts_lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+
+    @property
+    def base(self):
+        return f"http://127.0.0.1:{self._httpd.server_port}"
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def behaviour(self, model):
+        merged = dict(self.default)
+        merged.update(self.models.get(model, {}))
+        return merged
+
+    def url(self, name):
+        return f"{self.base}/files/{name}"
+
+    def throttled(self, key, cfg):
+        """cfg["every_429"]=N이면 key의 N번째 요청마다 True"""
+        every = cfg.get("every_429")
+        with self._counts_lock:
+            self._counts[key] = n = self._counts.get(key, 0) + 1
+        return bool(every) and n % every == 0
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                gemini = re.search(r"/models/([^:/]+):(generateContent|streamGenerateContent)", self.path)
+                if gemini:
+                    model, stream = gemini.group(1), gemini.group(2) == "streamGenerateContent"
+                    prompt = body["contents"][0]["parts"][0]["text"]
+                    flavour = "gemini"
+                elif self.path.endswith("/chat/completions"):
+                    model, stream = body.get("model", ""), bool(body.get("stream"))
+                    prompt = body["messages"][0]["content"]
+                    flavour = "groq"
+                else:
+                    self.send_error(404)
+                    return
+
+                server.requests.append({"model": model, "stream": stream, "at": time.time()})
+                cfg = server.behaviour(model)
+                if cfg["mode"] == "429" or server.throttled(model, cfg):
+                    self._send(429, b'{"error":"rate limited"}', {"Retry-After": str(cfg.get("retry_after", 30))})
+                    return
+
+                text = server.completions(prompt)
+                if cfg["mode"] == "truncate":
+                    text = text[:len(text) // 2]
+                elif cfg["mode"] == "malformed":
+                    text = text.replace("]", "}", 1)
+
+                if not stream:
+                    time.sleep(cfg["delay"] * max(1, len(text) // cfg["chunk"]))
+                    self._send(200, json.dumps(_wrap(flavour, text, final=True)).encode())
+                    return
+
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Connection", "close")
+                self.end_headers()
+                try:
+                    for i in range(0, len(text), cfg["chunk"]):
+                        time.sleep(cfg["delay"])
+                        event = _wrap(flavour, text[i:i + cfg["chunk"]], final=False)
+                        self.wfile.write(f"data: {json.dumps(event)}\n\n".encode())
+                        self.wfile.flush()
+                    if flavour == "groq":
+                        self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass  # 클라이언트가 스트림 도중 포기 (fail-fast)
+                self.close_connection = True
+
+            def do_GET(self):
+                path = urlsplit(self.path).path
+                if path.endswith("/paper/search"):
+                    service, payload = "ss", lambda: json.dumps(self._search_page()).encode()
+                    content_type = "application/json"
+                elif path.endswith("/search"):
+                    service, payload = "pexels", lambda: json.dumps({"photos": [
+                        {"id": i, "photographer": "Stand-in", "photographer_url": "", "url": server.url(name),
+                         "src": {"large2x": server.url(name)}} for i, name in enumerate(server.photos)]}).encode()
+                    content_type = "application/json"
+                elif path.startswith("/files/") and path[len("/files/"):] in server.files:
+                    data = server.files[path[len("/files/"):]]
+                    service, payload = "files", lambda: data
+                    content_type = "application/pdf" if path.endswith(".pdf") else "image/jpeg"
+                else:
+                    self.send_error(404)
+                    return
+
+                server.requests.append({"service": service, "path": path, "at": time.time()})
+                cfg = server.services.get(service, {})
+                time.sleep(cfg.get("delay", 0))
+                if server.throttled(service, cfg):
+                    self._send(429, b'{"error":"rate limited"}', {"Retry-After": str(cfg.get("retry_after", 1))})
+                    return
+                self._send(200, payload(), content_type=content_type)
+
+            def _search_page(self):
+                """offset / limit 페이지 + 더 남았으면 next (Semantic Scholar와 같은 형식)"""
+                params = parse_qs(urlsplit(self.path).query)
+                offset = int(params.get("offset", ["0"])[0])
+                limit = int(params.get("limit", ["10"])[0])
+                page = {"total": len(server.papers), "offset": offset,
+                        "data": server.papers[offset:offset + limit]}
+                if offset + limit < len(server.papers):
+                    page["next"] = offset + limit
+                return page
+
+            def _send(self, status, payload, headers=None, content_type="application/json"):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(payload)))
+                for k, v in (headers or {}).items():
+                    self.send_header(k, v)
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+def _wrap(flavour, text, final):
+    if flavour == "gemini":
+        return {"candidates": [{"content": {"parts": [{"text": text}]}}]}
+    if final:
+        return {"choices": [{"message": {"content": text}}]}
+    return {"choices": [{"delta": {"content": text}}]}
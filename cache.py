@@ -0,0 +1,130 @@
+"""
+F1 Science Card News — Disk Cache
+키(해시) → JSON 파일 1개. TTL, 크기 제한 LRU 축출, 조건부 재검증용 메타데이터 지원.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+
+def cache_key(*parts):
+    """임의의 JSON 직렬화 가능한 값들로부터 안정적인 sha256 키 생성"""
+    raw = json.dumps(parts, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class DiskCache:
+    """디렉터리 기반 JSON 캐시
+
+    - ttl: 초 단위 신선도 (None이면 만료 없음)
+    - max_entries / max_bytes: 초과 시 가장 오래 사용하지 않은 항목부터 삭제
+    - 항목마다 meta(ETag 등)를 함께 저장해 만료 후 조건부 요청에 사용
+    """
+
+    def __init__(self, root, ttl=None, max_entries=None, max_bytes=None):
+        self.root = Path(root)
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return self.root / f"{key}.json"
+
+    def lookup(self, key):
+        """(entry, fresh) 반환. 항목이 없으면 (None, False)"""
+        path = self._path(key)
+        try:
+            entry = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            with self._lock:
+                self.misses += 1
+            return None, False
+
+        age = time.time() - entry.get("stored_at", 0)
+        fresh = self.ttl is None or age < self.ttl
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if fresh:
+            try:
+                os.utime(path)  # LRU 순서 갱신
+            except OSError:
+                pass
+        return entry, fresh
+
+    def get(self, key):
+        """신선한 값만 반환, 없거나 만료면 None"""
+        entry, fresh = self.lookup(key)
+        return entry["value"] if fresh else None
+
+    def put(self, key, value, meta=None):
+        entry = {"stored_at": time.time(), "meta": meta or {}, "value": value}
+        self._write(key, entry)
+        self.evict()
+
+    def touch(self, key):
+        """조건부 요청이 304로 끝났을 때 stored_at만 갱신"""
+        entry, _ = self.lookup(key)
+        if entry is None:
+            return
+        entry["stored_at"] = time.time()
+        self._write(key, entry)
+        with self._lock:
+            self.revalidated += 1
+
+    def _write(self, key, entry):
+        self.root.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            raise
+
+    def evict(self):
+        """max_entries / max_bytes를 넘으면 mtime이 오래된 항목부터 삭제. 삭제 수 반환"""
+        if self.max_entries is None and self.max_bytes is None:
+            return 0
+        with self._lock:
+            files = []
+            for path in self.root.glob("*.json"):
+                try:
+                    st = path.stat()
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+            files.sort()
+
+            total = sum(size for _, size, _ in files)
+            removed = 0
+            while files and (
+                (self.max_entries is not None and len(files) > self.max_entries)
+                or (self.max_bytes is not None and total > self.max_bytes)
+            ):
+                _, size, path = files.pop(0)
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                total -= size
+                removed += 1
+            return removed
+
+    def summary(self):
+        return f"{self.hits} hits, {self.misses} misses, {self.revalidated} revalidated"
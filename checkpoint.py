@@ -0,0 +1,85 @@
+"""
+F1 Science Card News — Stage Checkpoints
+논문(DOI)마다 단계 결과를 .cache/checkpoints/<doi>/<단계>.json으로 남겨, 중간에 실패한 실행을
+마지막으로 끝난 단계 다음부터 이어서 처리 (이미 비용을 치른 추출·LLM 결과를 버리지 않음).
+
+    paper.json     검색 결과 (논문 메타데이터, PDF 주소)
+    extract.json   추출 본문 + Figure 목록
+    analyze.json   분석 JSON
+    script.json    카드 스크립트
+    verify.json    검증 결과 + 검증 후 카드 스크립트
+    render.json    출력 디렉터리 + 렌더링된 카드 파일
+"""
+
+import json
+import os
+import re
+import tempfile
+import time
+from pathlib import Path
+
+STAGES = ("extract", "analyze", "script", "verify", "render")
+
+
+def _dir_name(doi):
+    return re.sub(r"[^A-Za-z0-9]+", "-", doi).strip("-")[:80]
+
+
+class CheckpointStore:
+    def __init__(self, root):
+        self.root = Path(root)
+
+    def dir_for(self, doi):
+        return self.root / _dir_name(doi)
+
+    def _write(self, path, payload):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False, indent=2)
+        os.replace(tmp, path)
+
+    def _read(self, path):
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def save_paper(self, paper):
+        self._write(self.dir_for(paper["doi"]) / "paper.json", paper)
+
+    def load_paper(self, doi):
+        return self._read(self.dir_for(doi) / "paper.json")
+
+    def save(self, doi, stage, data):
+        """stage 결과 저장. 뒤 단계 체크포인트는 이 결과로 만든 게 아니므로 삭제"""
+        directory = self.dir_for(doi)
+        for later in STAGES[STAGES.index(stage) + 1:]:
+            (directory / f"{later}.json").unlink(missing_ok=True)
+        self._write(directory / f"{stage}.json", {"doi": doi, "stage": stage, "saved_at": time.time(),
+                                                  "data": data})
+
+    def load(self, doi, stage):
+        entry = self._read(self.dir_for(doi) / f"{stage}.json")
+        return entry.get("data") if isinstance(entry, dict) else None
+
+    def completed(self, doi):
+        """앞에서부터 연속으로 체크포인트가 있는 단계 목록"""
+        directory = self.dir_for(doi)
+        done = []
+        for stage in STAGES:
+            if not (directory / f"{stage}.json").exists():
+                break
+            done.append(stage)
+        return done
+
+    def dois(self):
+        """paper.json이 있는 DOI 전체 (디렉터리 이름순)"""
+        if not self.root.exists():
+            return []
+        dois = []
+        for path in sorted(self.root.glob("*/paper.json")):
+            paper = self._read(path)
+            if paper and paper.get("doi"):
+                dois.append(paper["doi"])
+        return dois
@@ -0,0 +1,211 @@
+"""
+F1 Science Card News — Local Fact Check
+PROMPT_VERIFY 기준 중 기계적으로 판단 가능한 항목(수치 대조, Pexels 금지어, Figure 라이선스, 출처)을
+LLM 호출 전에 규칙으로 검사. 규칙으로 결론 내지 못한 항목만 LLM 검증으로 넘김.
+"""
+
+import re
+
+# Pexels 검색어 금지어: 팀/브랜드/드라이버명 (소문자, 단어 경계로 검사)
+PEXELS_BLOCKLIST = {
+    "ferrari", "mercedes", "red bull", "redbull", "mclaren", "williams", "alpine", "aston martin",
+    "sauber", "haas", "alphatauri", "racing bulls", "renault", "honda", "audi", "cadillac",
+    "pirelli", "petronas", "oracle", "verstappen", "hamilton", "leclerc", "norris", "piastri",
+    "russell", "sainz", "alonso", "perez", "pérez", "stroll", "gasly", "ocon", "albon",
+    "tsunoda", "hulkenberg", "hülkenberg", "bottas", "zhou", "magnussen", "lawson",
+    "antonelli", "bearman", "colapinto", "bortoleto", "hadjar", "doohan", "ricciardo",
+    "vettel", "schumacher", "senna", "raikkonen", "räikkönen",
+}
+FALLBACK_PEXELS_QUERY = "motorsport racing car"
+ALLOWED_FIGURE_LICENSES = re.compile(r"\bCC[- ]?BY(?:[- ]SA)?\b(?![- ]?N[CD])", re.IGNORECASE)
+HEDGED_LICENSE = re.compile(r"likely|verify|unknown|check", re.IGNORECASE)
+CAUSAL_MARKERS = ("때문", "원인", "유발", "야기", "초래", "덕분", "causes", "leads to")
+
+_NUMBER_RE = re.compile(r"\d+(?:,\d{3})*(?:\.\d+)?")
+
+
+def numbers_in(text):
+    """문자열 속 수치 → [(원문 표기, float)]. 천 단위 쉼표 제거"""
+    found = []
+    for raw in _NUMBER_RE.findall(str(text or "")):
+        clean = raw.replace(",", "")
+        found.append((clean, float(clean)))
+    return found
+
+
+def number_index(paper_text):
+    """논문 본문에 등장하는 모든 수치 집합 (소수 6자리 반올림)"""
+    return {round(value, 6) for _, value in numbers_in(paper_text)}
+
+
+def _matches(raw, value, candidates):
+    """표기 자릿수만큼의 반올림 오차 허용: "170"은 170.4와, "12.5"는 12.54와 일치"""
+    decimals = len(raw.split(".")[1]) if "." in raw else 0
+    tolerance = 0.5 * 10 ** -decimals + 1e-9
+    return any(abs(value - c) <= tolerance for c in candidates)
+
+
+def _check(item, status, issue="", fix="", card_num=None):
+    return {"item": item, "card_num": card_num, "status": status, "issue": issue, "fix": fix}
+
+
+def verify_locally(analysis, cardnews, paper_text, license_str, doi):
+    """규칙 기반 검증 → (verification, claims)
+
+    verification: PROMPT_VERIFY 응답과 같은 형식 {checks, verdict, revision_instructions}.
+    claims(규칙으로 판단 못 한 항목)는 verdict와 상관없이 LLM이 마저 검증해야 함 — 해당 check는 UNRESOLVED.
+    verdict는 규칙 FAIL이 있으면 REVISION_NEEDED, claims만 남았으면 None.
+    Pexels 금지어 / DOI 링크 / 문자열 chart 값처럼 답이 하나인 문제는 cardnews를 직접 고치고 PASS로 기록.
+    """
+    checks, claims = [], []
+    cards = cardnews.get("cards", [])
+    data_points = [value for f in analysis.get("key_findings", [])
+                   for _, value in numbers_in(f.get("data_point", ""))]
+    paper_numbers = number_index(paper_text)
+
+    for finding in analysis.get("key_findings", []):
+        for raw, value in numbers_in(finding.get("data_point", "")):
+            if not _matches(raw, value, paper_numbers):
+                claims.append({"item": "data_point 원문 일치", "card_num": None,
+                               "claim": finding.get("data_point", ""), "quote": finding.get("original_quote", ""),
+                               "reason": f"{raw} not found in extracted paper text"})
+
+    for card in cards:
+        if card.get("type") == "finding":
+            _check_finding_numbers(card, data_points, paper_numbers, checks, claims)
+        _check_causal_language(card, claims)
+
+    checks.append(_check_pexels(cards))
+    checks.append(_check_figure_license(cards, license_str, claims))
+    checks.append(_check_citation(cards, analysis, doi))
+
+    failed = [c for c in checks if c["status"] == "FAIL"]
+    if failed:
+        verdict = "REVISION_NEEDED"
+    elif claims:
+        verdict = None
+    else:
+        verdict = "APPROVED"
+    verification = {
+        "checks": checks,
+        "verdict": verdict,
+        "revision_instructions": "\n".join(f"- {c['item']}: {c['issue']} → {c['fix']}" for c in failed),
+        "source": "local",
+    }
+    return verification, claims
+
+
+def _check_finding_numbers(card, data_points, paper_numbers, checks, claims):
+    """stat_big / chart_data.value는 data_point에서, 본문 수치는 최소한 논문 원문에서 나와야 함"""
+    num = card.get("card_num")
+    issues = []
+    for raw, value in numbers_in(card.get("stat_big", "")):
+        if _matches(raw, value, data_points):
+            continue
+        if _matches(raw, value, paper_numbers):
+            claims.append({"item": f"카드 {num} stat_big", "card_num": num, "claim": card.get("stat_big", ""),
+                           "reason": "number is in the paper text but not in any data_point"})
+        else:
+            issues.append(f"stat_big {raw} is not in any data_point or in the paper text")
+
+    chart = card.get("chart_data") or {}
+    if chart:
+        chart_value = chart.get("value")
+        if isinstance(chart_value, str) and numbers_in(chart_value):
+            chart_value = chart["value"] = numbers_in(chart_value)[0][1]  # "170 bpm" → 170.0
+        if not isinstance(chart_value, (int, float)) or isinstance(chart_value, bool):
+            issues.append(f"chart_data.value {chart.get('value')!r} is not a number")
+        elif chart_value and not (_matches(str(chart_value), float(chart_value), data_points)
+                                  or _matches(str(chart_value), float(chart_value), paper_numbers)):
+            issues.append(f"chart_data.value {chart_value} is not in any data_point or in the paper text")
+
+    body_text = " ".join(str(card.get(k, "")) for k in ("headline", "stat_label", "body"))
+    for raw, value in numbers_in(body_text):
+        if "." not in raw and value < 10:
+            continue  # 한 자리 정수(순번, "3가지" 등)는 수치 주장으로 보지 않음
+        if not _matches(raw, value, data_points) and not _matches(raw, value, paper_numbers):
+            claims.append({"item": f"카드 {num} 본문 수치", "card_num": num, "claim": body_text,
+                           "reason": f"{raw} not found in data_points or extracted paper text"})
+
+    if issues:
+        checks.append(_check(f"카드 {num} 수치", "FAIL", "; ".join(issues),
+                             "stat_big과 chart_data.value를 analysis의 data_point 수치로 교체", num))
+    else:
+        checks.append(_check(f"카드 {num} 수치", "PASS", card_num=num))
+
+
+def _check_causal_language(card, claims):
+    """인과 표현은 규칙으로 판단 불가 → LLM 검증 대상"""
+    parts = [str(card.get(k, "")) for k in ("headline", "subheadline", "body", "stat_label", "closing_line")]
+    for k in ("body_lines", "points"):
+        if isinstance(card.get(k), list):
+            parts.extend(map(str, card[k]))
+    text = " ".join(p for p in parts if p)
+    markers = [m for m in CAUSAL_MARKERS if m in text]
+    if markers:
+        claims.append({"item": f"카드 {card.get('card_num')} 인과 표현", "card_num": card.get("card_num"),
+                       "claim": text,
+                       "reason": f"causal wording ({', '.join(markers)}) — check the study design supports it"})
+
+
+def blocked_terms(query):
+    """검색어에 든 금지어 목록"""
+    lowered = query.lower()
+    return [term for term in PEXELS_BLOCKLIST if re.search(rf"\b{re.escape(term)}\b", lowered)]
+
+
+def _check_pexels(cards):
+    """금지어가 든 검색어는 해당 단어를 빼서 바로 수정"""
+    fixed = []
+    for card in cards:
+        query = card.get("pexels_query", "")
+        terms = blocked_terms(query) if query else []
+        if not terms:
+            continue
+        clean = query
+        for term in terms:
+            clean = re.sub(rf"\b{re.escape(term)}\b", " ", clean, flags=re.IGNORECASE)
+        clean = " ".join(clean.split()) or FALLBACK_PEXELS_QUERY
+        card["pexels_query"] = clean
+        fixed.append(f"card {card.get('card_num')}: '{query}' → '{clean}'")
+    return _check("pexels 검색어 금지어", "PASS", "; ".join(fixed), "auto-fixed" if fixed else "")
+
+
+def _check_figure_license(cards, license_str, claims):
+    """paper_figure는 CC-BY/CC-BY-SA 명시일 때만. 명시적으로 아니면 css_chart로 바꾸고, 불확실하면 LLM으로"""
+    figure_cards = [c for c in cards if c.get("visual_source") == "paper_figure"]
+    if not figure_cards:
+        return _check("paper_figure 라이선스", "PASS")
+    allowed = bool(ALLOWED_FIGURE_LICENSES.search(license_str or ""))
+    if allowed and not HEDGED_LICENSE.search(license_str):
+        return _check("paper_figure 라이선스", "PASS")
+    if allowed:
+        claims.append({"item": "paper_figure 라이선스", "card_num": None, "claim": license_str,
+                       "reason": "license is not confirmed; cards "
+                                 + ", ".join(str(c.get("card_num")) for c in figure_cards) + " use paper figures"})
+        return _check("paper_figure 라이선스", "UNRESOLVED", "deferred to LLM verification")
+    for card in figure_cards:
+        card["visual_source"] = "css_chart"
+        card["figure_file"] = ""
+        card["figure_caption"] = ""
+    return _check("paper_figure 라이선스", "PASS",
+                  f"license '{license_str}' does not allow reuse; switched "
+                  f"{len(figure_cards)} card(s) to css_chart", "auto-fixed")
+
+
+def _check_citation(cards, analysis, doi):
+    """마지막 카드의 DOI 링크 / APA 인용"""
+    closing = next((c for c in cards if c.get("type") == "closing"), None)
+    if closing is None:
+        return _check("출처 표기", "FAIL", "closing card is missing", "card 7(closing)에 APA 인용과 DOI 추가")
+    notes = []
+    if doi and doi.lower() not in str(closing.get("doi_url", "")).lower():
+        closing["doi_url"] = f"https://doi.org/{doi}"
+        notes.append("doi_url corrected")
+    if not closing.get("citation") and analysis.get("citation_apa"):
+        closing["citation"] = analysis["citation_apa"]
+        notes.append("citation filled from analysis")
+    if not closing.get("citation"):
+        return _check("출처 표기", "FAIL", "citation is empty", "card 7에 APA 형식 인용 추가",
+                      closing.get("card_num"))
+    return _check("출처 표기", "PASS", "; ".join(notes), "auto-fixed" if notes else "")
@@ -0,0 +1,249 @@
+"""
+F1 Science Card News — HTTP Client
+호스트별 keep-alive 세션(풀 크기 조정) + 공통 재시도/백오프(지터) + connect/read 분리 타임아웃.
+HTTP2=1이고 httpx[http2]가 설치돼 있으면 HTTP/2 사용.
+호스트별 요청 수 / 바이트 / 연결 재사용률 집계.
+"""
+
+import os
+import random
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+CONNECT_TIMEOUT = 5.0
+DEFAULT_READ_TIMEOUT = 30.0
+MAX_RETRIES = 2                 # 연결 오류 / 일시적 5xx 재시도 횟수
+BACKOFF_BASE = 0.5              # 재시도 대기: uniform(0, BACKOFF_BASE * 2^n) (full jitter)
+RETRY_STATUSES = {500, 502, 503, 504}
+USER_AGENT = "F1ScienceCardNews/1.0 (research automation)"
+
+HOST_POOL_SIZES = {
+    "api.semanticscholar.org": 8,
+    "generativelanguage.googleapis.com": 4,
+    "api.groq.com": 4,
+    "api.pexels.com": 4,
+    "images.pexels.com": 8,
+}
+DEFAULT_POOL_SIZE = 4
+USE_HTTP2 = os.environ.get("HTTP2", "") == "1"
+
+_sessions = {}
+_stats = {}
+_lock = threading.Lock()
+
+
+def _host(url):
+    return urlsplit(url).netloc.lower()
+
+
+def _session(host):
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            size = HOST_POOL_SIZES.get(host, DEFAULT_POOL_SIZE)
+            session = _new_http2_client(size) if USE_HTTP2 else None
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=size, pool_block=False)
+                session.mount("https://", adapter)
+                session.mount("http://", adapter)
+            session.headers["User-Agent"] = USER_AGENT
+            _sessions[host] = session
+            _stats[host] = {"requests": 0, "errors": 0, "retries": 0, "bytes": 0}
+        return session
+
+
+def _new_http2_client(size):
+    try:
+        import httpx
+        import h2  # noqa: F401
+    except ImportError:
+        print("[INFO] HTTP2=1 but httpx[http2] is not installed, using HTTP/1.1")
+        return None
+    limits = httpx.Limits(max_connections=size, max_keepalive_connections=size)
+    return httpx.Client(http2=True, limits=limits, follow_redirects=True)
+
+
+def _count(host, key, amount=1):
+    with _lock:
+        _stats[host][key] += amount
+
+
+def _timeout(timeout):
+    """숫자는 read 타임아웃으로 해석, (connect, read) 튜플은 그대로"""
+    if timeout is None:
+        return (CONNECT_TIMEOUT, DEFAULT_READ_TIMEOUT)
+    if isinstance(timeout, (tuple, list)):
+        return tuple(timeout)
+    return (CONNECT_TIMEOUT, float(timeout))
+
+
+def request(method, url, retries=None, stream=False, timeout=None, **kwargs):
+    """공통 요청. 연결 오류는 항상, 일시적 5xx는 GET만 지터 백오프로 재시도"""
+    host = _host(url)
+    session = _session(host)
+    retries = MAX_RETRIES if retries is None else retries
+    timeout = _timeout(timeout)
+
+    for attempt in range(retries + 1):
+        try:
+            if isinstance(session, requests.Session):
+                resp = session.request(method, url, stream=stream, timeout=timeout, **kwargs)
+            else:
+                resp = _httpx_request(session, method, url, stream, timeout, **kwargs)
+        except (requests.ConnectionError, requests.Timeout, OSError) as e:
+            _count(host, "errors")
+            if attempt == retries or not _retryable_exception(e, method):
+                raise
+            _count(host, "retries")
+            time.sleep(random.uniform(0, BACKOFF_BASE * (2 ** attempt)))
+            continue
+
+        _count(host, "requests")
+        if resp.status_code in RETRY_STATUSES and method.upper() == "GET" and attempt < retries:
+            resp.close()
+            _count(host, "retries")
+            time.sleep(random.uniform(0, BACKOFF_BASE * (2 ** attempt)))
+            continue
+
+        if stream:
+            return _CountingResponse(resp, host)
+        _count(host, "bytes", len(resp.content))
+        return resp
+
+
+def _retryable_exception(error, method):
+    """GET은 모든 연결/타임아웃 오류, 그 외는 요청을 보내기 전 실패(연결 실패)만"""
+    if method.upper() == "GET":
+        return True
+    return isinstance(error, requests.ConnectionError) and not isinstance(error, requests.ReadTimeout)
+
+
+def get(url, **kwargs):
+    return request("GET", url, **kwargs)
+
+
+def post(url, **kwargs):
+    return request("POST", url, **kwargs)
+
+
+class _CountingResponse:
+    """스트리밍 응답: iter_content로 읽은 바이트 수를 호스트 통계에 더함"""
+
+    def __init__(self, resp, host):
+        self._resp = resp
+        self._host = host
+
+    def __getattr__(self, name):
+        return getattr(self._resp, name)
+
+    def iter_content(self, chunk_size=1):
+        for chunk in self._resp.iter_content(chunk_size):
+            _count(self._host, "bytes", len(chunk))
+            yield chunk
+
+    def iter_lines(self, chunk_size=512, decode_unicode=False):
+        for line in self._resp.iter_lines(chunk_size=chunk_size, decode_unicode=decode_unicode):
+            _count(self._host, "bytes", len(line) + 1)
+            yield line
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._resp.close()
+
+
+class _HttpxResponse:
+    """httpx.Response를 이 모듈 호출부가 쓰는 requests 인터페이스로 감쌈"""
+
+    def __init__(self, resp):
+        self._resp = resp
+        self.status_code = resp.status_code
+        self.headers = resp.headers
+
+    @property
+    def content(self):
+        return self._resp.read()
+
+    @property
+    def text(self):
+        self._resp.read()
+        return self._resp.text
+
+    def json(self):
+        self._resp.read()
+        return self._resp.json()
+
+    def iter_content(self, chunk_size=1):
+        return self._resp.iter_bytes(chunk_size)
+
+    def iter_lines(self, chunk_size=512, decode_unicode=False):
+        return self._resp.iter_lines()
+
+    def close(self):
+        self._resp.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self._resp.close()
+
+
+def _httpx_request(client, method, url, stream, timeout, params=None, headers=None, json=None, data=None):
+    import httpx
+
+    connect, read = timeout
+    req = client.build_request(method, url, params=params, headers=headers, json=json, data=data,
+                               timeout=httpx.Timeout(read, connect=connect))
+    try:
+        resp = client.send(req, stream=stream)
+    except httpx.ConnectError as e:
+        raise requests.ConnectionError(str(e)) from e
+    except httpx.TimeoutException as e:
+        raise requests.Timeout(str(e)) from e
+    return _HttpxResponse(resp)
+
+
+def _new_connections(session):
+    """urllib3 풀이 지금까지 연 연결 수 (재사용률 계산용)"""
+    if not isinstance(session, requests.Session):
+        return None
+    total = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is not None:
+                total += pool.num_connections
+    return total
+
+
+def stats():
+    """호스트별 {requests, errors, retries, bytes, connections, reuse}"""
+    with _lock:
+        snapshot = {host: dict(values) for host, values in _stats.items()}
+        sessions = dict(_sessions)
+    for host, values in snapshot.items():
+        conns = _new_connections(sessions[host])
+        values["connections"] = conns
+        if conns is not None and values["requests"]:
+            values["reuse"] = round(max(0.0, 1 - conns / values["requests"]), 3)
+        else:
+            values["reuse"] = None
+    return snapshot
+
+
+def report():
+    lines = [f"   {'host':<36} {'reqs':>5} {'conns':>5} {'reuse':>6} {'retries':>7} {'KB':>8}"]
+    for host, s in sorted(stats().items()):
+        reuse = f"{s['reuse'] * 100:.0f}%" if s["reuse"] is not None else "-"
+        conns = s["connections"] if s["connections"] is not None else "-"
+        lines.append(f"   {host:<36} {s['requests']:>5} {conns:>5} {reuse:>6} {s['retries']:>7} "
+                     f"{s['bytes'] / 1024:>8.0f}")
+    return "\n".join(lines)
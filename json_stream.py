@@ -0,0 +1,175 @@
+"""
+F1 Science Card News — Incremental JSON Parser
+스트리밍 LLM 응답을 조각 단위로 받아 구조를 검사하고,
+최상위 키의 값이 완성되는 즉시 콜백으로 넘김.
+"""
+
+import json
+
+PREAMBLE_LIMIT = 2000  # 이만큼 받을 때까지 '{'가 없으면 JSON 응답이 아닌 것으로 판단
+
+
+class StreamError(ValueError):
+    pass
+
+
+class IncrementalJSONParser:
+    """feed(chunk)로 텍스트를 넣고, finish()로 완성된 dict를 받음
+
+    - 코드블록(```json) 및 앞쪽 설명 문장은 건너뜀 (parse_json_response와 같은 응답을 받아들임):
+      '{' 뒤에 '"키":'가 나오기 전까지는 후보일 뿐이라 다른 글자가 나오면 다음 '{'부터 다시 찾고,
+      코드블록이 열리면 그 안의 객체를 우선 (앞에서 닫힌 객체는 대체용으로만 보관)
+    - 괄호 불일치 / 너무 긴 서두 / 최상위 객체가 닫히기 전 종료 → StreamError
+    - on_key(key, value): 최상위 키 하나의 값이 완성될 때마다 호출
+    """
+
+    def __init__(self, on_key=None):
+        self.on_key = on_key
+        self.text = ""
+        self.keys = {}
+        self._pos = 0
+        self._fenced = False
+        self._fallback = None  # 코드블록 밖에서 먼저 닫힌 객체 (start, end)
+        self._reset()
+
+    def _reset(self):
+        """후보 객체 상태 초기화 (다음 '{'부터 다시 찾음)"""
+        self.started = False
+        self.closed = False
+        self._committed = False  # '{ "키":'까지 확인된 객체만 구조 오류를 즉시 StreamError로 처리
+        self._stack = []
+        self._in_string = False
+        self._escape = False
+        self._start = -1
+        self._end = -1
+        self._key = None
+        self._key_start = -1
+        self._value_start = -1
+        self._expect_key = False
+
+    def _open_fence(self, i):
+        """코드블록 시작: 그 전의 후보는 버리고(닫힌 객체는 대체용으로 보관) 블록 안에서 새로 찾음"""
+        if self.closed and self._committed:
+            self._fallback = (self._start, self._end)
+            self.keys = {}
+        self._reset()
+        self._fenced = True
+        return i + 3
+
+    def feed(self, chunk):
+        self.text += chunk
+        text = self.text
+        i = self._pos
+        while i < len(text):
+            ch = text[i]
+            if (ch == "`" and not self._in_string and not self._committed) or (ch == "`" and self.closed):
+                if len(text) - i < 3:
+                    break  # 다음 조각까지 받아야 코드블록인지 알 수 있음
+                if text.startswith("```", i):
+                    if self._fenced and self.closed:
+                        i += 3  # 닫는 코드블록
+                    else:
+                        i = self._open_fence(i)
+                    continue
+            if not self.started:
+                if ch == "{":
+                    self.started = True
+                    self._start = i
+                    self._stack.append("{")
+                    self._expect_key = True
+                elif i >= PREAMBLE_LIMIT and self._fallback is None:
+                    raise StreamError("No JSON object in the first "
+                                      f"{PREAMBLE_LIMIT} characters of the response")
+                i += 1
+                continue
+            if self.closed:
+                i += 1
+                continue
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1 and self._key_start >= 0 and self._key is None:
+                        self._key = json.loads(text[self._key_start:i + 1])
+                        self._key_start = -1
+                i += 1
+                continue
+
+            if not self._committed:
+                # '{' 다음 첫 키까지: 공백, '"키"', ':' 또는 빈 객체의 '}'만 허용. 그 밖이면 설명 문장 속 괄호
+                if ch == ":" and self._key is not None:
+                    self._committed = True
+                elif ch == "}" and self._key is None and self._key_start < 0:
+                    self._fallback = self._fallback or (self._start, i)  # '{}': 더 나은 객체가 없을 때만 사용
+                    i = self._start + 1
+                    self._reset()
+                    continue
+                elif not (ch.isspace() or (ch == '"' and self._expect_key)):
+                    i = self._start + 1
+                    self._reset()
+                    continue
+
+            depth = len(self._stack)
+            if ch == '"':
+                self._in_string = True
+                if depth == 1 and self._expect_key:
+                    self._key_start = i
+                    self._expect_key = False
+                elif depth == 1 and self._value_start < 0 and self._key is not None:
+                    self._value_start = i
+            elif ch in "{[":
+                if depth == 1 and self._value_start < 0 and self._key is not None:
+                    self._value_start = i
+                self._stack.append(ch)
+            elif ch in "}]":
+                opener = "{" if ch == "}" else "["
+                if not self._stack or self._stack[-1] != opener:
+                    raise StreamError(f"Unbalanced '{ch}' at offset {i}")
+                if depth == 1:
+                    self._emit(text, i)
+                self._stack.pop()
+                if not self._stack:
+                    self.closed = True
+                    self._end = i
+            elif ch == ":" and depth == 1:
+                pass  # 키/값 구분자
+            elif ch == "," and depth == 1:
+                self._emit(text, i)
+                self._expect_key = True
+            elif depth == 1 and not ch.isspace() and self._value_start < 0 and self._key is not None:
+                self._value_start = i  # 숫자 / true / false / null
+            i += 1
+        self._pos = i
+
+    def _emit(self, text, end):
+        """최상위 값 하나 완성 → keys에 저장하고 콜백"""
+        if self._key is not None and self._value_start >= 0:
+            raw = text[self._value_start:end].strip()
+            try:
+                value = json.loads(raw)
+            except json.JSONDecodeError as e:
+                raise StreamError(f"Malformed value for '{self._key}': {e}") from e
+            self.keys[self._key] = value
+            if self.on_key:
+                self.on_key(self._key, value)
+        self._key = None
+        self._value_start = -1
+
+    def finish(self):
+        """스트림 종료 시 호출. 완성된 최상위 객체를 반환 (코드블록 안 객체가 없으면 앞에서 닫힌 객체)"""
+        if self.closed:
+            start, end = self._start, self._end
+        elif self._committed:
+            raise StreamError(f"Stream truncated inside JSON (depth {len(self._stack)})")
+        elif self._fallback:
+            start, end = self._fallback
+        else:
+            raise StreamError("Stream ended without a JSON object")
+        try:
+            return json.loads(self.text[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise StreamError(f"Invalid JSON: {e}") from e
@@ -0,0 +1,200 @@
+"""
+F1 Science Card News — LLM Provider Router
+제공자/모델별 상태(서킷 브레이커, 최근 지연시간, 쿼터)를 추적하고
+매 호출을 가장 빠른 정상 경로로 보냄. 최근 라우팅 결정은 제한된 개수만 기록해 두고 요약을 리포트에 남김.
+"""
+
+import statistics
+import threading
+import time
+from collections import deque
+
+FAILURE_THRESHOLD = 3      # 연속 실패 N회 → 서킷 open
+BASE_COOLDOWN = 30.0       # 첫 open 기간(초), 이후 2배씩 증가
+MAX_COOLDOWN = 600.0
+LATENCY_WINDOW = 8         # 최근 N회 지연시간의 중앙값 사용
+PREFERENCE_PENALTY = 5.0   # 폴백 체인에서 한 칸 뒤로 갈수록 더하는 가상 지연(초) — 품질 우선순위 유지
+MAX_WAIT_ALL_OPEN = 90.0   # 모든 경로가 open일 때 최대 대기
+DECISION_HISTORY = 500     # 메모리에 남기는 최근 라우팅 결정 수
+SUMMARY_LIMIT = 50         # 리포트(run_report.json)에 남기는 결정 수
+
+
+class ProviderError(Exception):
+    """HTTP 상태 / Retry-After를 담은 제공자 오류"""
+
+    def __init__(self, message, status=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.retry_after = retry_after
+
+
+class Route:
+    def __init__(self, provider, model, key, preference, daily_quota=None, used_today=0):
+        self.provider = provider
+        self.model = model
+        self.key = key
+        self.preference = preference
+        self.daily_quota = daily_quota
+        self.used_today = used_today  # 이전 실행들이 오늘 이미 쓴 호출 수
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.calls = 0
+        self.failures = 0
+        self.consecutive_failures = 0
+        self.open_until = 0.0
+        self.cooldown = BASE_COOLDOWN
+        self.last_error = ""
+
+    @property
+    def name(self):
+        return f"{self.provider}/{self.model}"
+
+    def latency(self):
+        return statistics.median(self.latencies) if self.latencies else None
+
+    def quota_left(self):
+        """남은 일일 호출 수 (쿼터가 없으면 None)"""
+        if self.daily_quota is None:
+            return None
+        return max(0, self.daily_quota - self.used_today - self.calls)
+
+    def state(self, now):
+        if self.daily_quota is not None and self.quota_left() == 0:
+            return "exhausted"
+        if now < self.open_until:
+            return "open"
+        if self.consecutive_failures >= FAILURE_THRESHOLD:
+            return "half-open"
+        return "closed"
+
+    def score(self):
+        return (self.latency() or 0.0) + PREFERENCE_PENALTY * self.preference
+
+
+class ProviderRouter:
+    def __init__(self, routes):
+        self.routes = routes
+        self.decisions = deque(maxlen=DECISION_HISTORY)
+        self._lock = threading.Lock()
+
+    def plan(self, stage="llm", doi=None):
+        """이번 호출에서 시도할 경로 순서와 결정 기록 반환. 모두 open이면 가장 빨리 풀리는 경로까지 대기"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                states = {r.name: r.state(now) for r in self.routes}
+                healthy = [r for r in self.routes if states[r.name] in ("closed", "half-open")]
+                healthy.sort(key=lambda r: (states[r.name] == "half-open", r.score()))
+                if healthy:
+                    skipped = [f"{r.name} {states[r.name]}" for r in self.routes if r not in healthy]
+                    decision = {
+                        "stage": stage,
+                        "doi": doi,
+                        "at": time.time(),
+                        "order": [r.name for r in healthy],
+                        "skipped": skipped,
+                        "candidates": [self._describe(r, states[r.name], now) for r in self.routes],
+                        "attempts": [],
+                    }
+                    self.decisions.append(decision)
+                    print(f"   🧭 {stage} → {healthy[0].name} (score {healthy[0].score():.1f}s"
+                          + (f"; skipped {', '.join(skipped)}" if skipped else "") + ")")
+                    return healthy, decision
+
+                reopen = [r.open_until - now for r in self.routes if states[r.name] == "open"]
+                if not reopen or min(reopen) > MAX_WAIT_ALL_OPEN:
+                    decision = {"stage": stage, "doi": doi, "at": time.time(), "order": [],
+                                "skipped": [f"{r.name} {states[r.name]}" for r in self.routes],
+                                "candidates": [self._describe(r, states[r.name], now) for r in self.routes],
+                                "attempts": []}
+                    self.decisions.append(decision)
+                    return [], decision
+                wait = min(reopen)
+            print(f"   ⏳ All LLM providers cooling down, waiting {wait:.0f}s")
+            time.sleep(wait)
+
+    def record_success(self, route, latency, decision=None):
+        with self._lock:
+            route.calls += 1
+            route.latencies.append(latency)
+            route.consecutive_failures = 0
+            route.cooldown = BASE_COOLDOWN
+            route.open_until = 0.0
+            if decision is not None:
+                decision["attempts"].append({"route": route.name, "ok": True, "latency": round(latency, 2)})
+
+    def record_failure(self, route, error, latency=None, decision=None):
+        """연속 실패가 임계치를 넘거나 429면 open. Retry-After가 있으면 그 시간만큼 open"""
+        with self._lock:
+            route.calls += 1
+            route.failures += 1
+            route.consecutive_failures += 1
+            route.last_error = str(error)[:120]
+            status = getattr(error, "status", None)
+            retry_after = getattr(error, "retry_after", None)
+            now = time.monotonic()
+
+            if decision is not None:
+                decision["attempts"].append({"route": route.name, "ok": False, "status": status,
+                                             "latency": round(latency, 2) if latency else None,
+                                             "error": route.last_error})
+
+            if retry_after:
+                route.open_until = max(route.open_until, now + retry_after)
+            elif status == 429 or route.consecutive_failures >= FAILURE_THRESHOLD:
+                route.open_until = now + route.cooldown
+                route.cooldown = min(MAX_COOLDOWN, route.cooldown * 2)
+
+    def _describe(self, route, state, now):
+        latency = route.latency()
+        return {
+            "route": route.name,
+            "state": state,
+            "score": round(route.score(), 2),
+            "latency_p50": round(latency, 2) if latency is not None else None,
+            "open_for": round(max(0.0, route.open_until - now), 1),
+            "calls": route.calls,
+            "failures": route.failures,
+            "last_error": route.last_error,
+        }
+
+    def summary(self, doi=None, limit=SUMMARY_LIMIT):
+        """최근 결정 limit개 요약 (doi를 주면 그 논문의 결정만) → [{stage, provider, model, score, reason}]"""
+        with self._lock:
+            decisions = [d for d in self.decisions if doi is None or d.get("doi") == doi][-limit:]
+            return [self._summarize(d) for d in decisions]
+
+    @staticmethod
+    def _summarize(decision):
+        attempts = decision["attempts"]
+        chosen = next((a["route"] for a in attempts if a["ok"]), None)
+        failed = [a["route"] for a in attempts if not a["ok"]]
+        if not decision["order"]:
+            reason = "no route available: " + ", ".join(decision["skipped"])
+        elif chosen is None:
+            reason = "all routes failed" if failed else "no attempt recorded"
+        elif failed:
+            reason = "fallback after " + ", ".join(failed) + " failed"
+        elif decision["skipped"]:
+            reason = "lowest score; skipped " + ", ".join(decision["skipped"])
+        else:
+            reason = "lowest score"
+        name = chosen or (decision["order"][0] if decision["order"] else None)
+        score = next((c["score"] for c in decision["candidates"] if c["route"] == name), None)
+        provider, _, model = (name or "/").partition("/")
+        return {"stage": decision["stage"], "provider": provider or None, "model": model or None,
+                "score": score, "reason": reason}
+
+    def quota_remaining(self):
+        """{모델: 남은 일일 호출 수 또는 None}"""
+        with self._lock:
+            return {r.name: r.quota_left() for r in self.routes}
+
+    def report(self):
+        now = time.monotonic()
+        lines = [f"   {'route':<42} {'state':<10} {'calls':>5} {'fail':>5} {'p50 s':>6}"]
+        with self._lock:
+            for r in self.routes:
+                latency = r.latency()
+                lines.append(f"   {r.name:<42} {r.state(now):<10} {r.calls:>5} {r.failures:>5} "
+                             f"{(f'{latency:.1f}' if latency is not None else '-'):>6}")
+        return "\n".join(lines)
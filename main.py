@@ -1,19 +1,34 @@
 """
 F1 Science Card News — 완전 자동화 파이프라인
 GitHub Actions에서 자동 실행됨. 수동 개입 불필요.
+
+단계별 결과는 논문마다 .cache/checkpoints/에 남아, 실패한 논문은 마지막으로 끝난 단계 다음부터 이어서 처리됨.
+PyMuPDF / pdfplumber / Jinja2 / Playwright는 그 단계를 실행할 때만 불러옴.
+
+사용법:
+    python main.py                          # 검색 → 저장까지 전체 실행 (GitHub Actions)
+    python main.py search                   # 검색 + 후보 선택만 (체크포인트에 논문 저장)
+    python main.py analyze                  # 체크포인트가 있는 미완료 논문을 분석 단계까지
+    python main.py render --doi 10.1/xyz    # 특정 논문만 렌더링 단계까지
+    python main.py script --force           # 스크립트 단계를 체크포인트 무시하고 다시 (뒤 단계 체크포인트 삭제)
+    python main.py resume                   # 미완료 논문을 마지막 완료 단계 다음부터 저장까지
+    python main.py resume --list            # 논문별 완료 단계만 출력
 """
 
+import argparse
 import os
 import sys
 import json
 import time
 import re
+import threading
 import traceback
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 
-import requests
-import pdfplumber
+import http_client
+import telemetry
 
 # ── 설정 ──
 GEMINI_KEY = os.environ.get("GEMINI_API_KEY", "")
@@ -24,112 +39,353 @@ SS_KEY = os.environ.get("SEMANTIC_SCHOLAR_API_KEY", "")
 DATA_DIR = Path("data")
 OUTPUT_DIR = Path("output")
 TEMPLATES_DIR = Path("templates")
-HISTORY_FILE = DATA_DIR / "processed_papers.json"
+HISTORY_FILE = DATA_DIR / "processed_papers.json"  # 예전 처리 이력 (state.db로 한 번 옮긴 뒤 삭제)
+STATE_DB = DATA_DIR / "state.db"  # 논문별 처리 상태 (SQLite)
+STATE_MAX_ATTEMPTS = 3  # 이 횟수만큼 실패한 논문은 더 이상 검색 결과에 넣지 않음
 QUERIES_FILE = DATA_DIR / "queries.json"
-
-from prompts import PROMPT_ANALYSIS, PROMPT_CARDNEWS, PROMPT_VERIFY
+CACHE_DIR = Path(os.environ.get("F1_CACHE_DIR", ".cache"))  # git 미추적 로컬 캐시
+
+# 파이프라인: 실행당 논문 수, 단계별 워커 수 (PIPELINE_WORKERS="analyze=3,render=1"로 덮어쓰기)
+MAX_PAPERS_PER_RUN = int(os.environ.get("MAX_PAPERS_PER_RUN", "2"))
+BACKFILL = os.environ.get("BACKFILL", "") == "1"  # 쿼터 / 시간 예산이 허락하는 만큼 후보 대기열 처리
+BACKFILL_MAX_PAPERS = int(os.environ.get("BACKFILL_MAX_PAPERS", "50"))
+RUN_TIME_BUDGET_MIN = float(os.environ.get("RUN_TIME_BUDGET_MIN", "12"))  # Actions timeout-minutes(15) - 여유
+PIPELINE_WORKERS = {"extract": 2, "analyze": 2, "script": 2, "verify": 2, "render": 1}
+PIPELINE_QUEUE_SIZE = 2
+RENDER_PAGES = int(os.environ.get("RENDER_PAGES", "4"))  # 공유 브라우저에서 동시에 캡처할 페이지 수
+RENDER_READY_TIMEOUT_MS = 10000  # 템플릿 준비 신호(이미지 디코딩 + 폰트) 최대 대기
+RENDER_BATCH = os.environ.get("RENDER_BATCH", "0") == "1"  # 논문의 카드 전체를 한 문서로 1회 로드 + 카드 요소별 캡처
+BATCH_TEMPLATE = "_batch.html"
+ASSETS_DIR = OUTPUT_DIR / "_assets"  # 배경 사진 공유 저장소 (1080px JPEG, sha256 주소)
+CARD_FORMAT = os.environ.get("CARD_FORMAT", "png")  # png | png8(양자화) | webp | jpeg
+# Pexels 검색어 → 사진 색인 (다시 만들 수 있으므로 커밋하지 않고 .cache/ → Actions 캐시로 실행 간 유지)
+PEXELS_INDEX_DIR = CACHE_DIR / "pexels_index"
+PEXELS_INDEX_TTL_DAYS = float(os.environ.get("PEXELS_INDEX_TTL_DAYS", "30"))
+PEXELS_INDEX_MAX_ENTRIES = 2000
+
+# LLM 제공자별 분당 요청 한도 (무료 티어 기준) — 단계 사이 고정 sleep 대신 사용
+LLM_RATE_PER_MIN = {"gemini": 10, "groq": 30}
+LLM_GEN_CONFIG = {"temperature": 0.3, "max_tokens": 4096}
+LLM_STREAMING = os.environ.get("LLM_STREAMING", "1") == "1"  # SSE 스트리밍 + 점진적 JSON 검사
+GEMINI_API_BASE = os.environ.get("GEMINI_API_BASE", "https://generativelanguage.googleapis.com/v1beta")
+GROQ_API_BASE = os.environ.get("GROQ_API_BASE", "https://api.groq.com/openai/v1")
+PEXELS_API_BASE = os.environ.get("PEXELS_API_BASE", "https://api.pexels.com/v1")
+SS_API_BASE = os.environ.get("SS_API_BASE", "https://api.semanticscholar.org/graph/v1")
+# 프롬프트에 넣을 논문 본문 토큰 예산 (제공자별, 라우터가 어느 쪽을 고르든 들어가도록 최소값 사용)
+PAPER_TOKEN_BUDGETS = {
+    "gemini": {"analysis": 3500, "verify": 1200},
+    "groq": {"analysis": 2500, "verify": 1000},   # 무료 티어 TPM이 작음
+}
+LOCAL_VERIFY = os.environ.get("LOCAL_VERIFY", "1") == "1"  # 규칙 기반 팩트체크 후 남은 항목만 LLM 검증
+LLM_DAILY_QUOTA = {  # 무료 티어 일일 요청 한도
+    "gemini-2.5-flash-preview-05-20": 250,
+    "llama-3.3-70b-versatile": 1000,
+    "gemini-2.0-flash-lite": 1500,
+}
+
+# LLM 응답 캐시 (.cache/llm, 프롬프트+모델+생성설정 해시 키)
+LLM_CACHE_DIR = CACHE_DIR / "llm"
+LLM_CACHE_TTL_DAYS = float(os.environ.get("LLM_CACHE_TTL_DAYS", "30"))
+LLM_CACHE_MAX_ENTRIES = 1000
+LLM_CACHE_MAX_BYTES = 50 * 1024 * 1024
+
+# Semantic Scholar 레이트 리밋 (키 유무별 프로필, SS_RATE_LIMIT로 덮어쓰기 가능)
+SS_RATE_PROFILES = {
+    "anonymous": {"rate": 1.0, "burst": 1},   # 비인증 공용 풀: 429 잦음
+    "api_key": {"rate": 1.0, "burst": 3},     # 키 발급 시 기본 1 req/s
+}
+if os.environ.get("SS_RATE_LIMIT"):
+    for _profile in SS_RATE_PROFILES.values():
+        _profile["rate"] = float(os.environ["SS_RATE_LIMIT"])
+SS_SEARCH_WORKERS = int(os.environ.get("SS_SEARCH_WORKERS", "4"))
+SS_PAGE_SIZE = 100   # /paper/search 최대 limit
+SS_MAX_OFFSET = 1000  # 관련도 검색은 offset + limit ≤ 1000까지만 제공
+SEARCH_BACKFILL_PAGES = int(os.environ.get("SEARCH_BACKFILL_PAGES", "3" if BACKFILL else "1"))  # 실행당 검색어별 페이지
+SS_MAX_RETRIES = 4
+SS_BACKOFF_BASE = 2.0  # Retry-After 헤더가 없을 때 지수 백오프 시작값(초)
+
+# 검색 응답 캐시 (data/ 아래에 저장 → 워크플로 커밋으로 다음 실행까지 유지)
+SEARCH_CACHE_DIR = CACHE_DIR / "search"  # git 미추적, Actions 캐시로 유지
+# 예약 실행(월·목 09:00 UTC) 간격은 72/96시간 → 다음 예약 실행까지 캐시가 살아 있도록 가장 긴 간격보다 길게
+SEARCH_CACHE_TTL_HOURS = float(os.environ.get("SEARCH_CACHE_TTL_HOURS", "120"))
+SEARCH_CACHE_MAX_ENTRIES = 200
+SEARCH_CACHE_MAX_BYTES = 20 * 1024 * 1024
+
+# PDF 저장소 (DOI + sha256 주소, 스트리밍 다운로드)
+PDF_STORE_DIR = CACHE_DIR / "pdfs"
+PDF_MAX_MB = int(os.environ.get("PDF_MAX_MB", "50"))
+FIGURES_DIR = CACHE_DIR / "figures"
+
+# 단계 체크포인트: 논문별 단계 결과 (실패한 실행을 마지막 완료 단계 다음부터 이어서)
+CHECKPOINT_DIR = CACHE_DIR / "checkpoints"
+PIPELINE_STAGES = ("extract", "analyze", "script", "verify", "render", "persist")
+CHECKPOINT_FIELDS = {  # 단계별로 체크포인트에 남기는 job 필드 (verify는 카드 스크립트를 고칠 수 있어 함께 저장)
+    "extract": ("text", "figures", "figures_dir", "license", "authors"),
+    "analyze": ("analysis",),
+    "script": ("cardnews",),
+    "verify": ("verification", "cardnews"),
+    "render": ("output_dir", "cards"),
+}
+
+# 계측: 실행 디렉터리별 JSON 리포트 + 실행 전체 Prometheus textfile (PROFILE_STAGES로 단계별 cProfile)
+RUN_REPORT_NAME = "run_report.json"
+METRICS_FILE = Path(os.environ.get("METRICS_FILE", str(CACHE_DIR / "metrics.prom")))
+
+from prompts import (PROMPT_ANALYSIS, PROMPT_CARDNEWS, PROMPT_VERIFY, PROMPT_VERIFY_CLAIMS,
+                     PROMPT_CARD_REVISION)
+from ratelimit import TokenBucket, parse_retry_after
+from cache import DiskCache, cache_key
+from pdf_store import PdfStore
+from pdf_engine import extract_document
+from pipeline import Stage, run_pipeline, parse_worker_budget, stage_report
+from llm_router import ProviderRouter, Route, ProviderError
+from json_stream import IncrementalJSONParser, StreamError
+from text_select import select_passages, estimate_tokens
+from fact_check import verify_locally, blocked_terms
+from render_service import RenderService
+from render_cache import RenderManifest, card_digest, template_digest
+from asset_store import AssetStore, CARD_FORMATS, load_refs, save_refs, resolve_ref, relative_ref
+from state_store import StateStore
+from scheduler import plan_batch
+from checkpoint import CheckpointStore
+
+LLM_BUCKETS = {name: TokenBucket(rpm / 60.0, burst=2) for name, rpm in LLM_RATE_PER_MIN.items()}
+LLM_CACHE = DiskCache(LLM_CACHE_DIR, ttl=LLM_CACHE_TTL_DAYS * 86400,
+                      max_entries=LLM_CACHE_MAX_ENTRIES, max_bytes=LLM_CACHE_MAX_BYTES)
+LLM_CACHE_STATS = {}
+LLM_CACHE_LOCK = threading.Lock()
+LLM_ROUTER = None
+LLM_ROUTER_LOCK = threading.Lock()
+PEXELS_PREFETCH = {}  # query → Future[(사진 경로, 출처 정보)]
+PEXELS_PREFETCH_LOCK = threading.Lock()
+PEXELS_PREFETCH_POOL = ThreadPoolExecutor(max_workers=4, thread_name_prefix="pexels")
+RENDER_SERVICE = None
+RENDER_SERVICE_LOCK = threading.Lock()
+TEMPLATE_ENV = None  # 컴파일된 Jinja 템플릿을 논문 사이에 재사용
+TEMPLATE_ENV_LOCK = threading.Lock()
+ASSET_STORE = AssetStore(ASSETS_DIR)
+PEXELS_INDEX = DiskCache(PEXELS_INDEX_DIR, ttl=PEXELS_INDEX_TTL_DAYS * 86400,
+                         max_entries=PEXELS_INDEX_MAX_ENTRIES)
+CHECKPOINTS = CheckpointStore(CHECKPOINT_DIR)
+STATE = None
+STATE_LOCK = threading.Lock()
+LLM_USAGE = threading.local()  # 단계 워커 스레드별 (tokens_in, tokens_out, calls) 누적
 
 
 # =============================================
 # STEP 1: 논문 검색 (Semantic Scholar API)
 # =============================================
 def search_papers():
-    """Semantic Scholar에서 F1 생리학 관련 OA 논문 검색"""
+    """Semantic Scholar에서 F1 생리학 관련 OA 논문 검색 → 후보 대기열에 누적 → 이번 실행 분량 선택
+
+    검색어마다 지난번 offset부터 SEARCH_BACKFILL_PAGES쪽을 이어받고(백필), 전에 검색한 적이 있으면
+    마지막 검색일 이후 발행분만 한 번 더 검색(증분). 후보는 state.db에 인용 수 순으로 남아 다음 실행이 이어 씀.
+    같은 날 다시 실행하면(재실행, workflow_dispatch 재시도) 그날 첫 실행과 같은 offset / 기준일로 요청해 검색 캐시를 씀
+    """
     queries = json.loads(QUERIES_FILE.read_text())
-    history = json.loads(HISTORY_FILE.read_text()) if HISTORY_FILE.exists() else []
+    state = get_state_store()
+    today = datetime.now().strftime("%Y-%m-%d")
 
     headers = {}
     if SS_KEY:
         headers["x-api-key"] = SS_KEY
 
-    new_papers = []
-    seen_dois = set(history)
-
+    fetches = []  # (query, offset, since)
+    run_starts = {}  # query → (시작 offset, 증분 기준일): 같은 날 재실행이 그대로 다시 씀
     for query in queries:
+        cursor = state.search_cursor(query) or {"next_offset": 0, "exhausted": 0, "searched_on": None}
+        if cursor.get("run_on") == today:
+            start, since = cursor["run_offset"], cursor["run_since"]
+        else:
+            start = cursor["next_offset"]
+            since = cursor["searched_on"] if cursor["searched_on"] and cursor["searched_on"] < today else None
+        run_starts[query] = (start, since)
+        if since:
+            fetches.append((query, 0, since))
+        if not cursor["exhausted"]:
+            for page in range(SEARCH_BACKFILL_PAGES):
+                offset = start + page * SS_PAGE_SIZE
+                if offset < SS_MAX_OFFSET:
+                    fetches.append((query, offset, None))
+
+    profile = SS_RATE_PROFILES["api_key" if SS_KEY else "anonymous"]
+    bucket = TokenBucket(profile["rate"], profile["burst"])
+    workers = max(1, min(SS_SEARCH_WORKERS, len(fetches)))
+    cache = DiskCache(SEARCH_CACHE_DIR, ttl=SEARCH_CACHE_TTL_HOURS * 3600,
+                      max_entries=SEARCH_CACHE_MAX_ENTRIES, max_bytes=SEARCH_CACHE_MAX_BYTES)
+
+    started = time.monotonic()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pages = list(pool.map(lambda r: search_query(r[0], headers, bucket, cache, offset=r[1], since=r[2]),
+                              fetches))
+    print(f"   Searched {len(fetches)} pages for {len(queries)} queries in {time.monotonic() - started:.1f}s "
+          f"({workers} workers, {profile['rate']} req/s; cache: {cache.summary()})")
+
+    found = added = 0
+    cursors = {}
+    incremental_failed = set()
+    # 요청 순서대로 병합 → 실행 순서와 무관하게 결과가 결정적
+    for (query, offset, since), page in zip(fetches, pages):
+        if page is None:
+            if since:
+                incremental_failed.add(query)
+            continue
+        papers = []
+        for paper in page["data"]:
+            doi = (paper.get("externalIds") or {}).get("DOI")
+            oa_pdf = paper.get("openAccessPdf")
+            if doi and oa_pdf:
+                paper["doi"] = doi
+                paper["pdf_url"] = oa_pdf.get("url", "")
+                papers.append(paper)
+        found += len(papers)
+        added += state.add_candidates(papers, query)
+        if since is None:
+            cursor = cursors.setdefault(query, state.search_cursor(query) or {"next_offset": 0, "exhausted": 0,
+                                                                               "searched_on": None})
+            if offset == cursor["next_offset"]:  # 중간 페이지가 실패하면 그 offset부터 다음 실행에서 다시
+                cursor["next_offset"] = offset + len(page["data"])
+                cursor["exhausted"] = page.get("next") is None or cursor["next_offset"] >= SS_MAX_OFFSET
+    for query in {q for q, _, _ in fetches}:
+        cursor = cursors.get(query) or state.search_cursor(query)
+        if cursor is None:  # 첫 검색이 실패 → 다음 실행에서 처음부터
+            continue
+        # 증분 검색이 실패했으면 기준일을 그대로 둬서 다음 실행이 같은 기간을 다시 검색
+        searched_on = cursor["searched_on"] if query in incremental_failed else today
+        start, since = run_starts[query]
+        state.save_cursor(query, cursor["next_offset"], cursor["exhausted"], searched_on,
+                          run_on=today, run_offset=start, run_since=since)
+
+    batch = plan_batch_size(state) if BACKFILL else MAX_PAPERS_PER_RUN
+    selected = state.pending_candidates(batch)
+    print(f"   {found} OA results, {added} new candidates; {state.pending_count()} waiting in queue")
+
+    if selected:
+        print(f"✅ Selected top {len(selected)} candidates by citations:")
+        for p in selected:
+            print(f"   - {p.get('title', 'Unknown')} (DOI: {p['doi']})")
+    else:
+        print("ℹ️ No new papers found.")
+
+    return selected
+
+
+def plan_batch_size(state):
+    """백필 모드: 남은 LLM 일일 쿼터 / Actions 시간 예산 / 대기열 크기로 이번 실행 논문 수 결정"""
+    router = get_llm_router()
+    rpm = sum(LLM_RATE_PER_MIN.get(provider, 0) for provider in {r.provider for r in router.routes})
+    time_left = RUN_TIME_BUDGET_MIN * 60 - (time.time() - telemetry.RUN_STARTED)
+    workers = parse_worker_budget(os.environ.get("PIPELINE_WORKERS"), PIPELINE_WORKERS)
+    n, plan = plan_batch(state.pending_count(), router.quota_remaining(), rpm, state.stage_profile(),
+                         workers, time_left, BACKFILL_MAX_PAPERS)
+    limits = ", ".join(f"{k} {v}" for k, v in plan["limits"].items())
+    print(f"   📋 Backfill plan: {n} papers (limited by {plan['limited_by']}; {limits}; "
+          f"{plan['calls_per_paper']} LLM calls/paper, ~{plan['est_minutes']} min of {time_left / 60:.1f} left)")
+    return n
+
+
+def search_query(query, headers, bucket, cache=None, offset=0, since=None):
+    """검색 결과 1쪽 → {"data": [...], "next": 다음 offset 또는 None}. 실패하고 캐시도 없으면 None
+
+    캐시 → (만료 시) 조건부 요청 → 429는 Retry-After 후 재시도. since="YYYY-MM-DD"면 그날 이후 발행분만
+    """
+    url = f"{SS_API_BASE}/paper/search"
+    params = {
+        "query": query,
+        "offset": offset,
+        "limit": SS_PAGE_SIZE,
+        "fields": "title,authors,year,venue,externalIds,openAccessPdf,abstract,citationCount",
+        "openAccessPdf": "",
+        "year": "2015-",
+    }
+    if since:
+        params["publicationDateOrYear"] = f"{since}:"
+
+    key = cache_key(url, params)
+    entry, fresh = cache.lookup(key) if cache else (None, False)
+    if fresh:
+        return entry["value"]
+
+    req_headers = dict(headers)
+    if entry:
+        validators = entry.get("meta", {})
+        if validators.get("etag"):
+            req_headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            req_headers["If-Modified-Since"] = validators["last_modified"]
+
+    for attempt in range(SS_MAX_RETRIES + 1):
         try:
-            url = "https://api.semanticscholar.org/graph/v1/paper/search"
-            params = {
-                "query": query,
-                "limit": 10,
-                "fields": "title,authors,year,venue,externalIds,openAccessPdf,abstract,citationCount",
-                "openAccessPdf": "",
-                "year": "2015-",
-            }
-            resp = requests.get(url, params=params, headers=headers, timeout=15)
+            bucket.acquire()
+            resp = http_client.get(url, params=params, headers=req_headers, timeout=15)
 
+            if resp.status_code == 304 and entry:
+                cache.touch(key)
+                return entry["value"]
             if resp.status_code == 429:
-                print(f"[WARN] Rate limited on query: {query}. Waiting 30s...")
-                time.sleep(30)
+                if attempt == SS_MAX_RETRIES:
+                    break
+                delay = parse_retry_after(resp.headers.get("Retry-After"),
+                                          default=SS_BACKOFF_BASE * (2 ** attempt))
+                print(f"[WARN] Rate limited on query: {query}. Retrying in {delay:.1f}s "
+                      f"({attempt + 1}/{SS_MAX_RETRIES})")
+                bucket.penalize(delay)
                 continue
             if resp.status_code != 200:
                 print(f"[WARN] Search failed for '{query}': HTTP {resp.status_code}")
-                continue
-
-            data = resp.json()
-            for paper in data.get("data", []):
-                doi = (paper.get("externalIds") or {}).get("DOI")
-                oa_pdf = paper.get("openAccessPdf")
-                if doi and oa_pdf and doi not in seen_dois:
-                    paper["doi"] = doi
-                    paper["pdf_url"] = oa_pdf.get("url", "")
-                    new_papers.append(paper)
-                    seen_dois.add(doi)
-
-            time.sleep(1.5)  # Rate limit: 1 req/sec for unauthenticated
+                break
+
+            body = resp.json()
+            page = {"data": body.get("data", []), "next": body.get("next")}
+            if cache:
+                cache.put(key, page, meta={
+                    "query": query,
+                    "etag": resp.headers.get("ETag", ""),
+                    "last_modified": resp.headers.get("Last-Modified", ""),
+                })
+            return page
 
         except Exception as e:
             print(f"[WARN] Search error for '{query}': {e}")
-            continue
-
-    # 인용 수 기준 정렬, 최대 2편 처리
-    new_papers.sort(key=lambda p: p.get("citationCount", 0), reverse=True)
-    selected = new_papers[:2]
-
-    if selected:
-        print(f"✅ Found {len(new_papers)} new papers, selected top {len(selected)}:")
-        for p in selected:
-            print(f"   - {p.get('title', 'Unknown')} (DOI: {p['doi']})")
+            break
     else:
-        print("ℹ️ No new papers found.")
+        print(f"[WARN] Giving up on '{query}' after {SS_MAX_RETRIES} retries")
 
-    return selected
+    # 네트워크 실패 시 만료된 캐시라도 사용
+    if entry:
+        print(f"[INFO] Using stale cached results for '{query}'")
+        return entry["value"]
+    return None
 
 
 # =============================================
 # STEP 2: PDF 다운로드 + 텍스트 추출
 # =============================================
 def download_and_extract(paper):
-    """PDF 다운로드 → 텍스트 + Figure 추출"""
+    """PDF 다운로드(스트리밍, 로컬 저장소) → 텍스트 + Figure 추출"""
     pdf_url = paper.get("pdf_url", "")
     abstract = paper.get("abstract", "") or ""
     text = ""
     figures = []
-    pdf_path = "/tmp/paper.pdf"
+    pdf_path = None
 
     if pdf_url:
         try:
             print(f"   Downloading PDF: {pdf_url[:80]}...")
-            resp = requests.get(pdf_url, timeout=45, headers={
-                "User-Agent": "F1ScienceCardNews/1.0 (research automation)"
-            })
-            if resp.status_code == 200 and len(resp.content) > 1000:
-                with open(pdf_path, "wb") as f:
-                    f.write(resp.content)
-
-                # 텍스트 추출 (pdfplumber)
-                with pdfplumber.open(pdf_path) as pdf:
-                    pages_text = []
-                    for page in pdf.pages[:25]:  # 최대 25페이지
-                        pt = page.extract_text()
-                        if pt:
-                            pages_text.append(pt)
-                    text = "\n".join(pages_text)
-
-                # Figure 추출 (PyMuPDF)
-                figures = extract_figures_from_pdf(pdf_path)
+            store = PdfStore(PDF_STORE_DIR, max_bytes=PDF_MAX_MB * 1024 * 1024)
+            with telemetry.span("download") as attrs:
+                pdf_path = str(store.fetch(paper["doi"], pdf_url))
+                attrs["bytes"] = os.path.getsize(pdf_path)
+            telemetry.count("pdf_bytes", attrs["bytes"])
+
+            # 텍스트 + Figure 추출 (PyMuPDF 단일 패스)
+            with telemetry.span("extract") as attrs:
+                text, figures, stats = extract_document(pdf_path, figures_dir_for(paper["doi"]))
+                attrs.update(stats, chars=len(text), figures=len(figures))
+            telemetry.count("pdf_pages", stats["pages_parsed"])
+            print(f"   Parsed {stats['pages_parsed']}/{stats['pages_available']} pages "
+                  f"(stop: {stats['stopped']}, {len(text)} chars, peak RSS {stats['peak_rss_mb']:.0f} MB)")
 
-            else:
-                print(f"   [WARN] PDF download failed: HTTP {resp.status_code}")
         except Exception as e:
             print(f"   [WARN] PDF processing error: {e}")
 
@@ -138,96 +394,154 @@ def download_and_extract(paper):
         text = abstract
         print("   Using abstract only (PDF text extraction failed)")
 
-    # 토큰 절약: 최대 15000자
-    if len(text) > 15000:
-        text = text[:15000]
-
     return text, figures, pdf_path
 
 
-def extract_figures_from_pdf(pdf_path):
-    """PDF에서 Figure 후보 이미지 추출 (PyMuPDF)"""
-    figures = []
-    try:
-        import fitz
-        doc = fitz.open(pdf_path)
-        fig_dir = Path("/tmp/figures")
-        fig_dir.mkdir(exist_ok=True)
-
-        for page_num in range(min(len(doc), 25)):
-            page = doc[page_num]
-            for img_idx, img in enumerate(page.get_images(full=True)):
-                try:
-                    xref = img[0]
-                    pix = fitz.Pixmap(doc, xref)
-                    if pix.n >= 5:  # CMYK → RGB
-                        pix = fitz.Pixmap(fitz.csRGB, pix)
-                    # 크기 필터: 300x200 이상만
-                    if pix.width >= 300 and pix.height >= 200:
-                        fname = f"figure_{page_num}_{img_idx}.png"
-                        pix.save(str(fig_dir / fname))
-                        figures.append({
-                            "filename": fname,
-                            "width": pix.width,
-                            "height": pix.height,
-                            "page": page_num
-                        })
-                except Exception:
-                    continue
-        doc.close()
-    except ImportError:
-        print("   [INFO] PyMuPDF not available, skipping figure extraction")
-    except Exception as e:
-        print(f"   [WARN] Figure extraction error: {e}")
+def safe_doi_name(doi):
+    """DOI → 파일/디렉터리 이름으로 쓸 수 있는 문자열"""
+    return doi.replace("/", "_").replace(".", "-")[:60]
+
 
-    print(f"   Extracted {len(figures)} figure candidates")
-    return figures
+def figures_dir_for(doi):
+    """논문별 Figure 디렉터리 (논문끼리 파일이 섞이지 않도록 분리)"""
+    return FIGURES_DIR / safe_doi_name(doi)
 
 
 # =============================================
 # STEP 3-5: LLM API 호출 (폴백 체인)
 # =============================================
-def call_llm(prompt):
-    """Gemini → Groq → Gemini Flash-Lite 폴백 체인"""
-    providers = []
-
-    if GEMINI_KEY:
-        providers.append(("gemini", "gemini-2.5-flash-preview-05-20", GEMINI_KEY))
-    if GROQ_KEY:
-        providers.append(("groq", "llama-3.3-70b-versatile", GROQ_KEY))
-    if GEMINI_KEY:
-        providers.append(("gemini", "gemini-2.0-flash-lite", GEMINI_KEY))
-
-    if not providers:
+def call_llm(prompt, stage="llm", on_key=None):
+    """Gemini / Groq / Gemini Flash-Lite 중 라우터가 고른 경로로 호출 (응답 캐시 우선)
+
+    on_key(key, value): 스트리밍 중 최상위 JSON 키의 값이 완성될 때마다 호출 (캐시 히트 시에도 재생)
+    """
+    router = get_llm_router()
+    if not router.routes:
         raise Exception("No LLM API keys configured!")
 
-    for provider_type, model, key in providers:
-        try:
-            if provider_type == "gemini":
-                return call_gemini(prompt, key, model)
-            elif provider_type == "groq":
-                return call_groq(prompt, key, model)
-        except Exception as e:
-            print(f"   [WARN] {model} failed: {e}")
-            time.sleep(5)
-            continue
+    # 캐시 조회 / 저장은 여기서만: 어느 제공자든 같은 프롬프트의 캐시가 있으면 네트워크 없이 반환
+    for route in router.routes:
+        cached = LLM_CACHE.get(llm_cache_key(route.provider, route.model, prompt))
+        if cached is not None:
+            record_llm_cache(stage, hit=True)
+            telemetry.count("llm_cache", stage=stage, result="hit")
+            print(f"   💾 LLM cache hit ({stage}, {route.model})")
+            replay_keys(cached, on_key)
+            return cached
+    record_llm_cache(stage, hit=False)
+    telemetry.count("llm_cache", stage=stage, result="miss")
+
+    routes, decision = router.plan(stage, doi=telemetry.current_doi())
+    for route in routes:
+        started = time.monotonic()
+        with telemetry.span("llm", stage=stage, provider=route.provider, model=route.model) as attrs:
+            try:
+                if route.provider == "gemini":
+                    text = (call_gemini_stream(prompt, route.key, route.model, on_key) if LLM_STREAMING
+                            else call_gemini(prompt, route.key, route.model))
+                elif route.provider == "groq":
+                    text = (call_groq_stream(prompt, route.key, route.model, on_key) if LLM_STREAMING
+                            else call_groq(prompt, route.key, route.model))
+                else:
+                    continue
+                if not LLM_STREAMING:
+                    try:
+                        parse_json_response(text)
+                    except ValueError as e:
+                        raise ProviderError(f"{route.model} returned unusable JSON: {e}") from e
+                    replay_keys(text, on_key)
+            except Exception as e:
+                print(f"   [WARN] {route.model} failed: {e}")
+                attrs["error"] = f"{type(e).__name__}: {e}"[:200]
+                router.record_failure(route, e, time.monotonic() - started, decision)
+                get_state_store().record_llm_call(route.model, datetime.now().strftime("%Y-%m-%d"))
+                telemetry.count("llm_calls", provider=route.provider, model=route.model, outcome="error")
+                continue
+            tokens_in, tokens_out = count_llm_tokens(prompt, text)
+            attrs.update(tokens_in=tokens_in, tokens_out=tokens_out, chars_out=len(text))
+        remember_llm_response(llm_cache_key(route.provider, route.model, prompt), text)
+        router.record_success(route, time.monotonic() - started, decision)
+        get_state_store().record_llm_call(route.model, datetime.now().strftime("%Y-%m-%d"))
+        telemetry.count("llm_calls", provider=route.provider, model=route.model, outcome="ok")
+        telemetry.count("llm_tokens", tokens_in, model=route.model, direction="in")
+        telemetry.count("llm_tokens", tokens_out, model=route.model, direction="out")
+        return text
 
     raise Exception("All LLM providers failed!")
 
 
+def count_llm_tokens(prompt, text):
+    """캐시 히트가 아닌 실제 호출만 현재 단계의 토큰 사용량(추정치)에 더함 → (tokens_in, tokens_out)"""
+    tokens_in, tokens_out = estimate_tokens(prompt), estimate_tokens(text)
+    LLM_USAGE.tokens_in = getattr(LLM_USAGE, "tokens_in", 0) + tokens_in
+    LLM_USAGE.tokens_out = getattr(LLM_USAGE, "tokens_out", 0) + tokens_out
+    LLM_USAGE.calls = getattr(LLM_USAGE, "calls", 0) + 1
+    return tokens_in, tokens_out
+
+
+def get_llm_router():
+    """실행 단위로 공유하는 라우터 (기존 폴백 체인 순서를 우선순위로 사용, 오늘 쓴 쿼터는 state.db에서)"""
+    global LLM_ROUTER
+    with LLM_ROUTER_LOCK:
+        if LLM_ROUTER is None:
+            used = get_state_store().llm_calls_on(datetime.now().strftime("%Y-%m-%d"))
+            chain = []
+            if GEMINI_KEY:
+                chain.append(("gemini", "gemini-2.5-flash-preview-05-20", GEMINI_KEY))
+            if GROQ_KEY:
+                chain.append(("groq", "llama-3.3-70b-versatile", GROQ_KEY))
+            if GEMINI_KEY:
+                chain.append(("gemini", "gemini-2.0-flash-lite", GEMINI_KEY))
+            LLM_ROUTER = ProviderRouter([
+                Route(provider, model, key, preference=i, daily_quota=LLM_DAILY_QUOTA.get(model),
+                      used_today=used.get(model, 0))
+                for i, (provider, model, key) in enumerate(chain)
+            ])
+        return LLM_ROUTER
+
+
+def llm_cache_key(provider_type, model, prompt):
+    """프롬프트 + 모델 + 생성 설정 해시"""
+    return cache_key(provider_type, model, LLM_GEN_CONFIG, prompt)
+
+
+def remember_llm_response(key, text):
+    """JSON으로 파싱되는 응답만 캐시 (깨진 응답이 재실행마다 재사용되지 않도록)"""
+    try:
+        parse_json_response(text)
+    except ValueError:
+        return
+    LLM_CACHE.put(key, text)
+
+
+def record_llm_cache(stage, hit):
+    with LLM_CACHE_LOCK:
+        stats = LLM_CACHE_STATS.setdefault(stage, {"hits": 0, "misses": 0})
+        stats["hits" if hit else "misses"] += 1
+
+
+def llm_cache_report():
+    with LLM_CACHE_LOCK:
+        parts = [f"{stage} {s['hits']}/{s['hits'] + s['misses']}" for stage, s in LLM_CACHE_STATS.items()]
+    return "LLM cache hits: " + (", ".join(parts) if parts else "no calls")
+
+
 def call_gemini(prompt, api_key, model="gemini-2.5-flash-preview-05-20"):
     """Google Gemini API 호출"""
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/{model}:generateContent?key={api_key}"
+    LLM_BUCKETS["gemini"].acquire()
+    url = f"{GEMINI_API_BASE}/models/{model}:generateContent?key={api_key}"
     payload = {
         "contents": [{"parts": [{"text": prompt}]}],
-        "generationConfig": {"temperature": 0.3, "maxOutputTokens": 4096}
+        "generationConfig": {"temperature": LLM_GEN_CONFIG["temperature"],
+                             "maxOutputTokens": LLM_GEN_CONFIG["max_tokens"]}
     }
-    resp = requests.post(url, json=payload, timeout=60)
+    resp = http_client.post(url, json=payload, timeout=60)
 
     if resp.status_code == 429:
-        raise Exception("Gemini rate limited (429)")
+        raise ProviderError("Gemini rate limited (429)", status=429,
+                            retry_after=parse_retry_after(resp.headers.get("Retry-After")))
     if resp.status_code != 200:
-        raise Exception(f"Gemini HTTP {resp.status_code}: {resp.text[:200]}")
+        raise ProviderError(f"Gemini HTTP {resp.status_code}: {resp.text[:200]}", status=resp.status_code)
 
     data = resp.json()
     text = data["candidates"][0]["content"]["parts"][0]["text"]
@@ -236,23 +550,127 @@ def call_gemini(prompt, api_key, model="gemini-2.5-flash-preview-05-20"):
 
 def call_groq(prompt, api_key, model="llama-3.3-70b-versatile"):
     """GroqCloud API 호출"""
-    url = "https://api.groq.com/openai/v1/chat/completions"
+    LLM_BUCKETS["groq"].acquire()
+    url = f"{GROQ_API_BASE}/chat/completions"
     headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
     payload = {
         "model": model,
         "messages": [{"role": "user", "content": prompt}],
-        "temperature": 0.3,
-        "max_tokens": 4096,
+        "temperature": LLM_GEN_CONFIG["temperature"],
+        "max_tokens": LLM_GEN_CONFIG["max_tokens"],
     }
-    resp = requests.post(url, headers=headers, json=payload, timeout=60)
+    resp = http_client.post(url, headers=headers, json=payload, timeout=60)
 
     if resp.status_code == 429:
-        raise Exception("Groq rate limited (429)")
+        raise ProviderError("Groq rate limited (429)", status=429,
+                            retry_after=parse_retry_after(resp.headers.get("Retry-After")))
     if resp.status_code != 200:
-        raise Exception(f"Groq HTTP {resp.status_code}: {resp.text[:200]}")
+        raise ProviderError(f"Groq HTTP {resp.status_code}: {resp.text[:200]}", status=resp.status_code)
 
     data = resp.json()
-    return data["choices"][0]["message"]["content"]
+    text = data["choices"][0]["message"]["content"]
+    return text
+
+
+def call_gemini_stream(prompt, api_key, model="gemini-2.5-flash-preview-05-20", on_key=None):
+    """Gemini streamGenerateContent(SSE). 깨지거나 잘린 JSON은 스트림 도중 실패 처리"""
+    LLM_BUCKETS["gemini"].acquire()
+    url = f"{GEMINI_API_BASE}/models/{model}:streamGenerateContent?alt=sse&key={api_key}"
+    payload = {
+        "contents": [{"parts": [{"text": prompt}]}],
+        "generationConfig": {"temperature": LLM_GEN_CONFIG["temperature"],
+                             "maxOutputTokens": LLM_GEN_CONFIG["max_tokens"]}
+    }
+    with http_client.post(url, json=payload, timeout=60, stream=True) as resp:
+        if resp.status_code == 429:
+            raise ProviderError("Gemini rate limited (429)", status=429,
+                                retry_after=parse_retry_after(resp.headers.get("Retry-After")))
+        if resp.status_code != 200:
+            raise ProviderError(f"Gemini HTTP {resp.status_code}: {resp.text[:200]}", status=resp.status_code)
+
+        def chunks():
+            for event in iter_sse(resp):
+                candidate = (event.get("candidates") or [{}])[0]
+                for part in (candidate.get("content") or {}).get("parts", []):
+                    yield part.get("text", "")
+                if candidate.get("finishReason") == "MAX_TOKENS":
+                    raise StreamError("Gemini stopped at maxOutputTokens")
+
+        text = consume_json_stream(chunks(), on_key, "Gemini")
+
+    return text
+
+
+def call_groq_stream(prompt, api_key, model="llama-3.3-70b-versatile", on_key=None):
+    """GroqCloud SSE 스트리밍 (OpenAI 호환 delta). 깨지거나 잘린 JSON은 스트림 도중 실패 처리"""
+    LLM_BUCKETS["groq"].acquire()
+    url = f"{GROQ_API_BASE}/chat/completions"
+    headers = {"Authorization": f"Bearer {api_key}", "Content-Type": "application/json"}
+    payload = {
+        "model": model,
+        "messages": [{"role": "user", "content": prompt}],
+        "temperature": LLM_GEN_CONFIG["temperature"],
+        "max_tokens": LLM_GEN_CONFIG["max_tokens"],
+        "stream": True,
+    }
+    with http_client.post(url, headers=headers, json=payload, timeout=60, stream=True) as resp:
+        if resp.status_code == 429:
+            raise ProviderError("Groq rate limited (429)", status=429,
+                                retry_after=parse_retry_after(resp.headers.get("Retry-After")))
+        if resp.status_code != 200:
+            raise ProviderError(f"Groq HTTP {resp.status_code}: {resp.text[:200]}", status=resp.status_code)
+
+        def chunks():
+            for event in iter_sse(resp):
+                choice = (event.get("choices") or [{}])[0]
+                yield (choice.get("delta") or {}).get("content") or ""
+                if choice.get("finish_reason") == "length":
+                    raise StreamError("Groq stopped at max_tokens")
+
+        text = consume_json_stream(chunks(), on_key, "Groq")
+
+    return text
+
+
+def iter_sse(resp):
+    """SSE 응답의 data: 줄을 JSON 이벤트로 변환 ([DONE]에서 종료)"""
+    for line in resp.iter_lines(decode_unicode=True):
+        if isinstance(line, bytes):
+            line = line.decode("utf-8")
+        if not line or not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        yield json.loads(data)
+
+
+def consume_json_stream(chunks, on_key, provider_name):
+    """텍스트 조각을 점진적 파서에 흘려보내고 전체 텍스트 반환. 구조 오류는 즉시 ProviderError"""
+    parser = IncrementalJSONParser(on_key)
+    pieces = []
+    try:
+        for piece in chunks:
+            if piece:
+                pieces.append(piece)
+                parser.feed(piece)
+        parser.finish()
+    except StreamError as e:
+        raise ProviderError(f"{provider_name} stream rejected: {e}") from e
+    return "".join(pieces)
+
+
+def replay_keys(text, on_key):
+    """캐시/비스트리밍 응답에서도 on_key 콜백이 같은 순서로 불리도록 재생"""
+    if not on_key:
+        return
+    try:
+        data = parse_json_response(text)
+    except ValueError:
+        return
+    if isinstance(data, dict):
+        for key, value in data.items():
+            on_key(key, value)
 
 
 def parse_json_response(text):
@@ -282,253 +700,791 @@ def parse_json_response(text):
 # =============================================
 # STEP 6: 비주얼 소싱 + 카드 이미지 렌더링
 # =============================================
-def fetch_pexels_photo(query, output_path):
-    """Pexels API에서 사진 다운로드"""
+def pexels_photo(query, allow_network=True):
+    """검색어 → (공유 저장소의 사진 경로, 출처 정보). 색인에 있으면 네트워크 없이 반환
+
+    allow_network=False면 만료된 색인 항목도 그대로 사용 (보관본 재렌더링)
+    """
+    key = cache_key("pexels", query.strip().lower())
+    entry, fresh = PEXELS_INDEX.lookup(key)
+    if entry is not None:
+        credit = entry["value"]
+        path = ASSET_STORE.root / credit["asset"]
+        if path.exists() and (fresh or not allow_network):
+            telemetry.count("pexels_photos", source="index")
+            return path, credit
+    if not allow_network:
+        telemetry.count("pexels_photos", source="missing")
+        return None, None
+
+    with telemetry.span("pexels", query=query) as attrs:
+        photo, data = fetch_pexels_photo(query)
+        if data is None:
+            attrs["error"] = "no photo"
+        else:
+            attrs["bytes"] = len(data)
+    if data is None:
+        telemetry.count("pexels_photos", source="missing")
+        return None, None
+    telemetry.count("pexels_photos", source="network")
+    telemetry.count("pexels_bytes", len(data))
+    path = ASSET_STORE.put_image(data)
+    credit = {
+        "asset": path.relative_to(ASSET_STORE.root).as_posix(),
+        "photo_id": photo.get("id"),
+        "photographer": photo.get("photographer", "Unknown"),
+        "photographer_url": photo.get("photographer_url", ""),
+        "pexels_url": photo.get("url", ""),
+    }
+    PEXELS_INDEX.put(key, credit)
+    return path, credit
+
+
+def prefetch_pexels(queries):
+    """분석/스크립트 단계에서 검색어가 나오자마자 사진 검색 + 다운로드를 백그라운드로 시작"""
+    with PEXELS_PREFETCH_LOCK:
+        for query in queries:
+            if query and query not in PEXELS_PREFETCH and not blocked_terms(query):
+                PEXELS_PREFETCH[query] = PEXELS_PREFETCH_POOL.submit(pexels_photo, query)
+
+
+def prefetched_pexels_photo(query):
+    """선행 조회 결과를 기다려 반환. 조회가 실패했으면(예외 또는 사진 없음) 그 Future를 버려 다음 논문이
+    같은 실패를 물려받지 않게 하고, 이번에는 직접 다시 조회"""
+    with PEXELS_PREFETCH_LOCK:
+        future = PEXELS_PREFETCH.get(query)
+    if future is None:
+        return pexels_photo(query, allow_network=False)
+    try:
+        photo_path, credit = future.result()
+        if photo_path is not None:
+            return photo_path, credit
+    except Exception as e:
+        print(f"   [WARN] Pexels prefetch error for '{query}': {e}")
+    with PEXELS_PREFETCH_LOCK:
+        if PEXELS_PREFETCH.get(query) is future:
+            del PEXELS_PREFETCH[query]
+    if not PEXELS_KEY:
+        return None, None
+    try:
+        return pexels_photo(query)
+    except Exception as e:
+        print(f"   [WARN] Pexels error for '{query}': {e}")
+        return None, None
+
+
+def pexels_search(query):
+    resp = http_client.get(
+        f"{PEXELS_API_BASE}/search",
+        params={"query": query, "per_page": 5, "orientation": "square"},
+        headers={"Authorization": PEXELS_KEY}, timeout=10
+    )
+    if resp.status_code != 200:
+        return []
+    return resp.json().get("photos", [])
+
+
+def fetch_pexels_photo(query):
+    """Pexels API에서 사진 다운로드 → (photo 정보, 원본 bytes). 저장은 호출 측에서 공유 저장소로"""
     if not PEXELS_KEY:
         print(f"   [WARN] No Pexels API key, skipping photo for: {query}")
-        return None
+        return None, None
 
     try:
-        headers = {"Authorization": PEXELS_KEY}
-        resp = requests.get(
-            "https://api.pexels.com/v1/search",
-            params={"query": query, "per_page": 5, "orientation": "square"},
-            headers=headers, timeout=10
-        )
-        if resp.status_code == 200:
-            photos = resp.json().get("photos", [])
-            if photos:
-                # 첫 번째 사진의 고해상도 버전
-                img_url = photos[0]["src"]["large2x"]
-                img_resp = requests.get(img_url, timeout=15)
-                if img_resp.status_code == 200:
-                    with open(output_path, "wb") as f:
-                        f.write(img_resp.content)
-                    photographer = photos[0].get("photographer", "Unknown")
-                    print(f"   📸 Pexels photo saved: {query} (by {photographer})")
-                    return output_path
+        photos = pexels_search(query)
+        if photos:
+            # 첫 번째 사진의 고해상도 버전 (저장 시 카드 크기로 축소)
+            img_url = photos[0]["src"]["large2x"]
+            img_resp = http_client.get(img_url, timeout=15)
+            if img_resp.status_code == 200:
+                photographer = photos[0].get("photographer", "Unknown")
+                print(f"   📸 Pexels photo fetched: {query} (by {photographer})")
+                return photos[0], img_resp.content
         print(f"   [WARN] Pexels search returned no results for: {query}")
     except Exception as e:
         print(f"   [WARN] Pexels error: {e}")
-    return None
+    return None, None
 
 
-def render_cards(cardnews, analysis, figures_dir, output_dir):
-    """HTML 템플릿 + Playwright로 카드뉴스 이미지 생성"""
-    from jinja2 import Environment, FileSystemLoader
-    from playwright.sync_api import sync_playwright
+def render_cards(cardnews, analysis, figures_dir, output_dir, fetch_photos=True):
+    """HTML 템플릿 + 공유 렌더 서비스(Playwright)로 카드뉴스 이미지 생성 → (rendered, reused, failed)
 
-    env = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)))
+    fetch_photos=False면 네트워크 없이 이미 저장된 사진만 사용 (보관본 재렌더링)
+    RENDER_BATCH면 다시 그릴 카드를 한 문서로 묶어 한 번에 로드하고 카드 요소별로 캡처
+    """
+    env = get_template_env()
     output_dir = Path(output_dir)
     output_dir.mkdir(parents=True, exist_ok=True)
 
-    # 1) Pexels 사진 다운로드
-    pexels_cache = {}
+    # 1) 배경 사진: assets.json 참조 → 예전 방식 bg_N.jpg(공유 저장소로 이전) → Pexels 색인/다운로드(선행 조회와 공유)
+    refs = load_refs(output_dir)
+    photos = refs.setdefault("photos", {})
+    queries = []
     for card in cardnews.get("cards", []):
         query = card.get("pexels_query", "")
-        vs = card.get("visual_source", "")
-        if vs == "pexels" and query and query not in pexels_cache:
-            photo_path = output_dir / f"bg_{card['card_num']}.jpg"
-            result = fetch_pexels_photo(query, str(photo_path))
-            if result:
-                pexels_cache[query] = str(photo_path)
+        if card.get("visual_source") == "pexels" and query and query not in queries:
+            queries.append(query)
+            legacy_path = output_dir / f"bg_{card['card_num']}.jpg"
+            if legacy_path.exists() and query not in photos:
+                stored = ASSET_STORE.put_image(legacy_path.read_bytes())
+                photos[query] = {"asset": relative_ref(output_dir, stored)}
+                legacy_path.unlink()
+    missing = [q for q in queries if resolve_ref(output_dir, photo_ref(photos.get(q))) is None]
+    if fetch_photos:
+        prefetch_pexels(missing)  # 아직 시작 안 된 검색어도 한꺼번에 동시 조회
 
-    # 2) Playwright로 렌더링
-    with sync_playwright() as p:
-        browser = p.chromium.launch()
-        page = browser.new_page(viewport={"width": 1080, "height": 1080})
+    pexels_cache = {}
+    with telemetry.span("render.photos", queries=len(queries)):  # 선행 조회가 덜 끝났으면 여기서 대기
+        for query in queries:
+            photo_path = resolve_ref(output_dir, photo_ref(photos.get(query)))
+            if photo_path is None:
+                if fetch_photos:
+                    photo_path, credit = prefetched_pexels_photo(query)
+                else:
+                    photo_path, credit = pexels_photo(query, allow_network=False)
+                if photo_path is not None:
+                    photos[query] = dict(credit, asset=relative_ref(output_dir, photo_path))
+            if photo_path is not None:
+                pexels_cache[query] = str(photo_path)
+    save_refs(output_dir, refs)
+
+    # 2) 템플릿 렌더링 → 입력이 바뀐 카드만 렌더 서비스에서 동시 캡처
+    manifest = RenderManifest(output_dir)
+    template_hashes = {}
+    items, pending = [], {}
+    batch_styles = {}  # 템플릿 → styles 블록 (일괄 문서에 종류별로 한 번씩)
+    reused = failed = 0
+    for card in cardnews.get("cards", []):
+        try:
+            card_type = card.get("type", "cover")
+            template_name = f"card_{card_type}.html"
+
+            # 이미지 경로 결정
+            bg_image_path = ""
+            asset_paths = []
+            figure_caption = card.get("figure_caption", "")
+            chart_data = card.get("chart_data", {})
+
+            vs = card.get("visual_source", "")
+            if vs == "pexels":
+                query = card.get("pexels_query", "")
+                cached = pexels_cache.get(query)
+                if cached:
+                    bg_image_path = f"file://{os.path.abspath(cached)}"
+                    asset_paths.append(os.path.abspath(cached))
+            elif vs == "paper_figure":
+                fig_file = card.get("figure_file", "")
+                if fig_file and figures_dir:
+                    fig_path = Path(figures_dir) / fig_file
+                    if fig_path.exists():
+                        bg_image_path = f"file://{fig_path.absolute()}"
+                        asset_paths.append(str(fig_path.absolute()))
+
+            context = dict(
+                bg_image_path=bg_image_path,
+                figure_caption=figure_caption,
+                chart_data=chart_data,
+                **{k: v for k, v in card.items()
+                   if k not in ("visual_source", "pexels_query", "figure_file", "chart_data", "figure_caption")}
+            )
+            if template_name not in template_hashes:
+                template_hashes[template_name] = template_digest(env, template_name)
+            digest = card_digest(template_hashes[template_name], context, asset_paths, CARD_FORMAT)
+            out_path = output_dir / f"card_{card['card_num']:02d}.png"
+            if manifest.is_current(out_path.with_suffix(CARD_FORMATS[CARD_FORMAT]).name, digest):
+                reused += 1
+                continue
 
-        for card in cardnews.get("cards", []):
-            try:
-                card_type = card.get("type", "cover")
-                template_name = f"card_{card_type}.html"
-
-                # 이미지 경로 결정
-                bg_image_path = ""
-                figure_caption = card.get("figure_caption", "")
-                chart_data = card.get("chart_data", {})
-
-                vs = card.get("visual_source", "")
-                if vs == "pexels":
-                    query = card.get("pexels_query", "")
-                    cached = pexels_cache.get(query)
-                    if cached:
-                        bg_image_path = f"file://{os.path.abspath(cached)}"
-                elif vs == "paper_figure":
-                    fig_file = card.get("figure_file", "")
-                    if fig_file and figures_dir:
-                        fig_path = Path(figures_dir) / fig_file
-                        if fig_path.exists():
-                            bg_image_path = f"file://{fig_path.absolute()}"
-
-                # 템플릿 렌더링
-                template = env.get_template(template_name)
-                html = template.render(
-                    bg_image_path=bg_image_path,
-                    figure_caption=figure_caption,
-                    chart_data=chart_data,
-                    **{k: v for k, v in card.items()
-                       if k not in ("visual_source", "pexels_query", "figure_file", "chart_data", "figure_caption")}
-                )
-
-                page.set_content(html, wait_until="networkidle")
-                page.wait_for_timeout(800)  # 이미지 로딩 대기
-
-                out_path = output_dir / f"card_{card['card_num']:02d}.png"
-                page.screenshot(path=str(out_path))
-                print(f"   🎨 Rendered: {out_path.name}")
+            # 템플릿 렌더링 (일괄 모드는 카드 블록만, 스타일은 종류별로 한 번)
+            template = env.get_template(template_name)
+            if RENDER_BATCH:
+                styles, html = card_fragment(template, context)
+                batch_styles.setdefault(template_name, styles)
+            else:
+                html = template.render(**context)
+            items.append((html, out_path))
+            pending[out_path.name] = (digest, template_name)
 
-            except Exception as e:
-                print(f"   [WARN] Render error card {card.get('card_num')}: {e}")
-                traceback.print_exc()
+        except Exception as e:
+            failed += 1
+            print(f"   [WARN] Render error card {card.get('card_num')}: {e}")
+            traceback.print_exc()
 
-        browser.close()
+    rendered = 0
+    with telemetry.span("render.capture", cards=len(items), batch=RENDER_BATCH):
+        if not items:
+            results = []
+        elif RENDER_BATCH:
+            document = env.get_template(BATCH_TEMPLATE).render(styles="".join(batch_styles.values()),
+                                                               cards="\n".join(html for html, _ in items))
+            results = get_render_service().render_batch(document, [out_path for _, out_path in items])
+        else:
+            results = get_render_service().render_many(items)
+    for out_path, error in results:
+        if error is None:
+            rendered += 1
+            final_path = ASSET_STORE.encode_card(out_path, CARD_FORMAT)
+            telemetry.count("card_bytes", final_path.stat().st_size, format=CARD_FORMAT)
+            for stale in output_dir.glob(f"{out_path.stem}.*"):  # 다른 인코딩으로 남아 있던 파일
+                if stale != final_path:
+                    stale.unlink()
+            manifest.record(final_path.name, *pending[out_path.name])
+            print(f"   🎨 Rendered: {final_path.name}")
+        else:
+            failed += 1
+            manifest.forget(out_path.with_suffix(CARD_FORMATS[CARD_FORMAT]).name)
+            print(f"   [WARN] Render error {out_path.name}: {error}")
+    manifest.save()
+    telemetry.count("cards", rendered, result="rendered")
+    telemetry.count("cards", reused, result="reused")
+    telemetry.count("cards", failed, result="failed")
+    print(f"   🎨 {rendered} cards rendered, {reused} unchanged (render cache)")
+    return rendered, reused, failed
+
+
+def get_template_env():
+    from jinja2 import Environment, FileSystemLoader
 
+    global TEMPLATE_ENV
+    with TEMPLATE_ENV_LOCK:
+        if TEMPLATE_ENV is None:
+            TEMPLATE_ENV = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)))
+        return TEMPLATE_ENV
 
-# =============================================
-# MAIN: 전체 파이프라인 실행
-# =============================================
-def main():
-    print("=" * 60)
-    print(f"🏎️ F1 Science Card News Generator — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
-    print("=" * 60)
 
-    # STEP 1: 논문 검색
-    print("\n📚 STEP 1: Searching papers...")
-    papers = search_papers()
-    if not papers:
-        print("No new papers. Exiting.")
-        return
+def card_fragment(template, context):
+    """카드 템플릿의 styles / card 블록만 렌더링 → (css, html). 일괄 문서(_batch.html)에 끼워 넣음"""
+    template_context = template.new_context(context)
+    return ("".join(template.blocks["styles"](template_context)),
+            "".join(template.blocks["card"](template_context)))
 
-    history = json.loads(HISTORY_FILE.read_text()) if HISTORY_FILE.exists() else []
 
-    for paper in papers:
-        doi = paper["doi"]
-        title = paper.get("title", "Unknown")
-        print(f"\n{'─' * 50}")
-        print(f"📄 Processing: {title}")
-        print(f"   DOI: {doi}")
+def photo_ref(entry):
+    """assets.json 항목 → 저장소 상대 경로 (이전 형식은 문자열)"""
+    return entry.get("asset") if isinstance(entry, dict) else entry
 
-        try:
-            # STEP 2: 텍스트 + Figure 추출
-            print("\n   📥 STEP 2: Downloading & extracting...")
-            text, figures, pdf_path = download_and_extract(paper)
 
-            if not text.strip():
-                print("   [SKIP] No text extracted.")
-                continue
+def get_render_service():
+    """실행당 브라우저 1개를 논문 사이에 공유 (첫 렌더 때 시작)"""
+    global RENDER_SERVICE
+    with RENDER_SERVICE_LOCK:
+        if RENDER_SERVICE is None:
+            RENDER_SERVICE = RenderService(pages=RENDER_PAGES, ready_timeout_ms=RENDER_READY_TIMEOUT_MS)
+        return RENDER_SERVICE
 
-            figure_list_str = json.dumps(figures, indent=2) if figures else "없음 (추출 실패 또는 이미지 없음)"
-            figures_dir = "/tmp/figures" if figures else None
 
-            # Determine license (best effort)
-            license_str = "Unknown (check paper)"
-            oa_info = paper.get("openAccessPdf", {})
-            if oa_info:
-                license_str = "Open Access (likely CC-BY, verify on publisher site)"
+# =============================================
+# MAIN: 전체 파이프라인 실행 (단계별 워커 + 크기 제한 큐)
+# =============================================
+def stage_extract(job):
+    """STEP 2: 텍스트 + Figure 추출"""
+    paper = job["paper"]
+    print(f"\n   📥 [{job['doi']}] STEP 2: Downloading & extracting...")
+    text, figures, pdf_path = download_and_extract(paper)
 
-            # STEP 3: 논문 분석
-            print("\n   🔬 STEP 3: Analyzing paper...")
-            authors_str = ", ".join([
-                a.get("name", "Unknown") for a in (paper.get("authors") or [])[:5]
-            ])
-            analysis_prompt = PROMPT_ANALYSIS.format(
-                title=title, authors=authors_str, doi=doi,
-                year=paper.get("year", "N/A"), venue=paper.get("venue", "N/A"),
-                license=license_str, paper_text=text, figure_list=figure_list_str
-            )
-            analysis_raw = call_llm(analysis_prompt)
-            analysis = parse_json_response(analysis_raw)
-            print(f"   ✅ Analysis complete: {analysis.get('hook_headline', '?')}")
+    if not text.strip():
+        print(f"   [SKIP] [{job['doi']}] No text extracted.")
+        return None
 
-            time.sleep(3)
+    # Determine license (best effort)
+    license_str = "Unknown (check paper)"
+    oa_info = paper.get("openAccessPdf", {})
+    if oa_info:
+        license_str = "Open Access (likely CC-BY, verify on publisher site)"
+
+    job.update({
+        "text": text,
+        "figures": figures,
+        "figures_dir": figures_dir_for(job["doi"]) if figures else None,
+        "license": license_str,
+        "authors": ", ".join([
+            a.get("name", "Unknown") for a in (paper.get("authors") or [])[:5]
+        ]),
+    })
+    return job
+
+
+def stage_analyze(job):
+    """STEP 3: 논문 분석"""
+    paper = job["paper"]
+    print(f"\n   🔬 [{job['doi']}] STEP 3: Analyzing paper...")
+    figures = job["figures"]
+    figure_list_str = json.dumps(figures, indent=2) if figures else "없음 (추출 실패 또는 이미지 없음)"
+    analysis_prompt = PROMPT_ANALYSIS.format(
+        title=job["title"], authors=job["authors"], doi=job["doi"],
+        year=paper.get("year", "N/A"), venue=paper.get("venue", "N/A"),
+        license=job["license"], figure_list=figure_list_str,
+        paper_text=select_passages(job["text"], paper_token_budget("analysis"))
+    )
+    def on_key(key, value):
+        # 분석 응답 스트림에서 검색어가 나오면 나머지 응답을 기다리지 않고 Pexels 조회 시작
+        if key == "pexels_search" and isinstance(value, dict):
+            prefetch_pexels([qs[0] for qs in value.values() if isinstance(qs, list) and qs])
+
+    analysis_raw = call_llm(analysis_prompt, stage="analysis", on_key=on_key)
+    job["analysis"] = parse_json_response(analysis_raw)
+    print(f"   ✅ [{job['doi']}] Analysis complete: {job['analysis'].get('hook_headline', '?')}")
+    return job
+
+
+def paper_token_budget(kind):
+    """설정된 제공자 중 가장 작은 예산 (폴백 시에도 프롬프트가 넘치지 않도록)"""
+    providers = {route.provider for route in get_llm_router().routes} or set(PAPER_TOKEN_BUDGETS)
+    return min(PAPER_TOKEN_BUDGETS[p][kind] for p in providers if p in PAPER_TOKEN_BUDGETS)
+
+
+def claim_numbers(analysis, cardnews):
+    """검증할 수치(data_point, stat_big, chart_data)에서 숫자만 뽑아 본문 선택 가산점으로 사용"""
+    claims = [f.get("data_point", "") for f in analysis.get("key_findings", [])]
+    for card in cardnews.get("cards", []):
+        claims.append(str(card.get("stat_big", "")))
+        claims.append(str((card.get("chart_data") or {}).get("value", "")))
+    return sorted({n for claim in claims for n in re.findall(r"\d+(?:\.\d+)?", claim) if len(n) >= 2})
+
+
+def cardnews_prompt_for(analysis):
+    use_figures = analysis.get("figure_selection", {}).get("use_paper_figures", False)
+    available_figures = analysis.get("figure_selection", {}).get("selected_figures", [])
+    return PROMPT_CARDNEWS.format(
+        analysis_json=json.dumps(analysis, ensure_ascii=False, indent=2),
+        use_figures=str(use_figures),
+        available_figures=json.dumps(available_figures)
+    )
+
+
+def stage_script(job):
+    """STEP 4: 카드뉴스 스크립트"""
+    print(f"\n   ✍️ [{job['doi']}] STEP 4: Generating card news script...")
+    cardnews_raw = call_llm(cardnews_prompt_for(job["analysis"]), stage="script")
+    job["cardnews"] = parse_json_response(cardnews_raw)
+    print(f"   ✅ [{job['doi']}] Card script: {len(job['cardnews'].get('cards', []))} cards generated")
+    return job
+
+
+def stage_verify(job):
+    """STEP 5: 검증 (규칙 기반 → 남은 항목만 LLM, 실패 시 1회 재생성)"""
+    print(f"\n   🔍 [{job['doi']}] STEP 5: Verifying accuracy...")
+    analysis = job["analysis"]
+    if LOCAL_VERIFY:
+        verification = verify_locally_then_llm(job)
+    else:
+        prefetch_pexels(card_queries(job["cardnews"]))  # 검증 LLM 호출과 겹쳐서 사진 조회
+        verification = verify_with_llm(job)
+    verdict = verification.get("verdict", "UNKNOWN")
+    print(f"   ✅ [{job['doi']}] Verification: {verdict} ({verification.get('source', 'llm')})")
+
+    # 검증 실패 시 1회 재생성 — 문제 카드를 특정할 수 있으면 그 카드만
+    if verdict == "REVISION_NEEDED":
+        card_nums = failing_card_nums(verification, job["cardnews"])
+        if card_nums:
+            print(f"   🔄 [{job['doi']}] Revision needed — regenerating cards {sorted(card_nums)}...")
+            verification["revised_cards"] = revise_cards(job, verification, card_nums)
+        else:
+            print(f"   🔄 [{job['doi']}] Revision needed — regenerating card script...")
+            revision_instructions = verification.get("revision_instructions", "")
+            cardnews_prompt_v2 = cardnews_prompt_for(analysis) + \
+                f"\n\n## 수정 지시 (팩트체커 피드백)\n{revision_instructions}"
+
+            cardnews_raw_v2 = call_llm(cardnews_prompt_v2, stage="revision")
+            job["cardnews"] = parse_json_response(cardnews_raw_v2)
+            verification["revised_cards"] = [c.get("card_num") for c in job["cardnews"].get("cards", [])]
+        if LOCAL_VERIFY:  # 재작성된 카드 재검증 (금지어/DOI/라이선스 자동 수정 포함). 여전히 틀리면 저장하지 않음
+            recheck = verify_locally_then_llm(job)
+            verification["after_revision"] = {
+                "verdict": recheck["verdict"], "source": recheck["source"],
+                "checks": [c for c in recheck["checks"] if c["status"] != "PASS"],
+            }
+            telemetry.count("revision_recheck", verdict=recheck["verdict"])
+            print(f"   🔁 [{job['doi']}] Re-verified revision: {recheck['verdict']} ({recheck['source']})")
+            if recheck["verdict"] == "REVISION_NEEDED":
+                raise ValueError("revised cards still fail verification: "
+                                 + recheck["revision_instructions"][:300])
+        # 바뀐 카드의 Pexels 사진만 새로 조회 (나머지 카드는 기존 검색어 그대로)
+        prefetch_pexels(card_queries(job["cardnews"], verification["revised_cards"]))
+        print(f"   ✅ [{job['doi']}] Revised: {len(verification['revised_cards'])} cards")
+
+    job["verification"] = verification
+    return job
+
+
+def card_queries(cardnews, card_nums=None):
+    """pexels 배경을 쓰는 카드의 검색어 (card_nums가 있으면 그 카드만)"""
+    return [c["pexels_query"] for c in cardnews.get("cards", [])
+            if c.get("visual_source") == "pexels" and c.get("pexels_query")
+            and (card_nums is None or c.get("card_num") in card_nums)]
+
+
+def failing_card_nums(verification, cardnews):
+    """FAIL 항목 → 문제 card_num 집합. 카드를 특정할 수 없는 FAIL이 있거나 전부면 None (전체 재생성)"""
+    valid = {card.get("card_num") for card in cardnews.get("cards", [])}
+    nums = set()
+    for check in verification.get("checks", []):
+        if check.get("status") != "FAIL":
+            continue
+        num = check.get("card_num")
+        if num is None:
+            match = re.search(r"(?:카드|card)\s*(\d+)", str(check.get("item", "")), re.IGNORECASE)
+            num = match.group(1) if match else None
+        try:
+            num = int(num)
+        except (TypeError, ValueError):
+            return None
+        if num not in valid:
+            return None
+        nums.add(num)
+    if not nums or nums == valid:
+        return None
+    return nums
+
+
+def revise_cards(job, verification, card_nums):
+    """PROMPT_CARD_REVISION으로 지적된 카드만 다시 작성해 교체 → 교체된 card_num 목록"""
+    cards = job["cardnews"].get("cards", [])
+    targets = [c for c in cards if c.get("card_num") in card_nums]
+    others = [{"card_num": c.get("card_num"), "type": c.get("type"), "headline": c.get("headline", "")}
+              for c in cards if c.get("card_num") not in card_nums]
+    notes = [f"- 카드 {check.get('card_num')}: {check.get('issue', '')} → {check.get('fix', '')}"
+             for check in verification.get("checks", [])
+             if check.get("status") == "FAIL" and check.get("card_num") in card_nums]
+    if verification.get("revision_instructions"):
+        notes.append(verification["revision_instructions"])
+
+    revision_prompt = PROMPT_CARD_REVISION.format(
+        analysis_json=json.dumps(job["analysis"], ensure_ascii=False, indent=2),
+        cards_json=json.dumps(targets, ensure_ascii=False, indent=2),
+        other_cards_json=json.dumps(others, ensure_ascii=False),
+        revision_instructions="\n".join(notes)
+    )
+    revised = parse_json_response(call_llm(revision_prompt, stage="revision")).get("cards", [])
+    by_num = {}
+    for card in revised:
+        try:
+            num = int(card.get("card_num"))
+        except (TypeError, ValueError):
+            continue
+        if num in card_nums:
+            by_num[num] = dict(card, card_num=num)
+    missing = sorted(card_nums - set(by_num))
+    if missing:
+        print(f"   [WARN] [{job['doi']}] Revision response missing cards {missing}, keeping originals")
+
+    job["cardnews"]["cards"] = [by_num.get(c.get("card_num"), c) for c in cards]
+    return sorted(by_num)
+
+
+def verify_with_llm(job):
+    """PROMPT_VERIFY: 분석 + 카드 스크립트 전체를 LLM이 검증"""
+    verify_prompt = PROMPT_VERIFY.format(
+        paper_text_excerpt=select_passages(job["text"], paper_token_budget("verify"),
+                                           boost_terms=claim_numbers(job["analysis"], job["cardnews"])),
+        license=job["license"],
+        analysis_json=json.dumps(job["analysis"], ensure_ascii=False),
+        cardnews_json=json.dumps(job["cardnews"], ensure_ascii=False)
+    )
+    verification = parse_json_response(call_llm(verify_prompt, stage="verify"))
+    verification["source"] = "llm"
+    return verification
+
+
+def verify_locally_then_llm(job):
+    """규칙 검사 후 판단 못 한 항목(claims)이 있으면 그것만 PROMPT_VERIFY_CLAIMS로 검증해 결과를 합침
+
+    규칙 검사에 FAIL이 있어도 claims(인과 표현, 불확실한 Figure 라이선스 등)는 LLM에 넘김 — 통과로 치지 않음
+    """
+    verification, claims = verify_locally(job["analysis"], job["cardnews"], job["text"],
+                                          job["license"], job["doi"])
+    passed = sum(1 for c in verification["checks"] if c["status"] == "PASS")
+    failed = sum(1 for c in verification["checks"] if c["status"] == "FAIL")
+    print(f"   🧮 [{job['doi']}] Local checks: {passed} pass, {failed} fail, {len(claims)} left for LLM")
+    prefetch_pexels(card_queries(job["cardnews"]))  # 금지어 수정이 끝난 검색어로, 검증 LLM 호출과 겹쳐서 조회
+    if not claims:
+        return verification
+
+    boost = sorted({n for claim in claims for n in re.findall(r"\d+(?:\.\d+)?", claim["claim"]) if len(n) >= 2})
+    claims_prompt = PROMPT_VERIFY_CLAIMS.format(
+        paper_text_excerpt=select_passages(job["text"], paper_token_budget("verify"), boost_terms=boost),
+        license=job["license"],
+        claims_json=json.dumps(claims, ensure_ascii=False, indent=2)
+    )
+    llm_verification = parse_json_response(call_llm(claims_prompt, stage="verify"))
+    verdict = llm_verification.get("verdict", "UNKNOWN")
+    if verification["verdict"] == "REVISION_NEEDED":
+        verdict = "REVISION_NEEDED"
+    instructions = [verification["revision_instructions"], llm_verification.get("revision_instructions", "")]
+    return {
+        "checks": verification["checks"] + llm_verification.get("checks", []),
+        "verdict": verdict,
+        "revision_instructions": "\n".join(i for i in instructions if i),
+        "source": "local+llm",
+    }
 
-            # STEP 4: 카드뉴스 스크립트
-            print("\n   ✍️ STEP 4: Generating card news script...")
-            use_figures = analysis.get("figure_selection", {}).get("use_paper_figures", False)
-            available_figures = analysis.get("figure_selection", {}).get("selected_figures", [])
 
-            cardnews_prompt = PROMPT_CARDNEWS.format(
-                analysis_json=json.dumps(analysis, ensure_ascii=False, indent=2),
-                use_figures=str(use_figures),
-                available_figures=json.dumps(available_figures)
-            )
-            cardnews_raw = call_llm(cardnews_prompt)
-            cardnews = parse_json_response(cardnews_raw)
-            print(f"   ✅ Card script: {len(cardnews.get('cards', []))} cards generated")
-
-            time.sleep(3)
-
-            # STEP 5: 검증
-            print("\n   🔍 STEP 5: Verifying accuracy...")
-            verify_prompt = PROMPT_VERIFY.format(
-                paper_text_excerpt=text[:5000],
-                license=license_str,
-                analysis_json=json.dumps(analysis, ensure_ascii=False),
-                cardnews_json=json.dumps(cardnews, ensure_ascii=False)
-            )
-            verify_raw = call_llm(verify_prompt)
-            verification = parse_json_response(verify_raw)
-            verdict = verification.get("verdict", "UNKNOWN")
-            print(f"   ✅ Verification: {verdict}")
-
-            # 검증 실패 시 1회 재생성
-            if verdict == "REVISION_NEEDED":
-                print("   🔄 Revision needed — regenerating card script...")
-                revision_instructions = verification.get("revision_instructions", "")
-                cardnews_prompt_v2 = PROMPT_CARDNEWS.format(
-                    analysis_json=json.dumps(analysis, ensure_ascii=False, indent=2),
-                    use_figures=str(use_figures),
-                    available_figures=json.dumps(available_figures)
-                ) + f"\n\n## 수정 지시 (팩트체커 피드백)\n{revision_instructions}"
-
-                time.sleep(3)
-                cardnews_raw_v2 = call_llm(cardnews_prompt_v2)
-                cardnews = parse_json_response(cardnews_raw_v2)
-                print(f"   ✅ Revised: {len(cardnews.get('cards', []))} cards")
-
-            # STEP 6: 이미지 렌더링
-            print("\n   🎨 STEP 6: Rendering card images...")
-            date_str = datetime.now().strftime("%Y-%m-%d")
-            safe_doi = doi.replace("/", "_").replace(".", "-")[:60]
-            run_output_dir = OUTPUT_DIR / f"{date_str}_{safe_doi}"
-
-            render_cards(cardnews, analysis, figures_dir, run_output_dir)
-
-            # 메타데이터 저장
-            metadata = {
-                "paper": {"title": title, "doi": doi, "year": paper.get("year"),
-                          "authors": authors_str, "venue": paper.get("venue")},
-                "analysis": analysis,
-                "cardnews": cardnews,
-                "verification": verification,
-                "generated_at": datetime.now().isoformat()
-            }
-            meta_path = run_output_dir / "metadata.json"
-            meta_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2))
+def stage_render(job):
+    """STEP 6: 이미지 렌더링"""
+    print(f"\n   🎨 [{job['doi']}] STEP 6: Rendering card images...")
+    date_str = datetime.now().strftime("%Y-%m-%d")
+    job["output_dir"] = OUTPUT_DIR / f"{date_str}_{safe_doi_name(job['doi'])}"
+    render_cards(job["cardnews"], job["analysis"], job["figures_dir"], job["output_dir"])
+    job["cards"] = sorted(path.name for path in job["output_dir"].glob("card_*")
+                          if path.suffix in CARD_FORMATS.values())
+    return job
+
+
+def stage_persist(job):
+    """메타데이터/캡션 저장 + STEP 7: 이력 갱신 (단일 워커)"""
+    paper = job["paper"]
+    run_output_dir = job["output_dir"]
+    cardnews = job["cardnews"]
+
+    metadata = {
+        "paper": {"title": job["title"], "doi": job["doi"], "year": paper.get("year"),
+                  "authors": job["authors"], "venue": paper.get("venue")},
+        "analysis": job["analysis"],
+        "cardnews": cardnews,
+        "verification": job["verification"],
+        "generated_at": datetime.now().isoformat()
+    }
+    meta_path = run_output_dir / "metadata.json"
+    meta_path.write_text(json.dumps(metadata, ensure_ascii=False, indent=2))
 
-            # Instagram caption 저장
-            caption = cardnews.get("instagram_caption", "")
-            if caption:
-                (run_output_dir / "instagram_caption.txt").write_text(caption)
+    # Instagram caption 저장
+    caption = cardnews.get("instagram_caption", "")
+    if caption:
+        (run_output_dir / "instagram_caption.txt").write_text(caption)
 
-            # STEP 7: 이력 갱신
-            history.append(doi)
-            HISTORY_FILE.write_text(json.dumps(history, indent=2))
+    get_state_store().mark_done(job["doi"], run_output_dir)
 
-            print(f"\n   🏁 DONE: {run_output_dir}")
+    print(f"\n   🏁 DONE: {run_output_dir}")
+    return job
 
-        except Exception as e:
-            print(f"\n   ❌ ERROR processing {doi}: {e}")
-            traceback.print_exc()
-            continue
 
-        time.sleep(5)  # API rate limit 방지
+def tracked(name, fn):
+    """단계 함수를 감싸 소요 시간 / 토큰 사용량을 상태 저장소와 span에 기록. None 반환(중단)은 skipped로 표시"""
+    def run(job):
+        LLM_USAGE.tokens_in = LLM_USAGE.tokens_out = LLM_USAGE.calls = 0
+        started = time.monotonic()
+        ok = False
+        try:
+            with telemetry.span(f"stage.{name}", doi=job["doi"]) as attrs, telemetry.profiled(name, job["doi"]):
+                out = fn(job)
+                ok = True
+                attrs.update(tokens_in=LLM_USAGE.tokens_in, tokens_out=LLM_USAGE.tokens_out)
+        finally:
+            get_state_store().record_stage(job["doi"], name, ok, time.monotonic() - started,
+                                           LLM_USAGE.tokens_in, LLM_USAGE.tokens_out, LLM_USAGE.calls)
+        if out is None:
+            get_state_store().mark_failed(job["doi"], name, "stage returned no result", status="skipped")
+        return out
+    return run
+
+
+def checkpointed(name, fn):
+    """단계 결과를 논문별 체크포인트로 저장. 체크포인트가 있으면 단계를 실행하지 않고 복원 (job["force"]의 단계 제외)"""
+    if name not in CHECKPOINT_FIELDS:
+        return fn
+
+    def run(job):
+        if name not in job.get("force", ()):
+            data = CHECKPOINTS.load(job["doi"], name)
+            if data is not None and restore_checkpoint(name, job, data):
+                print(f"   ♻️ [{job['doi']}] {name}: restored from checkpoint")
+                telemetry.count("checkpoint_restored", stage=name)
+                return job
+        out = fn(job)
+        if out is not None:
+            data = {field: str(out[field]) if isinstance(out[field], Path) else out[field]
+                    for field in CHECKPOINT_FIELDS[name]}
+            CHECKPOINTS.save(job["doi"], name, data)
+        return out
+    return run
+
+
+def restore_checkpoint(name, job, data):
+    """체크포인트 → job. 참조하는 파일(Figure, 카드 이미지)이 사라졌으면 False (단계 다시 실행)"""
+    if name == "extract" and data["figures_dir"]:
+        data["figures_dir"] = Path(data["figures_dir"])
+        if not data["figures_dir"].is_dir():
+            return False
+    if name == "render":
+        data["output_dir"] = Path(data["output_dir"])
+        if not all((data["output_dir"] / card).exists() for card in data["cards"]):
+            return False
+    job.update(data)
+    return True
+
+
+def get_state_store():
+    """실행 단위로 공유하는 상태 저장소. 처음 열 때 예전 processed_papers.json을 가져옴"""
+    global STATE
+    with STATE_LOCK:
+        if STATE is None:
+            STATE = StateStore(STATE_DB, max_attempts=STATE_MAX_ATTEMPTS)
+            imported = STATE.migrate_json(HISTORY_FILE)
+            if imported:
+                print(f"   Imported {imported} DOIs from {HISTORY_FILE} into {STATE_DB}")
+        return STATE
+
+
+def on_stage_error(stage_name, job, error):
+    print(f"\n   ❌ ERROR processing {job['doi']} at {stage_name}: {error}")
+    traceback.print_exc()
+    get_state_store().mark_failed(job["doi"], stage_name, f"{type(error).__name__}: {error}")
+
+
+def new_job(paper):
+    return {"paper": paper, "doi": paper["doi"], "title": paper.get("title", "Unknown")}
+
+
+def queue_jobs(papers, new_attempt=True):
+    """논문 → job 목록. 상태 저장소에 queued로 기록하고 검색 결과를 체크포인트로 남김"""
+    jobs = []
+    for paper in papers:
+        jobs.append(new_job(paper))
+        get_state_store().queue(paper["doi"], jobs[-1]["title"], new_attempt)
+        CHECKPOINTS.save_paper(paper)
+        print(f"📄 Queued: {jobs[-1]['title']} (DOI: {paper['doi']})")
+    return jobs
+
+
+def build_stages(through="persist"):
+    """PIPELINE_STAGES 중 through까지 (체크포인트 복원 → 계측 → 단계 함수 순으로 감쌈)"""
+    budget = parse_worker_budget(os.environ.get("PIPELINE_WORKERS"), PIPELINE_WORKERS)
+    functions = {"extract": stage_extract, "analyze": stage_analyze, "script": stage_script,
+                 "verify": stage_verify, "render": stage_render, "persist": stage_persist}
+    return [Stage(name, checkpointed(name, tracked(name, functions[name])), budget.get(name, 1),
+                  PIPELINE_QUEUE_SIZE)
+            for name in PIPELINE_STAGES[:PIPELINE_STAGES.index(through) + 1]]
+
+
+def run_jobs(jobs, through="persist"):
+    """jobs를 through 단계까지 파이프라인으로 처리 + 요약 출력 / 실행 리포트·지표 기록"""
+    stages = build_stages(through)
+    started = time.monotonic()
+    try:
+        done = run_pipeline(jobs, stages, on_error=on_stage_error)
+    finally:
+        if RENDER_SERVICE is not None:
+            RENDER_SERVICE.close()
 
     print(f"\n{'=' * 60}")
-    print("🏎️ Pipeline complete!")
+    print(f"🏎️ Pipeline complete! {len(done)}/{len(jobs)} papers (through {through})")
+    print(stage_report(stages, time.monotonic() - started))
+    print(get_state_store().report([job["doi"] for job in jobs]))
+    print(f"   State: {get_state_store().status_counts()}")
+    print(f"   {llm_cache_report()}")
+    print(http_client.report())
+    if RENDER_SERVICE is not None:
+        print(f"   {RENDER_SERVICE.report()}")
+    print(f"   {ASSET_STORE.report()}")
+    if LLM_ROUTER is not None:
+        print(LLM_ROUTER.report())
+
+    for job in jobs:  # 실패한 논문도 출력 디렉터리까지 갔으면 리포트 기록
+        if job.get("output_dir") and Path(job["output_dir"]).exists():
+            telemetry.write_run_report(Path(job["output_dir"]) / RUN_REPORT_NAME, job["doi"],
+                                       llm_routes=LLM_ROUTER.summary(job["doi"]) if LLM_ROUTER else [])
+    write_metrics()
+    print(f"   {telemetry.slowest()}")
+    print(f"   Metrics: {METRICS_FILE}")
     print(f"{'=' * 60}")
+    return done
+
+
+def main():
+    print("=" * 60)
+    print(f"🏎️ F1 Science Card News Generator — {datetime.now().strftime('%Y-%m-%d %H:%M')}")
+    print("=" * 60)
+
+    # STEP 1: 논문 검색
+    print("\n📚 STEP 1: Searching papers...")
+    with telemetry.span("search"):
+        papers = search_papers()
+    if not papers:
+        print("No new papers. Exiting.")
+        write_metrics()
+        return
+
+    run_jobs(queue_jobs(papers))
+
+
+def write_metrics():
+    """실행 전체 지표(Prometheus textfile): span 합계 + 카운터 + 호스트별 HTTP 통계 + 처리 상태"""
+    telemetry.gauge("run_seconds", round(time.time() - telemetry.RUN_STARTED, 3))
+    for host, s in http_client.stats().items():
+        telemetry.gauge("http_requests", s["requests"], host=host)
+        telemetry.gauge("http_bytes", s["bytes"], host=host)
+        telemetry.gauge("http_retries", s["retries"], host=host)
+    for status, n in get_state_store().status_counts().items():
+        telemetry.gauge("papers", n, status=status)
+    telemetry.write_prometheus(METRICS_FILE)
+
+
+def checkpoint_papers(dois=None):
+    """체크포인트(없으면 후보 대기열)의 논문 dict. dois가 없으면 아직 끝나지 않은 체크포인트 전체"""
+    state = get_state_store()
+    if not dois:
+        dois = [doi for doi in CHECKPOINTS.dois() if (state.get(doi) or {}).get("status") != "done"]
+    papers = []
+    for doi in dois:
+        paper = CHECKPOINTS.load_paper(doi) or state.candidate(doi)
+        if paper is None:
+            print(f"   [WARN] {doi}: no checkpoint or queued candidate, skipping")
+            continue
+        papers.append(paper)
+    return papers
+
+
+def cli(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command")
+    commands.add_parser("search", help="search and select papers, saving them as checkpoints")
+    for name in PIPELINE_STAGES[:-1] + ("resume",):
+        help_text = ("finish unfinished papers from their last checkpoint" if name == "resume"
+                     else f"run papers up to the {name} stage, reusing earlier checkpoints")
+        command = commands.add_parser(name, help=help_text)
+        command.add_argument("--doi", action="append", help="paper DOI (repeatable; default: all unfinished)")
+        if name == "resume":
+            command.add_argument("--list", action="store_true", help="only show completed stages per paper")
+        else:
+            command.add_argument("--force", action="store_true",
+                                 help=f"re-run {name} even if checkpointed (drops later checkpoints)")
+    args = parser.parse_args(argv)
+
+    if args.command is None:
+        main()
+        return 0
+    if args.command == "search":
+        with telemetry.span("search"):
+            papers = search_papers()
+        for paper in papers:
+            CHECKPOINTS.save_paper(paper)
+        write_metrics()
+        if papers:
+            print(f"   Saved {len(papers)} papers to {CHECKPOINT_DIR}; next: python main.py extract")
+        return 0
+
+    papers = checkpoint_papers(args.doi)
+    if args.command == "resume" and args.list:
+        for paper in papers:
+            status = (get_state_store().get(paper["doi"]) or {}).get("status", "new")
+            print(f"   {paper['doi']:<40} {status:<8} {', '.join(CHECKPOINTS.completed(paper['doi'])) or '-'}")
+        return 0
+    if not papers:
+        print("No unfinished papers in checkpoints. Run: python main.py search")
+        return 0
+
+    jobs = []
+    for paper in papers:
+        completed = CHECKPOINTS.completed(paper["doi"])
+        print(f"   {paper['doi']}: checkpoints [{', '.join(completed) or '-'}]")
+        # 이어 가기만 하는 단계 명령은 시도 횟수를 늘리지 않음 (resume은 실패 후 재시도로 셈)
+        jobs += queue_jobs([paper], new_attempt=args.command == "resume" or not completed)
+        if getattr(args, "force", False):
+            jobs[-1]["force"] = {args.command}
+    through = "persist" if args.command == "resume" else args.command
+    done = run_jobs(jobs, through)
+    return 0 if len(done) == len(jobs) else 1
 
 
 if __name__ == "__main__":
-    main()
+    sys.exit(cli())
@@ -0,0 +1,311 @@
+"""
+F1 Science Card News — PDF Engine
+문서를 한 번 열고 같은 페이지 순회에서 텍스트 + Figure 후보를 함께 추출.
+PyMuPDF(fitz)가 기본 백엔드, 없을 때만 pdfplumber로 텍스트만 추출.
+페이지를 생성기로 필요한 만큼만 읽고(조기 종료), 프로세스 풀에서는 몇 페이지씩 묶어 병렬 처리.
+프로세스 풀은 처음 필요할 때 forkserver로 한 번 만들어 문서 사이에 재사용하고 프로세스 종료 시 정리.
+이미지는 메타데이터로 먼저 거른 뒤 디코딩.
+"""
+
+import atexit
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+
+from text_select import detect_sections
+
+MAX_PAGES = 25
+MIN_FIG_WIDTH = 300
+MIN_FIG_HEIGHT = 200
+PHASH_DISTANCE = 6  # dHash 해밍 거리 이하면 같은 그림으로 간주
+PAGES_PER_WORKER = 4  # 이보다 짧은 문서는 프로세스 풀 없이 처리
+PAGES_PER_TASK = 2    # 풀 작업 단위 = 조기 종료를 판단하는 간격
+PDF_WORKERS = int(os.environ.get("PDF_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+# 조기 종료: 이만큼 읽었고 results + discussion/conclusion을 봤으면 나머지 페이지는 건너뜀
+EXTRACT_CHAR_BUDGET = int(os.environ.get("EXTRACT_CHAR_BUDGET", "60000"))
+END_SECTIONS = {"discussion", "conclusion"}
+PDF_MEMORY_CEILING_MB = int(os.environ.get("PDF_MEMORY_CEILING_MB", "512"))  # 페이지를 읽는 프로세스의 RSS 증가 한도
+
+_pool = None
+_pool_size = 0
+_pool_lock = threading.Lock()
+
+
+def extract_document(pdf_path, fig_dir, max_pages=MAX_PAGES, workers=None,
+                     char_budget=None, memory_ceiling_mb=None):
+    """PDF를 페이지 단위로 흘려 읽음 → (text, figures, stats). figures는 fig_dir에 PNG로 저장
+
+    1) 페이지 스트림: 텍스트 + 이미지 메타데이터(get_images)만 수집, 크기/색공간 필터.
+       char_budget만큼 읽었고 results + discussion/conclusion을 봤으면,
+       또는 페이지를 읽은 프로세스(풀 워커 또는 현재 프로세스)의 RSS가 문서를 열기 전보다
+       memory_ceiling_mb 넘게 늘었으면 남은 페이지는 건너뜀
+    2) 문서 단위 xref 중복 제거 → 남은 이미지만 디코딩 + dHash + PNG 인코딩 (병렬)
+    3) dHash가 가까운(거의 같은 패널) 이미지는 큰 것 하나만 저장
+
+    stats: pages_parsed, pages_available, stopped(end/budget/memory), peak_rss_mb, sections_seen
+    peak_rss_mb: 페이지 파싱 · 디코딩을 한 프로세스들이 각자 잰 RSS와 결과를 모은 현재 프로세스 RSS 중 최댓값
+    """
+    char_budget = EXTRACT_CHAR_BUDGET if char_budget is None else char_budget
+    memory_ceiling_mb = PDF_MEMORY_CEILING_MB if memory_ceiling_mb is None else memory_ceiling_mb
+    stats = {"pages_parsed": 0, "pages_available": 0, "stopped": "end",
+             "peak_rss_mb": 0.0, "skipped_images": 0}
+
+    try:
+        import fitz
+    except ImportError:
+        print("   [INFO] PyMuPDF not available, falling back to pdfplumber (text only)")
+        pages = _pdfplumber_pages(pdf_path, max_pages, stats)
+        text = _consume_pages(pages, [], stats, char_budget, memory_ceiling_mb)
+        stats["peak_rss_mb"] = round(max(stats["peak_rss_mb"], _rss_mb()), 1)
+        return text, [], stats
+
+    fig_dir = Path(fig_dir)
+    fig_dir.mkdir(parents=True, exist_ok=True)
+    with fitz.open(pdf_path) as doc:
+        stats["pages_available"] = len(doc)
+        page_count = min(len(doc), max_pages)
+
+    workers = PDF_WORKERS if workers is None else workers
+    workers = max(1, min(workers, page_count // PAGES_PER_WORKER))
+    pool = _shared_pool(workers) if workers > 1 else None
+    if pool:
+        workers = min(workers, _pool_size)
+    try:
+        candidates = []
+        pages = _page_stream(str(pdf_path), page_count, pool, workers)
+        text = _consume_pages(pages, candidates, stats, char_budget, memory_ceiling_mb)
+
+        batches = [candidates[i::workers] for i in range(workers)] if candidates else []
+        if pool and len(candidates) > 1:
+            decoded = []
+            for batch, rss in pool.map(_decode_images, [str(pdf_path)] * len(batches), batches):
+                decoded.extend(batch)
+                stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss)
+        else:
+            decoded, rss = _decode_images(str(pdf_path), candidates)
+            stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss)
+    except BrokenProcessPool:
+        _discard_pool(pool)  # 워커가 죽은 풀은 다음 문서에서 새로 만듦
+        raise
+
+    figures = _write_unique(decoded, fig_dir)
+    dropped = len(decoded) - len(figures)
+    del decoded
+    stats["peak_rss_mb"] = round(max(stats["peak_rss_mb"], _rss_mb()), 1)
+    print(f"   Extracted {len(figures)} figure candidates "
+          f"({stats['skipped_images']} filtered by metadata/xref, {dropped} near-duplicates)")
+    return text, figures, stats
+
+
+def _shared_pool(workers):
+    """문서 사이에 재사용하는 프로세스 풀. 처음 호출될 때 max(PDF_WORKERS, workers) 크기로 생성
+
+    fork 대신 forkserver(없으면 spawn)를 써서 스레드 · 열린 소켓을 가진 부모 상태를 복제하지 않음.
+    """
+    global _pool, _pool_size
+    with _pool_lock:
+        if _pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            _pool_size = max(PDF_WORKERS, workers)
+            _pool = ProcessPoolExecutor(max_workers=_pool_size, mp_context=context)
+        return _pool
+
+
+def _discard_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def shutdown_pool():
+    """공유 프로세스 풀 종료 (프로세스 종료 시 자동 호출)"""
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.shutdown(cancel_futures=True)
+
+
+atexit.register(shutdown_pool)
+
+
+def _consume_pages(pages, candidates, stats, char_budget, memory_ceiling_mb):
+    """페이지 스트림을 순서대로 소비하며 조기 종료 조건 검사 → 이어 붙인 텍스트"""
+    pages_text = []
+    chars = 0
+    seen_sections = set()
+    seen_xrefs = set()
+    try:
+        for _, text, page_candidates, page_skipped, rss, growth in pages:
+            stats["pages_parsed"] += 1
+            if text.strip():
+                pages_text.append(text)
+                chars += len(text)
+                seen_sections.update(name for name, _ in detect_sections(text))
+            stats["skipped_images"] += page_skipped
+            for cand in page_candidates:
+                if cand["xref"] in seen_xrefs:  # 로고/반복 패널: 첫 등장만 사용
+                    stats["skipped_images"] += 1
+                    continue
+                seen_xrefs.add(cand["xref"])
+                candidates.append(cand)
+
+            stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss)
+            if chars >= char_budget and "results" in seen_sections and seen_sections & END_SECTIONS:
+                stats["stopped"] = "budget"
+                break
+            if memory_ceiling_mb and growth > memory_ceiling_mb:
+                print(f"   [WARN] PDF memory ceiling hit (+{growth:.0f} MB), "
+                      f"stopping after page {stats['pages_parsed']}")
+                stats["stopped"] = "memory"
+                break
+    finally:
+        pages.close()  # 남은 페이지 생성 중단 (문서 핸들 해제)
+    stats["sections_seen"] = sorted(seen_sections)
+    return "\n".join(pages_text)
+
+
+def _page_stream(pdf_path, page_count, pool, workers):
+    """페이지 순서대로 (page_num, text, candidates, skipped, rss_mb, growth_mb)를 하나씩 내보내는 생성기
+
+    풀이 있으면 workers × PAGES_PER_TASK 페이지를 한 묶음으로 병렬 처리하고,
+    소비하는 쪽이 멈추면 다음 묶음은 제출하지 않음. 풀이 없으면 문서를 한 번 열고 한 페이지씩.
+    """
+    if pool is None:
+        yield from _iter_pages(pdf_path, range(page_count))
+        return
+    wave = workers * PAGES_PER_TASK
+    for start in range(0, page_count, wave):
+        pages = list(range(start, min(start + wave, page_count)))
+        tasks = [pages[i:i + PAGES_PER_TASK] for i in range(0, len(pages), PAGES_PER_TASK)]
+        for chunk in pool.map(_walk_pages, [pdf_path] * len(tasks), tasks):
+            yield from chunk
+
+
+def _walk_pages(pdf_path, page_numbers):
+    """워커: 문서를 한 번 열고 담당 페이지의 텍스트 + 이미지 메타데이터 수집 (디코딩 없음)"""
+    return list(_iter_pages(pdf_path, page_numbers))
+
+
+def _iter_pages(pdf_path, page_numbers):
+    """페이지를 읽는 프로세스가 직접 RSS를 재서 함께 내보냄 (growth는 fitz import 후 · 문서를 열기 전 대비)"""
+    import fitz
+
+    rss_base = _rss_mb()
+    with fitz.open(pdf_path) as doc:
+        for page_num in page_numbers:
+            page = doc[page_num]
+            text = page.get_text("text")
+            candidates, skipped = _page_candidates(page, page_num)
+            del page  # 다음 페이지를 읽기 전에 페이지 객체 해제
+            rss = _rss_mb()
+            yield page_num, text, candidates, skipped, rss, rss - rss_base
+
+
+def _rss_mb():
+    """현재 프로세스 RSS(MB). /proc가 없으면 ru_maxrss(최대 RSS)로 대체"""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, AttributeError):
+        import resource
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _page_candidates(page, page_num):
+    """get_images(full=True) 메타데이터만으로 필터링 → (후보 목록, 제외 수)"""
+    candidates = []
+    skipped = 0
+    seen = set()
+    for img_idx, img in enumerate(page.get_images(full=True)):
+        xref, _smask, width, height, bpc, colorspace = img[:6]
+        if xref in seen:
+            continue
+        seen.add(xref)
+        # 크기 필터: 300x200 이상만 / 색공간 없음(마스크) 또는 1bit(선화·스캔 마스크) 제외
+        if width < MIN_FIG_WIDTH or height < MIN_FIG_HEIGHT or not colorspace or bpc == 1:
+            skipped += 1
+            continue
+        candidates.append({"xref": xref, "page": page_num, "index": img_idx,
+                           "width": width, "height": height})
+    return candidates, skipped
+
+
+def _decode_images(pdf_path, candidates):
+    """워커: 후보 xref만 디코딩 → ([(후보, dHash, PNG bytes)], 디코딩한 프로세스의 RSS MB)"""
+    import fitz
+
+    decoded = []
+    if not candidates:
+        return decoded, _rss_mb()
+    with fitz.open(pdf_path) as doc:
+        for cand in candidates:
+            try:
+                pix = fitz.Pixmap(doc, cand["xref"])
+                if pix.n - pix.alpha >= 4:  # CMYK → RGB
+                    pix = fitz.Pixmap(fitz.csRGB, pix)
+                decoded.append((cand, _dhash(pix), pix.tobytes("png")))
+            except Exception:
+                continue
+    return decoded, _rss_mb()
+
+
+def _dhash(pix):
+    """difference hash (64bit): 9x8 흑백 축소 후 인접 픽셀 밝기 비교"""
+    import fitz
+
+    if pix.alpha:
+        pix = fitz.Pixmap(pix, 0)
+    if pix.colorspace and pix.colorspace.n != 1:
+        pix = fitz.Pixmap(fitz.csGRAY, pix)
+    small = fitz.Pixmap(pix, 9, 8, None)
+    samples = small.samples
+    stride = small.stride
+    bits = 0
+    for y in range(8):
+        row = samples[y * stride:y * stride + 9]
+        for x in range(8):
+            bits = (bits << 1) | (row[x] > row[x + 1])
+    return bits
+
+
+def _write_unique(decoded, fig_dir):
+    """dHash 해밍 거리가 가까운 이미지는 해상도가 큰 것만 남기고 PNG로 저장"""
+    kept = []
+    for cand, digest, png in sorted(decoded, key=lambda d: -d[0]["width"] * d[0]["height"]):
+        if any(bin(digest ^ other).count("1") <= PHASH_DISTANCE for _, other, _ in kept):
+            continue
+        kept.append((cand, digest, png))
+
+    figures = []
+    for cand, _, png in sorted(kept, key=lambda d: (d[0]["page"], d[0]["index"])):
+        fname = f"figure_{cand['page']}_{cand['index']}.png"
+        (fig_dir / fname).write_bytes(png)
+        figures.append({
+            "filename": fname,
+            "width": cand["width"],
+            "height": cand["height"],
+            "page": cand["page"]
+        })
+    return figures
+
+
+def _pdfplumber_pages(pdf_path, max_pages, stats):
+    """pdfplumber 폴백: 텍스트만, 페이지마다 파싱 캐시 해제"""
+    import pdfplumber
+
+    rss_base = _rss_mb()
+    with pdfplumber.open(pdf_path) as pdf:
+        stats["pages_available"] = len(pdf.pages)
+        for page_num, page in enumerate(pdf.pages[:max_pages]):
+            text = page.extract_text() or ""
+            page.close()
+            rss = _rss_mb()
+            yield page_num, text, [], 0, rss, rss - rss_base
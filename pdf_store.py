@@ -0,0 +1,171 @@
+"""
+F1 Science Card News — PDF Store
+DOI별 스트리밍 다운로드 → sha256 주소의 로컬 저장소. 크기 제한 + 이어받기 지원.
+
+레이아웃:
+    objects/<sha256>.pdf      실제 PDF (내용 주소)
+    refs/<doi키>.json         DOI → sha256 매핑
+    partial/<doi키>.part      중단된 다운로드 (Range + If-Range 요청으로 이어받기)
+    partial/<doi키>.part.json 부분 파일을 받을 때의 URL과 검증자 (ETag / Last-Modified)
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import http_client
+
+CHUNK_SIZE = 64 * 1024
+
+
+class PdfTooLarge(Exception):
+    pass
+
+
+class PdfStore:
+    def __init__(self, root, max_bytes=50 * 1024 * 1024):
+        self.root = Path(root)
+        self.max_bytes = max_bytes
+        for sub in ("objects", "refs", "partial"):
+            (self.root / sub).mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _doi_key(doi):
+        return hashlib.sha256(doi.lower().encode("utf-8")).hexdigest()[:32]
+
+    def _ref_path(self, doi):
+        return self.root / "refs" / f"{self._doi_key(doi)}.json"
+
+    def _part_path(self, doi):
+        return self.root / "partial" / f"{self._doi_key(doi)}.part"
+
+    @staticmethod
+    def _validator_path(part):
+        return part.with_name(part.name + ".json")
+
+    def _discard_part(self, part):
+        part.unlink(missing_ok=True)
+        self._validator_path(part).unlink(missing_ok=True)
+
+    def _resume_validator(self, part, url):
+        """이어받을 때 If-Range로 보낼 값. 같은 URL에서 받은 강한 ETag 또는 Last-Modified가 없으면 None"""
+        try:
+            saved = json.loads(self._validator_path(part).read_text())
+        except (OSError, ValueError):
+            return None
+        if saved.get("url") != url:
+            return None
+        etag = saved.get("etag") or ""
+        if etag and not etag.startswith("W/"):  # 약한 ETag는 If-Range에 쓸 수 없음
+            return etag
+        return saved.get("last_modified")
+
+    def _save_validator(self, part, url, resp):
+        etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
+        if not etag and not modified:
+            self._validator_path(part).unlink(missing_ok=True)
+            return
+        self._validator_path(part).write_text(json.dumps({"url": url, "etag": etag, "last_modified": modified}))
+
+    @staticmethod
+    def _resumes_at(resp, offset):
+        """206 응답이 정말 offset부터 이어지는지 (Content-Range: bytes offset-…)"""
+        content_range = resp.headers.get("Content-Range", "")
+        return content_range.startswith(f"bytes {offset}-")
+
+    def object_path(self, sha256):
+        return self.root / "objects" / f"{sha256}.pdf"
+
+    def lookup(self, doi):
+        """이미 저장된 PDF 경로 반환 (없으면 None)"""
+        try:
+            ref = json.loads(self._ref_path(doi).read_text())
+        except (OSError, ValueError):
+            return None
+        path = self.object_path(ref.get("sha256", ""))
+        if path.exists() and path.stat().st_size == ref.get("size"):
+            return path
+        return None
+
+    def fetch(self, doi, url, headers=None, timeout=45, session=None):
+        """저장소에 있으면 그대로, 없으면 스트리밍 다운로드 후 경로 반환"""
+        cached = self.lookup(doi)
+        if cached:
+            print(f"   PDF store hit: {cached.name[:16]}…")
+            return cached
+
+        http = session or http_client
+        part = self._part_path(doi)
+        offset = part.stat().st_size if part.exists() else 0
+        validator = self._resume_validator(part, url) if offset else None
+        if offset and not validator:
+            print("   Partial PDF has no validator for this URL — restarting download")
+            self._discard_part(part)
+            offset = 0
+        req_headers = dict(headers or {})
+        if offset:
+            req_headers["Range"] = f"bytes={offset}-"
+            req_headers["If-Range"] = validator
+
+        with http.get(url, headers=req_headers, timeout=timeout, stream=True) as resp:
+            if resp.status_code == 206 and offset and self._resumes_at(resp, offset):
+                print(f"   Resuming PDF download at {offset // 1024} KB")
+                mode = "ab"
+            elif resp.status_code == 200:
+                if offset:  # If-Range 불일치: 서버 파일이 바뀌었으므로 처음부터
+                    print("   PDF changed on the server — restarting download")
+                offset, mode = 0, "wb"
+                self._save_validator(part, url, resp)
+            elif resp.status_code == 206:
+                self._discard_part(part)
+                raise Exception(f"PDF download failed: unexpected range "
+                                f"{resp.headers.get('Content-Range')!r} for offset {offset}")
+            else:
+                raise Exception(f"PDF download failed: HTTP {resp.status_code}")
+
+            length = resp.headers.get("Content-Length")
+            if length and length.isdigit() and offset + int(length) > self.max_bytes:
+                self._discard_part(part)
+                raise PdfTooLarge(f"PDF too large: {(offset + int(length)) / 1e6:.1f} MB")
+
+            written = offset
+            with open(part, mode) as f:
+                for chunk in resp.iter_content(CHUNK_SIZE):
+                    if not chunk:
+                        continue
+                    written += len(chunk)
+                    if written > self.max_bytes:
+                        f.close()
+                        self._discard_part(part)
+                        raise PdfTooLarge(f"PDF exceeded {self.max_bytes / 1e6:.1f} MB cap")
+                    f.write(chunk)
+
+        return self._commit(doi, url, part)
+
+    def _commit(self, doi, url, part):
+        """부분 파일을 해시 → objects/로 이동 → DOI ref 기록"""
+        digest = hashlib.sha256()
+        with open(part, "rb") as f:
+            head = f.read(5)
+            digest.update(head)
+            for chunk in iter(lambda: f.read(CHUNK_SIZE), b""):
+                digest.update(chunk)
+        size = part.stat().st_size
+        if size <= 1000 or head != b"%PDF-":
+            self._discard_part(part)
+            raise Exception(f"Downloaded file is not a PDF ({size} bytes)")
+
+        sha = digest.hexdigest()
+        target = self.object_path(sha)
+        if target.exists():
+            part.unlink()
+        else:
+            os.replace(part, target)
+        self._validator_path(part).unlink(missing_ok=True)
+
+        ref = {"doi": doi, "url": url, "sha256": sha, "size": size}
+        tmp = self._ref_path(doi).with_suffix(".tmp")
+        tmp.write_text(json.dumps(ref, indent=2))
+        os.replace(tmp, self._ref_path(doi))
+        return target
@@ -0,0 +1,112 @@
+"""
+F1 Science Card News — Stage Pipeline
+단계별 스레드 워커 + 크기 제한 큐. 서로 다른 논문의 I/O·LLM·렌더링 작업이 겹쳐 실행됨.
+"""
+
+import queue
+import threading
+import time
+import traceback
+
+_STOP = object()
+
+
+class Stage:
+    """fn(job) → job(다음 단계로) 또는 None(이 논문 처리 중단)"""
+
+    def __init__(self, name, fn, workers=1, maxsize=2):
+        self.name = name
+        self.fn = fn
+        self.workers = max(1, workers)
+        self.maxsize = maxsize
+        self.busy = 0.0
+        self.done = 0
+        self.failed = 0
+
+
+def run_pipeline(jobs, stages, on_error=None):
+    """jobs를 stages에 순서대로 흘려보내고 마지막 단계까지 통과한 job 목록 반환"""
+    queues = [queue.Queue(maxsize=s.maxsize) for s in stages]
+    results = []
+    lock = threading.Lock()
+    live = [s.workers for s in stages]
+
+    def worker(i):
+        stage = stages[i]
+        inbox = queues[i]
+        outbox = queues[i + 1] if i + 1 < len(stages) else None
+        try:
+            while True:
+                job = inbox.get()
+                if job is _STOP:
+                    return
+
+                started = time.monotonic()
+                try:
+                    out = stage.fn(job)
+                except Exception as e:
+                    out = None
+                    with lock:
+                        stage.failed += 1
+                    if on_error:
+                        try:
+                            on_error(stage.name, job, e)
+                        except Exception:  # 오류 처리기가 실패해도 워커는 다음 job을 계속 처리
+                            traceback.print_exc()
+                    else:
+                        traceback.print_exc()
+                with lock:
+                    stage.busy += time.monotonic() - started
+                    if out is not None:
+                        stage.done += 1
+
+                if out is None:
+                    continue
+                if outbox is not None:
+                    outbox.put(out)
+                else:
+                    with lock:
+                        results.append(out)
+        finally:
+            # 워커가 어떻게 끝나든, 단계의 마지막 워커는 다음 단계에 종료 신호를 보냄 (join이 멈추지 않도록)
+            with lock:
+                live[i] -= 1
+                last = live[i] == 0
+            if last and outbox is not None:
+                for _ in range(stages[i + 1].workers):
+                    outbox.put(_STOP)
+
+    threads = [threading.Thread(target=worker, args=(i,), name=f"{s.name}-{n}", daemon=True)
+               for i, s in enumerate(stages) for n in range(s.workers)]
+    for t in threads:
+        t.start()
+
+    for job in jobs:
+        queues[0].put(job)
+    for _ in range(stages[0].workers):
+        queues[0].put(_STOP)
+
+    for t in threads:
+        t.join()
+    return results
+
+
+def parse_worker_budget(spec, defaults):
+    """"analyze=3,render=1" 형식 문자열로 기본 워커 수 덮어쓰기"""
+    budget = dict(defaults)
+    for part in (spec or "").split(","):
+        if "=" not in part:
+            continue
+        name, _, value = part.partition("=")
+        name = name.strip()
+        if name in budget and value.strip().isdigit():
+            budget[name] = int(value)
+    return budget
+
+
+def stage_report(stages, elapsed):
+    lines = [f"   {'stage':<10} {'workers':>7} {'done':>5} {'failed':>6} {'busy s':>8}"]
+    for s in stages:
+        lines.append(f"   {s.name:<10} {s.workers:>7} {s.done:>5} {s.failed:>6} {s.busy:>8.1f}")
+    lines.append(f"   wall time {elapsed:.1f}s")
+    return "\n".join(lines)
@@ -1,6 +1,6 @@
 """
 F1 Science Card News — Prompt Chains
-프롬프트 3종이 하드코딩되어 있음. main.py에서 import하여 사용.
+프롬프트가 하드코딩되어 있음. main.py에서 import하여 사용.
 """
 
 PROMPT_ANALYSIS = """당신은 F1 드라이버 생리학 전문 연구 분석가이자 비주얼 디렉터입니다.
@@ -193,6 +193,7 @@ PROMPT_VERIFY = """당신은 스포츠 과학 PhD 팩트체커이자 저작권 
   "checks": [
     {{
       "item": "검증 항목명",
+      "card_num": "문제가 된 카드 번호 (정수). 특정 카드와 무관하면 null",
       "status": "PASS 또는 FAIL",
       "issue": "FAIL 시 문제 설명 (없으면 빈 문자열)",
       "fix": "FAIL 시 수정 제안 (없으면 빈 문자열)"
@@ -211,3 +212,71 @@ PROMPT_VERIFY = """당신은 스포츠 과학 PhD 팩트체커이자 저작권 
 6. paper_figure 사용 시 라이선스가 CC-BY/CC-BY-SA인가
 7. pexels 검색어에 특정 브랜드/드라이버명이 없는가
 """
+
+PROMPT_VERIFY_CLAIMS = """당신은 스포츠 과학 PhD 팩트체커이자 저작권 검수자입니다.
+규칙 기반 검사(수치 대조, 검색어 금지어, 출처)는 이미 끝났습니다.
+규칙으로 판단하지 못한 아래 항목만 원문과 대조해 검증하세요.
+
+## 원본 논문 텍스트 (발췌)
+{paper_text_excerpt}
+
+## 논문 라이선스: {license}
+
+## 검증할 항목
+{claims_json}
+
+## 지시사항
+아래 JSON 형식으로만 응답하세요. 마크다운 코드블록 없이 순수 JSON만 출력하세요.
+항목마다 check 1개씩 작성하세요.
+
+{{
+  "checks": [
+    {{
+      "item": "검증할 항목의 item 그대로",
+      "card_num": "검증할 항목의 card_num 그대로 (없으면 null)",
+      "status": "PASS 또는 FAIL",
+      "issue": "FAIL 시 문제 설명 (없으면 빈 문자열)",
+      "fix": "FAIL 시 수정 제안 (없으면 빈 문자열)"
+    }}
+  ],
+  "verdict": "APPROVED 또는 REVISION_NEEDED",
+  "revision_instructions": "수정 필요 시 구체적 지시. APPROVED면 빈 문자열."
+}}
+
+## 검증 기준
+1. 수치가 논문 원문과 일치하는가 (표기 차이·단위 변환은 허용, 계산/추론으로 만든 수치는 FAIL)
+2. 상관관계를 인과관계로 잘못 표현하지 않았는가 (연구 설계가 인과를 뒷받침하는지)
+3. paper_figure 사용 시 라이선스가 CC-BY/CC-BY-SA로 확인되는가
+"""
+
+PROMPT_CARD_REVISION = """당신은 F1 테마 과학 카드뉴스 전문 에디토리얼 디자이너입니다.
+팩트체커가 아래 카드에서 문제를 찾았습니다. 지적된 카드만 다시 작성하세요.
+
+## 분석 데이터
+{analysis_json}
+
+## 수정할 카드 (현재 버전)
+{cards_json}
+
+## 수정하지 않는 나머지 카드 (흐름 참고용)
+{other_cards_json}
+
+## 수정 지시 (팩트체커 피드백)
+{revision_instructions}
+
+## 지시사항
+아래 JSON 형식으로만 응답하세요. 마크다운 코드블록 없이 순수 JSON만 출력하세요.
+수정할 카드만, 현재 버전과 같은 card_num / type / 필드 구성으로 작성하세요.
+
+{{
+  "cards": [
+    {{"card_num": 0, "type": "...", "...": "현재 버전과 같은 필드"}}
+  ]
+}}
+
+## 절대 규칙
+1. stat_big 수치는 반드시 분석 데이터의 data_point에서만 가져올 것.
+2. 각 카드 텍스트 총량 최대 60자 (7초 규칙).
+3. chart_data.value는 반드시 숫자(int/float).
+4. pexels_query에 특정 팀명/드라이버명 금지.
+"""
@@ -0,0 +1,71 @@
+"""
+F1 Science Card News — Rate Limiting
+여러 스레드가 공유하는 토큰 버킷 + Retry-After 파싱.
+"""
+
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+
+class TokenBucket:
+    """스레드 안전 토큰 버킷 (rate: 초당 토큰, burst: 최대 적립량)"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self._updated
+        self._tokens = min(self.burst, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    def acquire(self):
+        """토큰 1개를 얻을 때까지 대기. 실제로 기다린 시간(초)을 반환"""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                if now < self._blocked_until:
+                    delay = self._blocked_until - now
+                else:
+                    self._refill(now)
+                    if self._tokens >= 1.0:
+                        self._tokens -= 1.0
+                        return waited
+                    delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+    def penalize(self, seconds):
+        """429 응답 시 버킷 전체를 seconds 동안 멈춤 (모든 스레드 공통)"""
+        with self._lock:
+            until = time.monotonic() + max(0.0, seconds)
+            if until > self._blocked_until:
+                self._blocked_until = until
+            # 해제 시점에는 요청 1건만 허용하고 이후는 rate대로 다시 적립
+            self._tokens = 1.0
+            self._updated = max(self._updated, self._blocked_until)
+
+
+def parse_retry_after(value, default=None):
+    """Retry-After 헤더(초 또는 HTTP-date)를 초 단위로 변환"""
+    if not value:
+        return default
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return default
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
@@ -0,0 +1,83 @@
+"""
+F1 Science Card News — Render Cache
+카드마다 (템플릿 소스 + 포함 파셜, 렌더 컨텍스트, 참조 이미지 바이트) 해시를 계산해 (절대 경로는 해시에 넣지 않음)
+출력 디렉터리의 render_manifest.json과 비교. 입력이 같은 카드는 Playwright 캡처를 건너뜀.
+"""
+
+import hashlib
+import json
+import os
+import re
+import tempfile
+from pathlib import Path
+
+from cache import cache_key
+
+MANIFEST_NAME = "render_manifest.json"
+_INCLUDE_RE = re.compile(r"""{%-?\s*(?:include|extends|import)\s+["']([^"']+)["']""")
+
+
+def template_digest(env, name, _seen=None):
+    """템플릿 소스와 include/extends한 템플릿 소스까지 합친 sha256"""
+    seen = set() if _seen is None else _seen
+    seen.add(name)
+    source = env.loader.get_source(env, name)[0]
+    digest = hashlib.sha256(source.encode("utf-8"))
+    for child in sorted(set(_INCLUDE_RE.findall(source)) - seen):
+        digest.update(template_digest(env, child, seen).encode())
+    return digest.hexdigest()
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def card_digest(template_hash, context, asset_paths, output_format="png"):
+    """카드 입력 해시. 이미지는 경로가 아니라 내용으로 해시하므로, 저장소를 다른 위치에 체크아웃해도
+    (로컬 ↔ Actions) 같은 입력이면 같은 해시이고, 경로가 같아도 내용이 바뀌면 다른 해시"""
+    assets = {}
+    for path in sorted(set(asset_paths), key=len, reverse=True):  # 긴 경로부터 치환 (접두사 겹침 방지)
+        try:
+            assets[path] = file_digest(path)
+        except OSError:
+            assets[path] = f"missing:{Path(path).name}"
+    portable = {}
+    for key, value in context.items():
+        if isinstance(value, str):
+            for path, content in assets.items():
+                value = value.replace(path, f"asset:{content}")
+        portable[key] = value
+    return cache_key(template_hash, portable, sorted(assets.values()), output_format)
+
+
+class RenderManifest:
+    """output_dir/render_manifest.json: {"card_01.png": {"hash", "template"}}"""
+
+    def __init__(self, output_dir):
+        self.output_dir = Path(output_dir)
+        self.path = self.output_dir / MANIFEST_NAME
+        try:
+            self.entries = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def is_current(self, filename, digest):
+        entry = self.entries.get(filename)
+        return bool(entry) and entry.get("hash") == digest and (self.output_dir / filename).exists()
+
+    def record(self, filename, digest, template):
+        self.entries[filename] = {"hash": digest, "template": template}
+
+    def forget(self, filename):
+        self.entries.pop(filename, None)
+
+    def save(self):
+        self.output_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.output_dir, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self.entries, f, ensure_ascii=False, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
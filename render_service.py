@@ -0,0 +1,196 @@
+"""
+F1 Science Card News — Render Service
+실행당 Chromium 1개를 띄워 논문 사이에 재사용하고, 페이지 풀에서 카드를 동시에 렌더링.
+고정 대기(wait_for_timeout) 대신 템플릿의 준비 신호(window.__cardReady: 이미지 디코딩 + 폰트 로딩 완료)를 기다림.
+render_batch()는 카드 여러 장을 담은 문서를 한 번만 로드하고 .card 요소를 하나씩 캡처 (CSS 파싱·폰트 로딩 1회).
+"""
+
+import asyncio
+import threading
+import time
+
+import telemetry
+
+RENDER_VIEWPORT = {"width": 1080, "height": 1080}
+READY_SIGNAL = "window.__cardReady === true"  # templates/_ready.html에서 설정
+CARD_SELECTOR = ".card"  # 일괄 렌더 문서에서 카드 1장 (templates/_card_base.html)
+
+
+class RenderService:
+    """Playwright async API를 전용 이벤트 루프 스레드에서 실행. render_many()는 어느 스레드에서든 호출 가능"""
+
+    def __init__(self, pages=4, ready_timeout_ms=10000):
+        self.pages = max(1, pages)
+        self.ready_timeout_ms = ready_timeout_ms
+        self.cards = 0
+        self.failed = 0
+        self.not_ready = 0
+        self.batches = 0
+        self.elapsed = 0.0
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, name="render-service", daemon=True)
+                self._thread.start()
+                try:
+                    self._submit(self._open()).result()
+                except Exception:
+                    self._stop_loop()
+                    raise
+        return self
+
+    def _submit(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    async def _open(self):
+        from playwright.async_api import async_playwright
+
+        started = time.monotonic()
+        self._playwright = await async_playwright().start()
+        self._browser = await self._playwright.chromium.launch()
+        self._context = await self._browser.new_context(viewport=RENDER_VIEWPORT)
+        self._pool = asyncio.Queue()
+        for _ in range(self.pages):
+            self._pool.put_nowait(await self._context.new_page())
+        print(f"   🖥️ Render service up: Chromium + {self.pages} pages ({time.monotonic() - started:.1f}s)")
+
+    async def _load(self, page, html, label):
+        await page.set_content(html, wait_until="load")
+        try:
+            await page.wait_for_function(READY_SIGNAL, timeout=self.ready_timeout_ms)
+        except Exception:
+            # 준비 신호가 없으면(이미지 404, 구버전 템플릿 등) 그대로 캡처
+            self.not_ready += 1
+            print(f"   [WARN] {label}: template not ready after {self.ready_timeout_ms} ms")
+
+    async def _acquire(self):
+        """풀에서 페이지 1개. 버려진 자리(None)나 닫힌(크래시) 페이지면 새로 만듦 (실패해도 자리는 풀에 되돌림)"""
+        page = await self._pool.get()
+        if page is None or page.is_closed():
+            try:
+                page = await self._context.new_page()
+            except Exception:
+                self._pool.put_nowait(None)
+                raise
+        return page
+
+    async def _release(self, page, healthy):
+        """정상 페이지만 풀에 되돌림. 실패했거나 닫힌 페이지는 닫고 빈 자리로 남겨 다음 _acquire에서 교체"""
+        if healthy and not page.is_closed():
+            self._pool.put_nowait(page)
+            return
+        try:
+            await page.close()
+        except Exception:
+            pass
+        self._pool.put_nowait(None)
+
+    async def _render(self, html, out_path):
+        """카드 1장 캡처 → 걸린 시간(초, 페이지 대기 제외)"""
+        page = await self._acquire()
+        started = time.monotonic()
+        healthy = False
+        try:
+            await self._load(page, html, out_path.name)
+            await page.screenshot(path=str(out_path))
+            healthy = True
+            return time.monotonic() - started
+        finally:
+            await self._release(page, healthy)
+
+    async def _render_batch(self, html, out_paths):
+        """문서 1개 로드 → n번째 .card 요소를 out_paths[n]으로 캡처 → (로드 시간, [(out_path, 캡처 시간 또는 예외)])"""
+        page = await self._acquire()
+        started = time.monotonic()
+        healthy = False
+        try:
+            await self._load(page, html, f"batch of {len(out_paths)} cards")
+            load_seconds = time.monotonic() - started
+            cards = page.locator(CARD_SELECTOR)
+            shots = []
+            for i, out_path in enumerate(out_paths):
+                shot_started = time.monotonic()
+                try:
+                    await cards.nth(i).screenshot(path=str(out_path))
+                    shots.append((out_path, time.monotonic() - shot_started))
+                except Exception as e:
+                    shots.append((out_path, e))
+            healthy = not any(isinstance(outcome, Exception) for _, outcome in shots)
+            return load_seconds, shots
+        finally:
+            await self._release(page, healthy)
+
+    def render_many(self, items):
+        """[(html, out_path)] → [(out_path, error 또는 None)]. 페이지 풀 크기만큼 동시에 렌더링"""
+        self.start()
+        started = time.monotonic()
+        futures = [self._submit(self._render(html, out_path)) for html, out_path in items]
+        results = []
+        for (_, out_path), future in zip(items, futures):
+            try:
+                telemetry.record_span("render.card", future.result(), card=out_path.name)
+                results.append((out_path, None))
+            except Exception as e:
+                telemetry.record_span("render.card", 0.0, ok=False, card=out_path.name, error=str(e)[:200])
+                results.append((out_path, e))
+        self._tally(results, started)
+        return results
+
+    def render_batch(self, html, out_paths):
+        """카드 여러 장을 담은 문서 1개 → [(out_path, error 또는 None)]. 로드는 한 번, 캡처는 .card 요소마다"""
+        self.start()
+        started = time.monotonic()
+        try:
+            load_seconds, shots = self._submit(self._render_batch(html, out_paths)).result()
+            telemetry.record_span("render.batch", load_seconds, cards=len(out_paths))
+        except Exception as e:
+            telemetry.record_span("render.batch", 0.0, ok=False, cards=len(out_paths), error=str(e)[:200])
+            shots = [(out_path, e) for out_path in out_paths]
+        results = []
+        for out_path, outcome in shots:
+            if isinstance(outcome, Exception):
+                telemetry.record_span("render.card", 0.0, ok=False, card=out_path.name, error=str(outcome)[:200])
+                results.append((out_path, outcome))
+            else:
+                telemetry.record_span("render.card", outcome, card=out_path.name)
+                results.append((out_path, None))
+        self._tally(results, started, batches=1)
+        return results
+
+    def _tally(self, results, started, batches=0):
+        with self._lock:
+            self.elapsed += time.monotonic() - started
+            self.cards += sum(1 for _, error in results if error is None)
+            self.failed += sum(1 for _, error in results if error is not None)
+            self.batches += batches
+
+    def close(self):
+        with self._lock:
+            if self._thread is None:
+                return
+            try:
+                self._submit(self._close()).result(timeout=30)
+            finally:
+                self._stop_loop()
+
+    async def _close(self):
+        await self._browser.close()
+        await self._playwright.stop()
+
+    def _stop_loop(self):
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join(timeout=5)
+        self._loop.close()
+        self._thread = None
+        self._loop = None
+
+    def report(self):
+        rate = self.cards / self.elapsed if self.elapsed else 0.0
+        batches = f", {self.batches} batch documents" if self.batches else ""
+        return (f"Render: {self.cards} cards in {self.elapsed:.1f}s ({rate:.2f} cards/s, {self.pages} pages{batches}"
+                f", {self.failed} failed, {self.not_ready} without ready signal)")
@@ -0,0 +1,154 @@
+"""
+F1 Science Card News — Archive Re-render
+output/*/metadata.json에 저장된 cardnews와 로컬 에셋(output/_assets, .cache/figures)만으로 카드 이미지를 다시 렌더링.
+LLM/Pexels API 키와 네트워크 없이 동작. 템플릿 수정 후 보관본 전체에 스타일을 다시 입힐 때 사용.
+
+프로세스마다 브라우저 1개(RenderService)를 띄우고 실행 디렉터리를 하나씩 나눠 처리.
+카드별 입력 해시(render_manifest.json) 덕분에 중단 후 다시 실행하면 끝난 카드는 건너뜀.
+예전 실행 디렉터리의 bg_N.jpg는 이때 공유 저장소로 옮겨짐 (1080px로 축소, 중복 제거).
+
+사용법:
+    python rerender.py                        # output/ 전체
+    python rerender.py output/2026-02-17_*    # 일부 디렉터리만
+    python rerender.py --workers 4 --pages 2  # 프로세스 4개 × 페이지 2개
+    python rerender.py --force                # 렌더 캐시 무시하고 전부 다시 캡처
+    python rerender.py --batch                # 디렉터리마다 카드 전체를 한 문서로 로드해 캡처 (RENDER_BATCH=1)
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing import util
+from pathlib import Path
+
+OUTPUT_DIR = Path("output")
+
+
+def iter_run_dirs(paths):
+    """metadata.json이 있는 실행 디렉터리를 이름순으로 하나씩"""
+    roots = [Path(p) for p in paths] or [OUTPUT_DIR]
+    for root in roots:
+        if (root / "metadata.json").exists():
+            yield root
+        elif root.is_dir():
+            for meta in sorted(root.glob("*/metadata.json")):
+                yield meta.parent
+
+
+def init_worker(pages, batch=False):
+    """워커 프로세스 초기화: 렌더 페이지 수 / 일괄 렌더 설정 + 종료 시 브라우저 정리"""
+    import main
+
+    main.RENDER_PAGES = pages
+    main.RENDER_BATCH = main.RENDER_BATCH or batch
+    util.Finalize(None, close_worker, exitpriority=10)
+
+
+def close_worker():
+    import main
+
+    if main.RENDER_SERVICE is not None:
+        main.RENDER_SERVICE.close()
+
+
+def missing_figure_cards(cardnews, figures_dir):
+    """paper_figure 카드 중 Figure 파일이 로컬에 없는 card_num 목록 (예전 실행은 /tmp/figures에 저장했음)"""
+    missing = []
+    for card in cardnews.get("cards", []):
+        if card.get("visual_source") != "paper_figure":
+            continue
+        fig_file = card.get("figure_file", "")
+        if not fig_file or figures_dir is None or not (Path(figures_dir) / fig_file).exists():
+            missing.append(card.get("card_num"))
+    return missing
+
+
+def rerender_dir(run_dir, force=False):
+    """실행 디렉터리 1개 → (run_dir, rendered, reused, failed, skipped, bytes_saved, seconds)
+
+    Figure 파일이 없는 paper_figure 카드는 Figure 없이 덮어쓰지 않고 기존 이미지를 그대로 둠 (skipped)
+    """
+    import main
+    from render_cache import MANIFEST_NAME
+
+    started = time.monotonic()
+    saved_before = main.ASSET_STORE.summary()["saved"]
+    run_dir = Path(run_dir)
+    metadata = json.loads((run_dir / "metadata.json").read_text(encoding="utf-8"))
+    if force:
+        (run_dir / MANIFEST_NAME).unlink(missing_ok=True)
+    doi = metadata.get("paper", {}).get("doi", "")
+    figures_dir = main.figures_dir_for(doi) if doi else None
+    cardnews = metadata.get("cardnews", {})
+    skipped = missing_figure_cards(cardnews, figures_dir)
+    if skipped:
+        print(f"   [WARN] {run_dir.name}: figure files missing for cards {skipped}, keeping existing images")
+        cardnews = dict(cardnews, cards=[c for c in cardnews.get("cards", []) if c.get("card_num") not in skipped])
+    rendered, reused, failed = main.render_cards(cardnews, metadata.get("analysis", {}),
+                                                 figures_dir, run_dir, fetch_photos=False)
+    saved = main.ASSET_STORE.summary()["saved"] - saved_before
+    return str(run_dir), rendered, reused, failed, len(skipped), saved, time.monotonic() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("dirs", nargs="*", help="run directories or roots containing them (default: output/)")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1),
+                        help="browser processes (default: min(4, CPU count))")
+    parser.add_argument("--pages", type=int, default=2, help="concurrent pages per browser")
+    parser.add_argument("--force", action="store_true", help="ignore render_manifest.json and recapture everything")
+    parser.add_argument("--batch", action="store_true", help="load each directory's cards as one document")
+    args = parser.parse_args()
+
+    run_dirs = list(iter_run_dirs(args.dirs))
+    if not run_dirs:
+        print("No run directories with metadata.json found.")
+        return
+    workers = max(1, min(args.workers, len(run_dirs)))
+    print(f"🎨 Re-rendering {len(run_dirs)} run directories with {workers} workers × {args.pages} pages")
+
+    totals = {"rendered": 0, "reused": 0, "failed": 0, "skipped": 0, "saved": 0}
+    started = time.monotonic()
+    done = 0
+    pending_dirs = iter(run_dirs)
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker, initargs=(args.pages, args.batch)) as pool:
+        in_flight = set()
+        while True:
+            while len(in_flight) < workers * 2:  # 대기열은 워커 수의 2배까지만 (보관본이 커도 메모리 일정)
+                run_dir = next(pending_dirs, None)
+                if run_dir is None:
+                    break
+                in_flight.add(pool.submit(rerender_dir, str(run_dir), args.force))
+            if not in_flight:
+                break
+            finished, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                done += 1
+                try:
+                    run_dir, rendered, reused, failed, skipped, saved, seconds = future.result()
+                except Exception as e:
+                    print(f"[{done}/{len(run_dirs)}] ❌ {e}")
+                    totals["failed"] += 1
+                    continue
+                totals["rendered"] += rendered
+                totals["reused"] += reused
+                totals["failed"] += failed
+                totals["skipped"] += skipped
+                totals["saved"] += saved
+                elapsed = time.monotonic() - started
+                eta = elapsed / done * (len(run_dirs) - done)
+                print(f"[{done}/{len(run_dirs)}] {Path(run_dir).name}: {rendered} rendered, {reused} unchanged, "
+                      f"{failed} failed, {skipped} skipped (missing figure) ({seconds:.1f}s, ETA {eta:.0f}s)")
+
+    elapsed = time.monotonic() - started
+    rate = totals["rendered"] / elapsed if elapsed else 0.0
+    print(f"\n✅ {len(run_dirs)} dirs in {elapsed:.1f}s — {totals['rendered']} cards rendered "
+          f"({rate:.2f} cards/s), {totals['reused']} unchanged, {totals['failed']} failed, "
+          f"{totals['skipped']} skipped (missing figure), "
+          f"{totals['saved'] / 1024:.0f} KB saved")
+
+
+if __name__ == "__main__":
+    main()
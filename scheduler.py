@@ -0,0 +1,65 @@
+"""
+F1 Science Card News — Batch Scheduler
+백필 모드에서 이번 실행에 처리할 논문 수를 정함:
+  1) LLM 제공자별 남은 일일 쿼터 ÷ 논문당 예상 호출 수
+  2) 남은 Actions 시간 예산 안에 파이프라인이 끝낼 수 있는 수 (단계별 평균 시간 + 워커 수 + 분당 요청 한도)
+  3) 대기열에 남은 후보 수, 실행당 상한
+중 가장 작은 값.
+"""
+
+# 처리 이력이 없을 때 쓰는 단계별 예상 시간(초) / 논문당 LLM 호출 수
+DEFAULT_STAGE_SECONDS = {"extract": 20.0, "analyze": 45.0, "script": 45.0, "verify": 15.0, "render": 25.0,
+                         "persist": 0.5}
+DEFAULT_CALLS_PER_PAPER = 3.5  # 분석 + 스크립트 + 검증(로컬 검증으로 생략될 때가 많음) + 가끔 재작성
+MIN_PROFILE_RUNS = 3           # 단계별 실측이 이만큼 쌓여야 기본값 대신 사용
+
+
+def pipeline_seconds(n, stage_seconds, workers):
+    """n편 처리 시간 추정: 첫 논문이 모든 단계를 지나는 시간 + 병목 단계 간격 × (n-1)"""
+    if n <= 0:
+        return 0.0
+    fill = sum(stage_seconds.values())
+    bottleneck = max(seconds / max(1, workers.get(stage, 1)) for stage, seconds in stage_seconds.items())
+    return fill + bottleneck * (n - 1)
+
+
+def plan_batch(pending, quota_remaining, rpm, profile, workers, time_left, max_papers):
+    """→ (논문 수, 계획 dict: limits(제한 요인별 상한), limited_by, calls_per_paper, est_minutes)
+
+    quota_remaining: {모델: 남은 일일 호출 수 또는 None(무제한)}
+    rpm: 제공자 분당 요청 한도 합계. profile: StateStore.stage_profile() 결과
+    """
+    stage_seconds = dict(DEFAULT_STAGE_SECONDS)
+    calls_per_paper = DEFAULT_CALLS_PER_PAPER
+    measured = {stage: p for stage, p in profile.items() if p["runs"] >= MIN_PROFILE_RUNS}
+    for stage, p in measured.items():
+        if stage in stage_seconds:
+            stage_seconds[stage] = p["seconds"]
+    if {"analyze", "script", "verify"} <= set(measured):
+        calls_per_paper = max(1.0, sum(p["llm_calls"] for p in measured.values()))
+
+    limits = {"candidates": pending, "max_papers": max_papers}
+    if quota_remaining and all(q is not None for q in quota_remaining.values()):
+        limits["quota"] = int(sum(max(0, q) for q in quota_remaining.values()) // calls_per_paper)
+    cap = max(0, min(limits.values()))
+
+    def fits(n):
+        rate_bound = n * calls_per_paper / rpm * 60 if rpm else 0.0
+        return max(pipeline_seconds(n, stage_seconds, workers), rate_bound) <= time_left
+
+    # fits(n)는 n에 대해 단조 → 이분 탐색
+    lo, hi = 0, cap
+    while lo < hi:
+        mid = (lo + hi + 1) // 2
+        if fits(mid):
+            lo = mid
+        else:
+            hi = mid - 1
+    if lo < cap:
+        limits["time"] = lo
+    return lo, {
+        "limits": limits,
+        "limited_by": min(limits, key=limits.get),
+        "calls_per_paper": round(calls_per_paper, 2),
+        "est_minutes": round(pipeline_seconds(lo, stage_seconds, workers) / 60, 1),
+    }
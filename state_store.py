@@ -0,0 +1,255 @@
+"""
+F1 Science Card News — Processing State Store
+논문별 처리 상태(상태, 마지막 완료 단계, 실패 사유, 단계별 소요 시간 / 토큰 사용량)를 SQLite에 저장.
+processed_papers.json(DOI 목록) 대체. DOI 기본 키로 O(1) 조회, 논문 단위 트랜잭션으로 갱신.
+검색 후보 대기열(인용 수 순), 검색어별 페이지 커서, 모델별 일일 LLM 호출 수도 함께 보관.
+"""
+
+import contextlib
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS papers (
+    doi            TEXT PRIMARY KEY,
+    title          TEXT,
+    status         TEXT NOT NULL,          -- queued | running | done | failed | skipped
+    last_stage     TEXT,                   -- 마지막으로 성공한 단계
+    failed_stage   TEXT,
+    failure        TEXT,
+    attempts       INTEGER NOT NULL DEFAULT 0,
+    tokens_in      INTEGER NOT NULL DEFAULT 0,
+    tokens_out     INTEGER NOT NULL DEFAULT 0,
+    output_dir     TEXT,
+    created_at     REAL NOT NULL,
+    updated_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS papers_status ON papers(status);
+CREATE TABLE IF NOT EXISTS stage_runs (
+    doi         TEXT NOT NULL,
+    stage       TEXT NOT NULL,
+    ok          INTEGER NOT NULL,
+    seconds     REAL NOT NULL,
+    tokens_in   INTEGER NOT NULL DEFAULT 0,
+    tokens_out  INTEGER NOT NULL DEFAULT 0,
+    llm_calls   INTEGER NOT NULL DEFAULT 0,
+    at          REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS stage_runs_doi ON stage_runs(doi);
+CREATE TABLE IF NOT EXISTS candidates (
+    doi        TEXT PRIMARY KEY,
+    citations  INTEGER NOT NULL DEFAULT 0,
+    query      TEXT,
+    paper      TEXT NOT NULL,              -- Semantic Scholar 검색 결과 JSON
+    found_at   REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS candidates_rank ON candidates(citations DESC, found_at);
+CREATE TABLE IF NOT EXISTS search_cursors (
+    query        TEXT PRIMARY KEY,
+    next_offset  INTEGER NOT NULL DEFAULT 0,   -- 백필이 이어받을 offset
+    exhausted    INTEGER NOT NULL DEFAULT 0,   -- 검색 결과 끝까지 받음
+    searched_on  TEXT,                         -- 마지막 검색일 (이후는 그날 이후 발행분만 증분 검색)
+    run_on       TEXT,                         -- 그날 첫 실행의 날짜 / 시작 offset / 증분 기준일:
+    run_offset   INTEGER,                      --   같은 날 재실행은 같은 요청을 다시 보내 검색 캐시를 그대로 사용
+    run_since    TEXT
+);
+CREATE TABLE IF NOT EXISTS llm_usage (
+    day    TEXT NOT NULL,
+    model  TEXT NOT NULL,
+    calls  INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (day, model)
+);
+"""
+
+# 처리 대상 후보 조건 (대기열 조회 · 개수가 같이 씀): 처음 보는 논문이거나, 아직 안 끝났고 실패가 max_attempts번 미만
+PENDING_WHERE = "(p.doi IS NULL OR (p.status != 'done' AND p.attempts < ?))"
+
+
+class StateStore:
+    """스레드 간 공유하는 SQLite 연결 1개 + 잠금. 모든 갱신은 논문 단위 트랜잭션"""
+
+    def __init__(self, path, max_attempts=3, readonly=False):
+        """readonly=True: 이미 있는 DB를 읽기 전용으로 열고 스키마 생성/갱신은 하지 않음 (조회만 하는 도구용)"""
+        self.path = Path(path)
+        self.max_attempts = max_attempts
+        self._lock = threading.Lock()
+        if readonly:
+            self._conn = sqlite3.connect(f"{self.path.resolve().as_uri()}?mode=ro", uri=True,
+                                         check_same_thread=False, isolation_level=None)
+            self._conn.row_factory = sqlite3.Row
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False, isolation_level=None)
+        self._conn.row_factory = sqlite3.Row
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(stage_runs)")}
+        if "llm_calls" not in columns:  # 이전 버전에서 만든 DB
+            self._conn.execute("ALTER TABLE stage_runs ADD COLUMN llm_calls INTEGER NOT NULL DEFAULT 0")
+        columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(search_cursors)")}
+        for name, kind in (("run_on", "TEXT"), ("run_offset", "INTEGER"), ("run_since", "TEXT")):
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE search_cursors ADD COLUMN {name} {kind}")
+
+    @contextlib.contextmanager
+    def _transaction(self):
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield self._conn
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+
+    def _write(self, sql, params=()):
+        with self._transaction() as conn:
+            conn.execute(sql, params)
+
+    def migrate_json(self, json_path):
+        """예전 processed_papers.json(DOI 목록)을 done으로 가져오고 파일 삭제 → 가져온 수"""
+        json_path = Path(json_path)
+        if not json_path.exists():
+            return 0
+        dois = json.loads(json_path.read_text())
+        now = time.time()
+        with self._transaction() as conn:
+            conn.executemany(
+                "INSERT OR IGNORE INTO papers (doi, status, last_stage, created_at, updated_at) "
+                "VALUES (?, 'done', 'persist', ?, ?)", [(doi, now, now) for doi in dois])
+        json_path.unlink()
+        return len(dois)
+
+    def get(self, doi):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM papers WHERE doi = ?", (doi,)).fetchone()
+        return dict(row) if row else None
+
+    def queue(self, doi, title, new_attempt=True):
+        """이번 실행에서 처리 시작 (시도 횟수 +1, 체크포인트에서 단계만 이어 가면 new_attempt=False)"""
+        now = time.time()
+        self._write(
+            "INSERT INTO papers (doi, title, status, attempts, created_at, updated_at) "
+            "VALUES (?, ?, 'queued', 1, ?, ?) "
+            "ON CONFLICT(doi) DO UPDATE SET title = excluded.title, status = 'queued', "
+            "attempts = attempts + ?, failed_stage = NULL, failure = NULL, updated_at = excluded.updated_at",
+            (doi, title, now, now, int(new_attempt)))
+
+    def record_stage(self, doi, stage, ok, seconds, tokens_in=0, tokens_out=0, llm_calls=0):
+        """단계 1회 실행 기록 + 논문 누적 토큰 / 마지막 완료 단계 갱신"""
+        now = time.time()
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT INTO stage_runs (doi, stage, ok, seconds, tokens_in, tokens_out, llm_calls, at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (doi, stage, int(ok), seconds, tokens_in, tokens_out, llm_calls, now))
+            conn.execute(
+                "UPDATE papers SET status = CASE WHEN ? AND status != 'done' THEN 'running' ELSE status END, "
+                "last_stage = CASE WHEN ? THEN ? ELSE last_stage END, "
+                "tokens_in = tokens_in + ?, tokens_out = tokens_out + ?, updated_at = ? WHERE doi = ?",
+                (int(ok), int(ok), stage, tokens_in, tokens_out, now, doi))
+
+    def mark_failed(self, doi, stage, reason, status="failed"):
+        self._write("UPDATE papers SET status = ?, failed_stage = ?, failure = ?, updated_at = ? WHERE doi = ?",
+                    (status, stage, str(reason)[:500], time.time(), doi))
+
+    def mark_done(self, doi, output_dir):
+        self._write("UPDATE papers SET status = 'done', output_dir = ?, failed_stage = NULL, failure = NULL, "
+                    "updated_at = ? WHERE doi = ?", (str(output_dir), time.time(), doi))
+
+    def done_dois(self):
+        with self._lock:
+            return [row[0] for row in self._conn.execute(
+                "SELECT doi FROM papers WHERE status = 'done' ORDER BY created_at, rowid")]
+
+    def status_counts(self):
+        with self._lock:
+            return dict(self._conn.execute("SELECT status, COUNT(*) FROM papers GROUP BY status").fetchall())
+
+    # --- 검색 후보 대기열 ---
+    def add_candidates(self, papers, query=None):
+        """검색 결과를 후보 대기열에 추가(이미 있으면 인용 수 / 메타데이터 갱신) → 새로 추가된 수"""
+        now = time.time()
+        with self._transaction() as conn:
+            before = conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0]
+            conn.executemany(
+                "INSERT INTO candidates (doi, citations, query, paper, found_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(doi) DO UPDATE SET citations = excluded.citations, paper = excluded.paper",
+                [(p["doi"], p.get("citationCount") or 0, query, json.dumps(p, ensure_ascii=False), now)
+                 for p in papers])
+            return conn.execute("SELECT COUNT(*) FROM candidates").fetchone()[0] - before
+
+    def pending_candidates(self, limit):
+        """아직 처리 안 됐고 재시도 한도도 안 넘은 후보를 인용 수 순으로 limit개 (논문 dict)"""
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT c.paper FROM candidates c LEFT JOIN papers p ON p.doi = c.doi WHERE {PENDING_WHERE} "
+                "ORDER BY c.citations DESC, c.found_at LIMIT ?", (self.max_attempts, limit)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def candidate(self, doi):
+        """대기열에 저장된 논문 dict (없으면 None)"""
+        with self._lock:
+            row = self._conn.execute("SELECT paper FROM candidates WHERE doi = ?", (doi,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def pending_count(self):
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*) FROM candidates c LEFT JOIN papers p ON p.doi = c.doi WHERE {PENDING_WHERE}",
+                (self.max_attempts,)).fetchone()[0]
+
+    def search_cursor(self, query):
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM search_cursors WHERE query = ?", (query,)).fetchone()
+        return dict(row) if row else None
+
+    def save_cursor(self, query, next_offset, exhausted, searched_on, run_on=None, run_offset=None, run_since=None):
+        self._write("INSERT INTO search_cursors (query, next_offset, exhausted, searched_on, run_on, run_offset, "
+                    "run_since) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(query) DO UPDATE SET next_offset = excluded.next_offset, "
+                    "exhausted = excluded.exhausted, searched_on = excluded.searched_on, run_on = excluded.run_on, "
+                    "run_offset = excluded.run_offset, run_since = excluded.run_since",
+                    (query, next_offset, int(exhausted), searched_on, run_on, run_offset, run_since))
+
+    # --- LLM 일일 사용량 / 단계별 비용 (배치 크기 계획용) ---
+    def record_llm_call(self, model, day):
+        self._write("INSERT INTO llm_usage (day, model, calls) VALUES (?, ?, 1) "
+                    "ON CONFLICT(day, model) DO UPDATE SET calls = calls + 1", (day, model))
+
+    def llm_calls_on(self, day):
+        with self._lock:
+            return dict(self._conn.execute("SELECT model, calls FROM llm_usage WHERE day = ?", (day,)).fetchall())
+
+    def stage_profile(self, recent=200):
+        """최근 성공한 단계 실행 recent건 기준 {stage: {"seconds": 평균, "llm_calls": 평균, "runs": 건수}}"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT stage, AVG(seconds), AVG(llm_calls), COUNT(*) FROM "
+                "(SELECT * FROM stage_runs WHERE ok = 1 ORDER BY at DESC LIMIT ?) GROUP BY stage",
+                (recent,)).fetchall()
+        return {stage: {"seconds": seconds, "llm_calls": calls, "runs": runs}
+                for stage, seconds, calls, runs in rows}
+
+    def report(self, dois):
+        """이번 실행 논문들의 상태 / 단계별 시간 / 토큰 요약"""
+        lines = [f"   {'doi':<36} {'status':<8} {'stage':<8} {'tokens in/out':>14} {'seconds':>8}"]
+        with self._lock:
+            for doi in dois:
+                paper = self._conn.execute("SELECT * FROM papers WHERE doi = ?", (doi,)).fetchone()
+                if paper is None:
+                    continue
+                seconds = self._conn.execute(
+                    "SELECT COALESCE(SUM(seconds), 0) FROM stage_runs WHERE doi = ? AND at >= ?",
+                    (doi, paper["created_at"])).fetchone()[0]
+                stage = paper["failed_stage"] or paper["last_stage"] or "-"
+                lines.append(f"   {doi[:36]:<36} {paper['status']:<8} {stage:<8} "
+                             f"{paper['tokens_in']:>6}/{paper['tokens_out']:<7} {seconds:>8.1f}")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,222 @@
+"""
+F1 Science Card News — Telemetry
+단계별 span(소요 시간 + 속성)과 카운터를 메모리에 모아
+실행 디렉터리별 JSON 리포트(run_report.json)와 실행 전체 Prometheus textfile(metrics.prom)로 기록.
+PROFILE_STAGES에 적은 단계는 cProfile로 감싸 .prof 파일로 저장 (pstats / snakeviz로 열람).
+"""
+
+import contextlib
+import cProfile
+import itertools
+import json
+import os
+import re
+import tempfile
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+METRIC_PREFIX = "f1_cardnews"
+PROFILE_STAGES = {s.strip() for s in os.environ.get("PROFILE_STAGES", "").split(",") if s.strip()}
+PROFILE_DIR = Path(os.environ.get("PROFILE_DIR", ".cache/profiles"))
+
+RUN_STARTED = time.time()
+_spans = []
+_counters = {}   # (name, doi, labels) → 값
+_gauges = {}     # (name, labels) → 값
+_ids = itertools.count(1)
+_local = threading.local()
+_lock = threading.Lock()
+_profile_lock = threading.Lock()  # cProfile은 동시에 하나만 활성화 가능 (3.12+)
+
+
+def _stack():
+    if not hasattr(_local, "stack"):
+        _local.stack = []
+    return _local.stack
+
+
+def current_doi():
+    """이 스레드에서 열려 있는 span 중 가장 안쪽의 doi"""
+    for entry in reversed(_stack()):
+        if entry["doi"]:
+            return entry["doi"]
+    return None
+
+
+@contextlib.contextmanager
+def span(name, doi=None, **attrs):
+    """with span("llm", model=...) as attrs: 블록 소요 시간 기록. attrs에 값을 더하면 함께 저장
+
+    예외가 나거나 attrs["error"]가 설정되면 ok=False. doi는 바깥 span에서 물려받음
+    """
+    stack = _stack()
+    entry = {"id": next(_ids), "name": name, "doi": doi or current_doi(),
+             "parent": stack[-1]["id"] if stack else None, "thread": threading.current_thread().name,
+             "start": round(time.time() - RUN_STARTED, 4), "attrs": attrs}
+    stack.append(entry)
+    started = time.perf_counter()
+    error = None
+    try:
+        yield attrs
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        stack.pop()
+        entry["seconds"] = round(time.perf_counter() - started, 4)
+        if error is not None:
+            attrs.setdefault("error", f"{type(error).__name__}: {error}"[:200])
+        entry["ok"] = "error" not in attrs
+        with _lock:
+            _spans.append(entry)
+
+
+def record_span(name, seconds, ok=True, **attrs):
+    """다른 스레드(렌더 이벤트 루프 등)에서 잰 시간을 현재 span 아래에 기록"""
+    stack = _stack()
+    entry = {"id": next(_ids), "name": name, "doi": current_doi(),
+             "parent": stack[-1]["id"] if stack else None, "thread": threading.current_thread().name,
+             "start": round(time.time() - RUN_STARTED - seconds, 4), "seconds": round(seconds, 4),
+             "ok": ok, "attrs": attrs}
+    with _lock:
+        _spans.append(entry)
+
+
+def count(name, value=1, **labels):
+    """카운터 증가. 현재 span의 doi로 논문별 리포트에도 집계"""
+    key = (name, current_doi(), tuple(sorted((k, str(v)) for k, v in labels.items())))
+    with _lock:
+        _counters[key] = _counters.get(key, 0) + value
+
+
+def gauge(name, value, **labels):
+    with _lock:
+        _gauges[(name, tuple(sorted((k, str(v)) for k, v in labels.items())))] = value
+
+
+@contextlib.contextmanager
+def profiled(stage, doi=""):
+    """PROFILE_STAGES에 있는 단계면 cProfile로 실행해 PROFILE_DIR/<stage>_<doi>_<시각>.prof 저장
+
+    cProfile은 프로세스에서 한 번에 하나만 켤 수 있으므로 다른 스레드가 프로파일 중이면 그냥 실행
+    """
+    if stage not in PROFILE_STAGES or not _profile_lock.acquire(blocking=False):
+        yield
+        return
+    profiler = cProfile.Profile()
+    try:
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+        PROFILE_DIR.mkdir(parents=True, exist_ok=True)
+        safe = re.sub(r"[^A-Za-z0-9]+", "-", doi)[:40]
+        path = PROFILE_DIR / f"{stage}_{safe}_{datetime.now():%H%M%S}.prof"
+        profiler.dump_stats(str(path))
+        print(f"   ⏱️ Profile saved: {path}")
+    finally:
+        _profile_lock.release()
+
+
+def _label_str(labels):
+    return ",".join(f"{k}={v}" for k, v in labels)
+
+
+def run_report(doi=None):
+    """doi의 span / 카운터 + span 이름별 합계. doi=None이면 실행 전체"""
+    with _lock:
+        spans = [dict(s) for s in _spans if doi is None or s["doi"] == doi]
+        counters = {}
+        for (name, span_doi, labels), value in _counters.items():
+            if doi is None or span_doi == doi:
+                key = f"{name}{{{_label_str(labels)}}}" if labels else name
+                counters[key] = counters.get(key, 0) + value
+    totals = {}
+    for s in spans:
+        t = totals.setdefault(s["name"], {"count": 0, "seconds": 0.0, "max": 0.0, "failed": 0})
+        t["count"] += 1
+        t["seconds"] = round(t["seconds"] + s["seconds"], 4)
+        t["max"] = max(t["max"], s["seconds"])
+        t["failed"] += 0 if s["ok"] else 1
+    spans.sort(key=lambda s: s["start"])
+    return {"run_started": datetime.fromtimestamp(RUN_STARTED).isoformat(timespec="seconds"),
+            "doi": doi, "totals": totals, "counters": dict(sorted(counters.items())), "spans": spans}
+
+
+def _atomic_write(path, text):
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+def write_run_report(path, doi=None, **extra):
+    """run_report(doi)에 extra 항목(예: LLM 라우팅 요약)을 더해 JSON으로 기록"""
+    _atomic_write(path, json.dumps({**run_report(doi), **extra}, ensure_ascii=False, indent=2))
+
+
+def _metric_name(name):
+    return f"{METRIC_PREFIX}_{re.sub(r'[^a-zA-Z0-9_]', '_', name)}"
+
+
+def _prom_labels(labels):
+    if not labels:
+        return ""
+    def escape(value):
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+
+def prometheus_text():
+    """실행 전체 지표 (node_exporter textfile collector 형식). 카운터는 논문 구분 없이 합산"""
+    with _lock:
+        spans = list(_spans)
+        counters = {}
+        for (name, _, labels), value in _counters.items():
+            counters[(name, labels)] = counters.get((name, labels), 0) + value
+        gauges = dict(_gauges)
+
+    lines = []
+    span_name = _metric_name("span_seconds")
+    lines += [f"# HELP {span_name} Time spent in each traced step.", f"# TYPE {span_name} summary"]
+    totals = {}
+    for s in spans:
+        t = totals.setdefault((s["name"], "true" if s["ok"] else "false"), [0, 0.0])
+        t[0] += 1
+        t[1] += s["seconds"]
+    for (name, ok), (n, seconds) in sorted(totals.items()):
+        labels = _prom_labels((("ok", ok), ("span", name)))
+        lines.append(f"{span_name}_sum{labels} {seconds:.4f}")
+        lines.append(f"{span_name}_count{labels} {n}")
+
+    for metric in sorted({name for name, _ in counters}):
+        full = _metric_name(metric) + "_total"
+        lines.append(f"# TYPE {full} counter")
+        for (name, labels), value in sorted(counters.items()):
+            if name == metric:
+                lines.append(f"{full}{_prom_labels(labels)} {value}")
+
+    for metric in sorted({name for name, _ in gauges}):
+        full = _metric_name(metric)
+        lines.append(f"# TYPE {full} gauge")
+        for (name, labels), value in sorted(gauges.items()):
+            if name == metric:
+                lines.append(f"{full}{_prom_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path):
+    _atomic_write(path, prometheus_text())
+
+
+def slowest(limit=5):
+    """실행 전체에서 합계 시간이 긴 span 이름 → 요약 문자열"""
+    totals = run_report()["totals"]
+    top = sorted(totals.items(), key=lambda kv: kv[1]["seconds"], reverse=True)[:limit]
+    return "Slowest steps: " + ", ".join(f"{name} {t['seconds']:.1f}s/{t['count']}" for name, t in top)
@@ -0,0 +1,65 @@
+"""
+IncrementalJSONParser가 비스트리밍 parse_json_response와 같은 응답(설명 문장, 코드블록)을 받아들이는지
+"""
+
+import json
+
+import pytest
+
+from json_stream import IncrementalJSONParser, StreamError
+from main import parse_json_response
+
+BODY = {"hook_headline": "심박수 180", "data_points": [{"value": "1.4", "unit": "°C"}],
+        "pexels_search": {"cover_keywords": ["race car"]}}
+
+
+def stream(text, chunk=1):
+    """chunk 글자씩 흘려보내고 (결과, on_key로 받은 키 목록)"""
+    seen = []
+    parser = IncrementalJSONParser(lambda key, value: seen.append(key))
+    for i in range(0, len(text), chunk):
+        parser.feed(text[i:i + chunk])
+    return parser.finish(), seen
+
+
+@pytest.mark.parametrize("text", [
+    json.dumps(BODY, ensure_ascii=False),
+    "```json\n" + json.dumps(BODY, ensure_ascii=False, indent=2) + "\n```",
+    "Sure! Here {is} the JSON:\n```json\n" + json.dumps(BODY, ensure_ascii=False) + "\n```",
+    'Example: {"a": 1}\n```json\n' + json.dumps(BODY, ensure_ascii=False) + "\n```\nDone.",
+])
+@pytest.mark.parametrize("chunk", [1, 7, 4096])
+def test_accepts_what_parse_json_response_accepts(text, chunk):
+    result, seen = stream(text, chunk)
+    assert result == parse_json_response(text) == BODY
+    assert seen[-len(BODY):] == list(BODY)
+
+
+def test_preamble_brace_before_fence_does_not_fail():
+    text = "Sure! Here {is} the JSON:\n```json\n{\"a\": {\"b\": [1, 2]}}\n```"
+    assert stream(text)[0] == {"a": {"b": [1, 2]}}
+
+
+def test_unfenced_preamble_brace_restarts_at_next_object():
+    text = "Use the {hook} and {data} fields below.\n" + json.dumps(BODY, ensure_ascii=False)
+    assert stream(text)[0] == BODY
+
+
+def test_malformed_object_still_fails_mid_stream():
+    parser = IncrementalJSONParser()
+    with pytest.raises(StreamError, match="Unbalanced"):
+        parser.feed('```json\n{"a": [1, 2}')
+
+
+def test_truncated_object_fails():
+    parser = IncrementalJSONParser()
+    parser.feed('Here {is} it: {"a": [1, 2')
+    with pytest.raises(StreamError, match="truncated"):
+        parser.finish()
+
+
+def test_prose_only_fails():
+    parser = IncrementalJSONParser()
+    parser.feed("I cannot help with {that} request.")
+    with pytest.raises(StreamError, match="without a JSON object"):
+        parser.finish()
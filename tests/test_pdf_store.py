@@ -0,0 +1,107 @@
+"""
+PdfStore.fetch 이어받기: 부분 파일의 ETag를 If-Range로 보내고, 서버 파일이 바뀌었으면 처음부터 다시 받는지
+"""
+
+import hashlib
+
+import pytest
+
+from pdf_store import PdfStore
+
+DOI = "10.5555/resume"
+URL = "https://example.org/paper.pdf"
+
+
+def pdf_bytes(tag):
+    return b"%PDF-1.4\n" + tag.encode() * 40_000
+
+
+class FakeResponse:
+    def __init__(self, status_code, body, headers):
+        self.status_code = status_code
+        self.headers = {"Content-Length": str(len(body)), **headers}
+        self._body = body
+
+    def iter_content(self, size):
+        for i in range(0, len(self._body), size):
+            yield self._body[i:i + size]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+class FakeServer:
+    """Range + If-Range를 RFC 9110대로 처리하는 PDF 서버 대역. cut이 있으면 그 바이트에서 응답이 끊김"""
+
+    def __init__(self, body, etag):
+        self.body, self.etag = body, etag
+        self.cut = None
+        self.requests = []
+
+    def get(self, url, headers=None, timeout=None, stream=False):
+        headers = headers or {}
+        self.requests.append(headers)
+        body, status, extra = self.body, 200, {"ETag": self.etag}
+        if "Range" in headers and headers.get("If-Range") == self.etag:
+            start = int(headers["Range"][len("bytes="):-1])
+            body, status = self.body[start:], 206
+            extra["Content-Range"] = f"bytes {start}-{len(self.body) - 1}/{len(self.body)}"
+        if self.cut is not None:
+            return Interrupted(status, body, extra, self.cut)
+        return FakeResponse(status, body, extra)
+
+
+class Interrupted(FakeResponse):
+    def __init__(self, status_code, body, headers, cut):
+        super().__init__(status_code, body, headers)
+        self._cut = cut
+
+    def iter_content(self, size):
+        yield self._body[:self._cut]
+        raise ConnectionError("connection reset")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return PdfStore(tmp_path / "pdfs")
+
+
+def interrupt(store, server, cut):
+    server.cut = cut
+    with pytest.raises(ConnectionError):
+        store.fetch(DOI, URL, session=server)
+    server.cut = None
+
+
+def test_resume_sends_if_range_and_appends(store):
+    server = FakeServer(pdf_bytes("a"), '"v1"')
+    interrupt(store, server, 10_000)
+
+    path = store.fetch(DOI, URL, session=server)
+    assert server.requests[-1] == {"Range": "bytes=10000-", "If-Range": '"v1"'}
+    assert path.read_bytes() == server.body
+    assert path.stem == hashlib.sha256(server.body).hexdigest()
+    assert list((store.root / "partial").iterdir()) == []
+
+
+def test_changed_file_restarts_from_zero(store):
+    server = FakeServer(pdf_bytes("a"), '"v1"')
+    interrupt(store, server, 10_000)
+
+    server.body, server.etag = pdf_bytes("b"), '"v2"'  # 서버 파일이 바뀜 → If-Range 불일치 → 200 전체
+    path = store.fetch(DOI, URL, session=server)
+    assert server.requests[-1]["If-Range"] == '"v1"'
+    assert path.read_bytes() == pdf_bytes("b")
+
+
+def test_part_without_validator_is_not_resumed(store):
+    part = store._part_path(DOI)
+    part.write_bytes(pdf_bytes("old")[:5000])
+    server = FakeServer(pdf_bytes("a"), '"v1"')
+
+    path = store.fetch(DOI, URL, session=server)
+    assert "Range" not in server.requests[-1]
+    assert path.read_bytes() == server.body
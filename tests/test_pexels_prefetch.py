@@ -0,0 +1,38 @@
+"""
+Pexels 선행 조회가 실패하면 그 Future를 버리고 직접 다시 조회하는지 (다음 호출이 같은 예외를 받지 않음)
+"""
+
+import pytest
+
+import main
+
+
+@pytest.fixture
+def prefetch_env(monkeypatch):
+    monkeypatch.setattr(main, "PEXELS_PREFETCH", {})
+    monkeypatch.setattr(main, "PEXELS_KEY", "test-key")
+    calls = []
+
+    def flaky_photo(query, allow_network=True):
+        calls.append(query)
+        if len(calls) == 1:
+            raise ConnectionError("connection reset")
+        return f"/assets/{query}.jpg", {"asset": f"{query}.jpg"}
+
+    monkeypatch.setattr(main, "pexels_photo", flaky_photo)
+    return calls
+
+
+def test_failed_prefetch_is_dropped_and_retried(prefetch_env):
+    main.prefetch_pexels(["pit stop"])
+    assert main.prefetched_pexels_photo("pit stop") == ("/assets/pit stop.jpg", {"asset": "pit stop.jpg"})
+    assert "pit stop" not in main.PEXELS_PREFETCH
+    assert prefetch_env == ["pit stop", "pit stop"]
+
+
+def test_later_prefetch_after_failure_starts_fresh(prefetch_env):
+    main.prefetch_pexels(["pit stop"])
+    main.prefetched_pexels_photo("pit stop")
+    main.prefetch_pexels(["pit stop"])  # 다음 논문이 같은 검색어를 씀
+    assert main.prefetched_pexels_photo("pit stop")[0] == "/assets/pit stop.jpg"
+    assert len(prefetch_env) == 3
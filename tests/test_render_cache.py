@@ -0,0 +1,26 @@
+"""
+card_digest가 에셋 절대 경로가 아니라 내용으로 해시하는지 (다른 위치에 체크아웃해도 캐시 적중)
+"""
+
+import shutil
+
+from render_cache import card_digest
+
+
+def digest_in(root, image=b"\x89PNG figure"):
+    asset = root / "output" / "_assets" / "photo.jpg"
+    asset.parent.mkdir(parents=True, exist_ok=True)
+    asset.write_bytes(image)
+    context = {"bg_image_path": f"file://{asset}", "headline": "심박수 180"}
+    return card_digest("tmpl", context, [str(asset)], "png")
+
+
+def test_same_assets_in_another_checkout_give_same_digest(tmp_path):
+    assert digest_in(tmp_path / "home" / "repo") == digest_in(tmp_path / "runner" / "work" / "repo")
+
+
+def test_changed_asset_content_changes_digest(tmp_path):
+    root = tmp_path / "repo"
+    before = digest_in(root)
+    shutil.rmtree(root)
+    assert digest_in(root, image=b"\x89PNG other figure") != before
@@ -0,0 +1,89 @@
+"""
+같은 날 재실행하는 search_papers()가 첫 실행의 검색 응답 캐시를 그대로 쓰는지 (Semantic Scholar 요청 0회)
+"""
+
+import json
+from datetime import datetime
+
+import pytest
+
+import http_client
+import main
+
+TOTAL_PAPERS = 450
+
+
+class FakeResponse:
+    def __init__(self, body):
+        self.status_code = 200
+        self.headers = {}
+        self._body = body
+
+    def json(self):
+        return self._body
+
+
+class FakeSemanticScholar:
+    """/paper/search 대역: offset부터 limit개, publicationDateOrYear가 있으면 빈 증분 결과"""
+
+    def __init__(self):
+        self.requests = []
+
+    def get(self, url, params=None, headers=None, timeout=None):
+        self.requests.append(dict(params))
+        if params.get("publicationDateOrYear"):
+            return FakeResponse({"data": [], "next": None})
+        offset, limit = params["offset"], params["limit"]
+        end = min(offset + limit, TOTAL_PAPERS)
+        data = [{"title": f"Paper {i}", "externalIds": {"DOI": f"10.5555/{i}"},
+                 "openAccessPdf": {"url": f"https://example.org/{i}.pdf"}, "citationCount": i}
+                for i in range(offset, end)]
+        return FakeResponse({"data": data, "next": end if end < TOTAL_PAPERS else None})
+
+
+def on_day(monkeypatch, day):
+    class Today(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return cls.fromisoformat(f"{day}T09:00:00")
+
+    monkeypatch.setattr(main, "datetime", Today)
+
+
+@pytest.fixture
+def search_env(tmp_path, monkeypatch):
+    queries = tmp_path / "queries.json"
+    queries.write_text(json.dumps(["F1 driver physiology"]))
+    monkeypatch.setattr(main, "QUERIES_FILE", queries)
+    monkeypatch.setattr(main, "STATE_DB", tmp_path / "state.db")
+    monkeypatch.setattr(main, "HISTORY_FILE", tmp_path / "processed_papers.json")
+    monkeypatch.setattr(main, "SEARCH_CACHE_DIR", tmp_path / "search_cache")
+    monkeypatch.setattr(main, "STATE", None)
+    monkeypatch.setattr(main, "SEARCH_BACKFILL_PAGES", 2)
+    monkeypatch.setattr(main, "BACKFILL", False)
+    server = FakeSemanticScholar()
+    monkeypatch.setattr(http_client, "get", server.get)
+    yield server
+    if main.STATE is not None:
+        main.STATE._conn.close()
+
+
+def test_same_day_rerun_uses_search_cache(search_env, monkeypatch):
+    on_day(monkeypatch, "2026-10-15")
+    main.search_papers()
+    assert [r["offset"] for r in search_env.requests] == [0, 100]
+
+    search_env.requests.clear()
+    main.search_papers()  # 같은 날 재실행
+    assert search_env.requests == []
+
+    on_day(monkeypatch, "2026-10-19")  # 다음 예약 실행: 증분 + 이어받은 offset부터
+    main.search_papers()
+    assert sorted((r["offset"], bool(r.get("publicationDateOrYear"))) for r in search_env.requests) == [
+        (0, True), (200, False), (300, False)]
+
+    search_env.requests.clear()
+    main.search_papers()
+    assert search_env.requests == []
+    cursor = main.get_state_store().search_cursor("F1 driver physiology")
+    assert cursor["next_offset"] == 400 and cursor["run_offset"] == 200 and cursor["run_since"] == "2026-10-15"
@@ -0,0 +1,167 @@
+"""
+F1 Science Card News — Paper Text Selection
+논문 본문을 섹션(abstract, methods, results, tables, discussion …)으로 나누고,
+수치가 많은 문단을 우선해 토큰 예산 안에 채워 넣음. 앞부분 잘라내기(text[:15000]) 대체.
+"""
+
+import re
+
+# 섹션 가중치: 높을수록 먼저 포함. references 등 0은 제외
+SECTION_WEIGHTS = {
+    "abstract": 3.0,
+    "results": 3.0,
+    "tables": 2.5,
+    "conclusion": 2.0,
+    "discussion": 1.5,
+    "methods": 1.2,
+    "introduction": 0.6,
+    "front": 0.3,
+    "other": 0.8,
+    "references": 0.0,
+}
+
+SECTION_PATTERNS = [
+    ("abstract", r"abstract|summary"),
+    ("introduction", r"introduction|background"),
+    ("methods", r"methods?|materials and methods|methodology|participants|experimental design|procedures?"),
+    ("results", r"results?|findings|results and discussion"),
+    ("discussion", r"discussion"),
+    ("conclusion", r"conclusions?|practical applications|implications"),
+    ("references", r"references|bibliography|acknowledge?ments?|funding|conflicts? of interest|author contributions"),
+]
+_HEADING_RE = re.compile(
+    r"^\s*(?:\d{1,2}(?:\.\d{1,2})*\.?\s+|[IVX]{1,4}\.\s+)?(" +
+    "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_PATTERNS) +
+    r")\s*[:.]?\s*$",
+    re.IGNORECASE,
+)
+_TABLE_RE = re.compile(r"^\s*(table|tab\.)\s*\d+", re.IGNORECASE)
+_NUMBER_RE = re.compile(
+    r"(?:p\s*[<=>]\s*0?\.\d+)|(?:\d+(?:[.,]\d+)?\s*(?:%|±|bpm|°C|ms|kg|km/h|g\b|mmHg|ml|L/min|W\b))|(?:\d+\.\d+)",
+    re.IGNORECASE,
+)
+
+TABLE_LINES = 25
+PASSAGE_CHARS = 700  # 문단 구분이 없는 PDF 텍스트는 이 길이로 잘라 passage 구성
+
+
+def estimate_tokens(text):
+    """대략적인 토큰 수: 영문 4자 ≈ 1토큰, 한글 등 비ASCII는 1.5자 ≈ 1토큰"""
+    ascii_chars = sum(1 for ch in text if ord(ch) < 128)
+    return int(ascii_chars / 4 + (len(text) - ascii_chars) / 1.5) + 1
+
+
+def truncate_to_budget(text, token_budget):
+    """text 앞부분을 estimate_tokens 기준 token_budget 안에 들도록 자름"""
+    if estimate_tokens(text) <= token_budget:
+        return text
+    low, high = 0, len(text)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if estimate_tokens(text[:mid]) <= token_budget:
+            low = mid
+        else:
+            high = mid - 1
+    return text[:low]
+
+
+def detect_sections(text):
+    """[(section, text)] 문서 순서대로. 첫 제목 이전은 front(저자/소속 등)
+
+    "Table 2 ..." 캡션을 만나면 이후 TABLE_LINES줄(또는 다음 제목까지)은 tables로 분류
+    """
+    sections = []
+    current, lines = "front", []
+    resume, table_left = None, 0
+
+    def flush():
+        if lines:
+            sections.append((current, "\n".join(lines)))
+            lines.clear()
+
+    for line in text.splitlines():
+        match = _HEADING_RE.match(line) if len(line) < 60 else None
+        if match:
+            flush()
+            current = next(name for name, _ in SECTION_PATTERNS if match.group(name))
+            resume, table_left = None, 0
+            continue
+        if _TABLE_RE.match(line):
+            flush()
+            if resume is None:
+                resume = current
+            current, table_left = "tables", TABLE_LINES
+        elif table_left:
+            table_left -= 1
+            if not table_left:
+                lines.append(line)
+                flush()
+                current, resume = resume, None
+                continue
+        lines.append(line)
+    flush()
+    return sections
+
+
+def split_passages(section, body):
+    """섹션 본문 → passage 목록 (빈 줄 기준, 너무 길면 문장 경계 근처에서 분할)"""
+    passages = []
+    for block in re.split(r"\n\s*\n", body):
+        block = block.strip()
+        while len(block) > PASSAGE_CHARS * 1.5:
+            cut = block.rfind(". ", 0, PASSAGE_CHARS) + 1 or PASSAGE_CHARS
+            passages.append(block[:cut].strip())
+            block = block[cut:].strip()
+        if block:
+            passages.append(block)
+    return [(section, p) for p in passages]
+
+
+def score_passage(section, passage, boost_terms=()):
+    weight = SECTION_WEIGHTS.get(section, SECTION_WEIGHTS["other"])
+    if weight == 0:
+        return 0.0
+    numbers = len(_NUMBER_RE.findall(passage))
+    density = numbers / max(1, len(passage) / 200)  # 200자당 수치 개수
+    boost = sum(2.0 for term in boost_terms if term and term in passage)
+    return weight * (1.0 + min(density, 4.0)) + boost
+
+
+def select_passages(text, token_budget, boost_terms=()):
+    """토큰 예산 안에서 점수 높은 passage를 고르고 문서 순서로 이어 붙임
+
+    boost_terms: 반드시 근거를 찾아야 하는 문자열(예: data_point 수치)이 든 passage 가산점
+    """
+    if estimate_tokens(text) <= token_budget:
+        return text
+
+    passages = []
+    for section, body in detect_sections(text):
+        passages.extend(split_passages(section, body))
+    boost_terms = [t.strip() for t in boost_terms if t and t.strip()]
+    scored = [(score_passage(s, p, boost_terms), i, s, p) for i, (s, p) in enumerate(passages)]
+
+    chosen = []
+    used = 0
+    for score, i, section, passage in sorted(scored, key=lambda x: (-x[0], x[1])):
+        if score <= 0:
+            break
+        cost = estimate_tokens(passage) + 4
+        if used + cost > token_budget:
+            continue
+        chosen.append((i, section, passage))
+        used += cost
+
+    if not chosen:  # 예산에 들어가는 passage가 없음(문장 구분 없는 긴 블록 등) → 가장 나은 passage 앞부분을 잘라서 사용
+        if not scored:
+            return truncate_to_budget(text, token_budget)
+        _, _, section, passage = min(scored, key=lambda x: (-x[0], x[1]))
+        return f"[{section.upper()}]\n" + truncate_to_budget(passage, token_budget - 4)
+
+    out, last_section = [], None
+    for _, section, passage in sorted(chosen):
+        if section != last_section:
+            out.append(f"[{section.upper()}]")
+            last_section = section
+        out.append(passage)
+    return "\n".join(out)